@@ -147,6 +147,35 @@ BIDI_BRACKETS = {
 }
 
 
+# Bidi classes that can neither raise the embedding level of a left-to-right paragraph,
+# nor be removed by rule X9: a text only made of those is a single LTR bidi fragment.
+LTR_SAFE_BIDI_CLASSES = frozenset(
+    ("L", "EN", "ES", "ET", "CS", "NSM", "ON", "WS", "S", "B")
+)
+
+# Classes handled by rules X1-X9: when none of those is present in a paragraph,
+# every character simply gets the paragraph embedding level.
+EXPLICIT_BIDI_CLASSES = frozenset(
+    ("RLE", "LRE", "RLO", "LRO", "PDF", "RLI", "LRI", "FSI", "PDI", "BN")
+)
+
+ISOLATE_INITIATORS = ("LRI", "RLI", "FSI")
+
+NEUTRAL_BIDI_CLASSES = frozenset(("B", "S", "WS", "ON", "FSI", "LRI", "RLI", "PDI"))
+
+
+def is_ltr_only(text: str) -> bool:
+    """
+    Returns True if the text does not contain any right-to-left character,
+    nor any explicit directional formatting character.
+    Such a text, on a paragraph with a left-to-right (or auto-detected) base direction,
+    results in a single LTR fragment, so the Unicode Bidirectional Algorithm can be skipped.
+    """
+    return all(
+        unicodedata.bidirectional(char) in LTR_SAFE_BIDI_CLASSES for char in set(text)
+    )
+
+
 class BidiCharacter:
     __slots__ = [
         "character_index",
@@ -158,15 +187,17 @@ class BidiCharacter:
     ]
 
     def __init__(
-        self, character_index: int, character: str, embedding_level: str, debug: bool
+        self,
+        character_index: int,
+        character: str,
+        bidi_class: str,
+        original_bidi_class: str,
+        embedding_level: int,
     ):
         self.character_index = character_index
         self.character = character
-        if debug and character.isupper():
-            self.bidi_class = "R"
-        else:
-            self.bidi_class = unicodedata.bidirectional(character)
-        self.original_bidi_class = self.bidi_class
+        self.bidi_class = bidi_class
+        self.original_bidi_class = original_bidi_class
         self.embedding_level = embedding_level
         self.direction = None
 
@@ -197,96 +228,107 @@ class DirectionalStatus:
 
 
 class IsolatingRun:
-    __slots__ = ["characters", "previous_direction", "next_direction"]
+    """
+    Resolves weak types, neutral types and implicit levels of an isolating run sequence.
+
+    The run works on plain lists of bidi classes: `indices` are positions in the
+    arrays of the `BidiParagraph`, whose `bidi_classes` & `embedding_levels` are updated in place.
+    """
+
+    __slots__ = [
+        "characters",
+        "types",
+        "original_types",
+        "levels",
+        "previous_direction",
+        "next_direction",
+    ]
 
-    def __init__(self, characters: List[BidiCharacter], sos: str, eos: str):
-        self.characters = characters
+    def __init__(
+        self, paragraph: "BidiParagraph", indices: List[int], sos: str, eos: str
+    ):
+        self.characters = [paragraph.text[paragraph.text_indices[i]] for i in indices]
+        self.types = [paragraph.bidi_classes[i] for i in indices]
+        self.original_types = [paragraph.original_bidi_classes[i] for i in indices]
+        self.levels = [paragraph.embedding_levels[i] for i in indices]
         self.previous_direction = sos
         self.next_direction = eos
         self.resolve_weak_types()
         self.resolve_neutral_types()
         self.resolve_implicit_levels()
+        for i, types_index in enumerate(indices):
+            paragraph.bidi_classes[types_index] = self.types[i]
+            paragraph.embedding_levels[types_index] = self.levels[i]
 
     def resolve_weak_types(self) -> None:
+        types = self.types
+        length = len(types)
         # W1. Examine each nonspacing mark (NSM) in the isolating run sequence, and change the type of the NSM to Other Neutral
         #     if the previous character is an isolate initiator or PDI, and to the type of the previous character otherwise.
         #     If the NSM is at the start of the isolating run sequence, it will get the type of sos.
-        for i, bidi_char in enumerate(self.characters):
-            if bidi_char.bidi_class == "NSM":
-                if i == 0:
-                    bidi_char.set_class(self.previous_direction)
-                else:
-                    bidi_char.set_class(
-                        "ON"
-                        if self.characters[i - 1].bidi_class
-                        in ("LRI", "RLI", "FSI", "PDI")
-                        else self.characters[i - 1].bidi_class
-                    )
+        if "NSM" in types:
+            for i, bidi_class in enumerate(types):
+                if bidi_class == "NSM":
+                    if i == 0:
+                        types[i] = self.previous_direction
+                    else:
+                        types[i] = (
+                            "ON"
+                            if types[i - 1] in ("LRI", "RLI", "FSI", "PDI")
+                            else types[i - 1]
+                        )
 
         # W2. Search backward from each instance of a European number until the first strong type (R, L, AL, or sos) is found.
         #     If an AL is found, change the type of the European number to Arabic number.
         # W3. Change all ALs to R.
-
-        last_strong_type = self.previous_direction
-        for bidi_char in self.characters:
-            if bidi_char.bidi_class in ("R", "L", "AL"):
-                last_strong_type = bidi_char.bidi_class
-            if bidi_char.bidi_class == "AL":
-                bidi_char.set_class("R")
-            if bidi_char.bidi_class == "EN" and last_strong_type == "AL":
-                bidi_char.set_class("AN")
+        if "AL" in types:
+            last_strong_type = self.previous_direction
+            for i, bidi_class in enumerate(types):
+                if bidi_class in ("R", "L", "AL"):
+                    last_strong_type = bidi_class
+                if bidi_class == "AL":
+                    types[i] = "R"
+                elif bidi_class == "EN" and last_strong_type == "AL":
+                    types[i] = "AN"
 
         # W4. A single European separator between two European numbers changes to a European number.
         #     A single common separator between two numbers of the same type changes to that type.
-        for i, bidi_char in enumerate(self.characters):
-            if i in (0, len(self.characters) - 1):
-                continue
-            if (
-                bidi_char.bidi_class == "ES"
-                and self.characters[i - 1].bidi_class == "EN"
-                and self.characters[i + 1].bidi_class == "EN"
-            ):
-                bidi_char.set_class("EN")
-
-            if (
-                bidi_char.bidi_class == "CS"
-                and self.characters[i - 1].bidi_class in ("AN", "EN")
-                and self.characters[i + 1].bidi_class
-                == self.characters[i - 1].bidi_class
-            ):
-                bidi_char.set_class(self.characters[i - 1].bidi_class)
+        has_separators = "ES" in types or "CS" in types
+        for i in range(1, length - 1 if has_separators else 1):
+            bidi_class = types[i]
+            if bidi_class == "ES":
+                if types[i - 1] == "EN" and types[i + 1] == "EN":
+                    types[i] = "EN"
+            elif bidi_class == "CS":
+                if types[i - 1] in ("AN", "EN") and types[i + 1] == types[i - 1]:
+                    types[i] = types[i - 1]
 
         # W5. A sequence of European terminators adjacent to European numbers changes to all European numbers.
         # W6. All remaining separators and terminators (after the application of W4 and W5) change to Other Neutral.
-        def prev_is_en(i: int) -> bool:
-            if i == 0:
-                return False
-            if self.characters[i - 1].bidi_class == "ET":
-                return prev_is_en(i - 1)
-            return self.characters[i - 1].bidi_class == "EN"
-
-        def next_is_en(i: int) -> bool:
-            if i == len(self.characters) - 1:
-                return False
-            if self.characters[i + 1].bidi_class == "ET":
-                return next_is_en(i + 1)
-            return self.characters[i + 1].bidi_class == "EN"
-
-        for i, bidi_char in enumerate(self.characters):
-            if bidi_char.bidi_class == "ET":
-                if prev_is_en(i) or next_is_en(i):
-                    bidi_char.set_class("EN")
-
-            if bidi_char.bidi_class in ("ET", "ES", "CS"):
-                bidi_char.set_class("ON")
+        if has_separators or "ET" in types:
+            # followed_by_en[i] is True if the characters after i are a (possibly empty) sequence of ET followed by an EN:
+            followed_by_en = [False] * length
+            following = False
+            for i in range(length - 1, -1, -1):
+                followed_by_en[i] = following
+                following = types[i] == "EN" or (types[i] == "ET" and following)
+            for i, bidi_class in enumerate(types):
+                if bidi_class == "ET":
+                    if (i > 0 and types[i - 1] == "EN") or followed_by_en[i]:
+                        types[i] = "EN"
+                        continue
+                if bidi_class in ("ET", "ES", "CS"):
+                    types[i] = "ON"
+
         # W7. Search backward from each instance of a European number until the first strong type (R, L, or sos) is found.
         #     If an L is found, then change the type of the European number to L.
-        last_strong_type = self.previous_direction
-        for bidi_char in self.characters:
-            if bidi_char.bidi_class in ("R", "L", "AL"):
-                last_strong_type = bidi_char.bidi_class
-            if bidi_char.bidi_class == "EN" and last_strong_type == "L":
-                bidi_char.set_class("L")
+        if "EN" in types:
+            last_strong_type = self.previous_direction
+            for i, bidi_class in enumerate(types):
+                if bidi_class in ("R", "L"):
+                    last_strong_type = bidi_class
+                elif bidi_class == "EN" and last_strong_type == "L":
+                    types[i] = "L"
 
     def pair_brackets(self) -> List[Tuple[int, int]]:
         """
@@ -299,20 +341,20 @@ class IsolatingRun:
         open_bracket_count = 0
         bracket_pairs = []
         for index, char in enumerate(self.characters):
-            if char.character in BIDI_BRACKETS and char.bidi_class == "ON":
-                if BIDI_BRACKETS[char.character]["type"] == "o":
+            if char in BIDI_BRACKETS and self.types[index] == "ON":
+                if BIDI_BRACKETS[char]["type"] == "o":
                     if open_bracket_count >= 63:
                         return []
-                    open_brackets.append((char.character, index))
+                    open_brackets.append((char, index))
                     open_bracket_count += 1
-                if BIDI_BRACKETS[char.character]["type"] == "c":
+                if BIDI_BRACKETS[char]["type"] == "c":
                     if open_bracket_count == 0:
                         continue
                     for current_open_bracket in range(open_bracket_count, 0, -1):
                         open_char, open_index = open_brackets[current_open_bracket - 1]
-                        if (BIDI_BRACKETS[open_char]["pair"] == char.character) or (
-                            BIDI_BRACKETS[open_char]["pair"] in ("〉", "〉")
-                            and char.character in ("〉", "〉")
+                        if (BIDI_BRACKETS[open_char]["pair"] == char) or (
+                            BIDI_BRACKETS[open_char]["pair"] in ("〉", "〉")
+                            and char in ("〉", "〉")
                         ):
                             bracket_pairs.append((open_index, index))
                             open_brackets = open_brackets[: current_open_bracket - 1]
@@ -320,102 +362,91 @@ class IsolatingRun:
                             break
         return sorted(bracket_pairs, key=itemgetter(0))
 
-    def resolve_neutral_types(self) -> None:
-        def previous_strong(index: int):
-            if index == 0:
-                return self.previous_direction
-            if self.characters[index - 1].bidi_class == "L":
+    def previous_strong(self, index: int) -> str:
+        for i in range(index - 1, -1, -1):
+            if self.types[i] == "L":
                 return "L"
-            if self.characters[index - 1].bidi_class in ("R", "AN", "EN"):
+            if self.types[i] in ("R", "AN", "EN"):
                 return "R"
-            return previous_strong(index - 1)
-
-        def next_strong(index: int):
-            if index >= len(self.characters) - 1:
-                return self.next_direction
-            if self.characters[index + 1].bidi_class == "L":
-                return "L"
-            if self.characters[index + 1].bidi_class in ("R", "AN", "EN"):
-                return "R"
-            return next_strong(index + 1)
+        return self.previous_direction
 
+    def resolve_neutral_types(self) -> None:
+        types = self.types
+        embedding_direction = "R" if self.levels[0] % 2 else "L"
         # N0-N2: Resolving neutral types
         # N0
-        brackets = self.pair_brackets()
+        brackets = self.pair_brackets() if "ON" in types else None
         if brackets:
-            embedding_direction = self.characters[0].get_direction_from_level()
-            for b in brackets:
+            opposite_direction = "L" if embedding_direction == "R" else "R"
+            same_classes = ("L",) if embedding_direction == "L" else ("R", "AN", "EN")
+            opposite_classes = (
+                ("R", "AN", "EN") if embedding_direction == "L" else ("L",)
+            )
+            for open_index, close_index in brackets:
                 strong_same_direction = False
                 strong_opposite_direction = False
                 resulting_direction = None
-                for index in range(b[0], b[1]):
-                    if (
-                        self.characters[index].bidi_class == "L"
-                        and embedding_direction == "L"
-                    ) or (
-                        self.characters[index].bidi_class in ("R", "AN", "EN")
-                        and embedding_direction == "R"
-                    ):
+                for bidi_class in types[open_index:close_index]:
+                    if bidi_class in same_classes:
                         strong_same_direction = True
                         break
-                    if (
-                        self.characters[index].bidi_class == "L"
-                        and embedding_direction == "R"
-                    ) or (
-                        self.characters[index].bidi_class in ("R", "AN", "EN")
-                        and embedding_direction == "L"
-                    ):
+                    if bidi_class in opposite_classes:
                         strong_opposite_direction = True
                 if strong_same_direction:
                     resulting_direction = embedding_direction
                 elif strong_opposite_direction:
-                    opposite_direction = "L" if embedding_direction == "R" else "R"
-                    if previous_strong(b[0]) == opposite_direction:
+                    if self.previous_strong(open_index) == opposite_direction:
                         resulting_direction = opposite_direction
                     else:
                         resulting_direction = embedding_direction
                 if resulting_direction:
-                    self.characters[b[0]].bidi_class = resulting_direction
-                    self.characters[b[1]].bidi_class = resulting_direction
-                    if len(self.characters) > b[1] + 1:
-                        next_char = self.characters[b[1] + 1]
-                        if (
-                            next_char.original_bidi_class == "NSM"
-                            and next_char.bidi_class == "ON"
-                        ):
-                            next_char.bidi_class = resulting_direction
+                    types[open_index] = resulting_direction
+                    types[close_index] = resulting_direction
+                    next_index = close_index + 1
+                    if (
+                        next_index < len(types)
+                        and self.original_types[next_index] == "NSM"
+                        and types[next_index] == "ON"
+                    ):
+                        types[next_index] = resulting_direction
 
-        for i, bidi_char in enumerate(self.characters):
-            # N1-N2
-            if bidi_char.bidi_class in (
-                "B",
-                "S",
-                "WS",
-                "ON",
-                "FSI",
-                "LRI",
-                "RLI",
-                "PDI",
-            ):
-                if previous_strong(i) == next_strong(i):
-                    bidi_char.bidi_class = previous_strong(i)
+        # N1-N2
+        if NEUTRAL_BIDI_CLASSES.isdisjoint(types):
+            return
+        # next_strong[i] is the first strong direction found after i, or eos:
+        next_strong = [self.next_direction] * len(types)
+        strong = self.next_direction
+        for i in range(len(types) - 1, -1, -1):
+            next_strong[i] = strong
+            if types[i] == "L":
+                strong = "L"
+            elif types[i] in ("R", "AN", "EN"):
+                strong = "R"
+        previous_strong = self.previous_direction
+        for i, bidi_class in enumerate(types):
+            if bidi_class in NEUTRAL_BIDI_CLASSES:
+                if previous_strong == next_strong[i]:
+                    types[i] = previous_strong
                 else:
-                    bidi_char.bidi_class = bidi_char.get_direction_from_level()
+                    types[i] = "R" if self.levels[i] % 2 else "L"
+            if types[i] == "L":
+                previous_strong = "L"
+            elif types[i] in ("R", "AN", "EN"):
+                previous_strong = "R"
 
     def resolve_implicit_levels(self) -> None:
-        for bidi_char in self.characters:
+        for i, bidi_class in enumerate(self.types):
             # I1. For all characters with an even (left-to-right) embedding level,
             #     those of type R go up one level and those of type AN or EN go up two levels.
-            if bidi_char.embedding_level % 2 == 0:
-                if bidi_char.bidi_class == "R":
-                    bidi_char.embedding_level += 1
-                if bidi_char.bidi_class in ("AN", "EN"):
-                    bidi_char.embedding_level += 2
+            if self.levels[i] % 2 == 0:
+                if bidi_class == "R":
+                    self.levels[i] += 1
+                elif bidi_class in ("AN", "EN"):
+                    self.levels[i] += 2
 
             # I2. For all characters with an odd (right-to-left) embedding level, those of type L, EN or AN go up one level.
-            else:
-                if bidi_char.bidi_class in ("L", "EN", "AN"):
-                    bidi_char.embedding_level += 1
+            elif bidi_class in ("L", "EN", "AN"):
+                self.levels[i] += 1
 
 
 def auto_detect_base_direction(
@@ -446,21 +477,21 @@ def auto_detect_base_direction(
     return TextDirection.LTR
 
 
-def calculate_isolate_runs(paragraph: List[BidiCharacter]) -> List[IsolatingRun]:
-    # BD13 and X10
-    level_run = []
-    lr = []
-    lr_embedding_level = paragraph[0].embedding_level
-
-    for bidi_char in paragraph:
-        if bidi_char.embedding_level != lr_embedding_level:
-            level_run.append(
-                {"level": lr_embedding_level, "text": lr, "complete": False}
-            )
-            lr = []
-            lr_embedding_level = bidi_char.embedding_level
-        lr.append(bidi_char)
-    level_run.append({"level": lr_embedding_level, "text": lr, "complete": False})
+def calculate_isolate_runs(
+    embedding_levels: List[int], original_bidi_classes: List[str]
+) -> List[Tuple[List[int], str, str]]:
+    """
+    BD13 and X10: split a paragraph in isolating run sequences.
+    Returns a list of (indices, sos, eos) tuples.
+    """
+    # Level runs, as [level, first index, end index]
+    level_runs = []
+    run_start = 0
+    for index in range(1, len(embedding_levels)):
+        if embedding_levels[index] != embedding_levels[run_start]:
+            level_runs.append((embedding_levels[run_start], run_start, index))
+            run_start = index
+    level_runs.append((embedding_levels[run_start], run_start, len(embedding_levels)))
 
     def level_to_direction(level: int) -> str:
         if level % 2 == 0:
@@ -468,57 +499,62 @@ def calculate_isolate_runs(paragraph: List[BidiCharacter]) -> List[IsolatingRun]
         return "R"
 
     # compute sos, eos for each level run
-    for index, lr in enumerate(level_run):
-        if lr["complete"]:
-            continue
+    boundaries = []
+    for index, (level, start, end) in enumerate(level_runs):
         if index == 0:
-            sos = level_to_direction(lr["level"])
+            sos = level_to_direction(level)
         else:
-            sos = level_to_direction(max(lr["level"], level_run[index - 1]["level"]))
-        if index == len(level_run) - 1:
-            eos = level_to_direction(lr["level"])
+            sos = level_to_direction(max(level, level_runs[index - 1][0]))
+        if index == len(level_runs) - 1:
+            eos = level_to_direction(level)
+        elif original_bidi_classes[end - 1] in ISOLATE_INITIATORS:
+            # X10 - last char is an isolator without matching PDI - set EOS to embedding level
+            eos = level_to_direction(level)
         else:
-            if lr["text"][-1].original_bidi_class in ("LRI", "RLI", "FSI"):
-                # X10 - last char is an isolator without matching PDI - set EOS to embedding level
-                eos = level_to_direction(lr["level"])
-            else:
-                eos = level_to_direction(
-                    max(lr["level"], level_run[index + 1]["level"])
-                )
-        lr["sos"] = sos
-        lr["eos"] = eos
+            eos = level_to_direction(max(level, level_runs[index + 1][0]))
+        boundaries.append((sos, eos))
 
     # combine levels runs to create isolate runs
     isolate_runs = []
-    for index, lr in enumerate(level_run):
-        if lr["complete"]:
+    complete = [False] * len(level_runs)
+    for index, (level, start, end) in enumerate(level_runs):
+        if complete[index]:
             continue
-        sos = lr["sos"]
-        eos = lr["eos"]
-        ir_chars = lr["text"]
-        lr["complete"] = True
-        if lr["text"][-1].original_bidi_class in ("LRI", "RLI", "FSI"):
-            for nlr in level_run[index + 1 :]:
-                if (
-                    nlr["level"] == lr["level"]
-                    and nlr["text"][0].original_bidi_class == "PDI"
-                ):
-                    lr["text"] += nlr["text"]
-                    nlr["complete"] = True
-                    eos = nlr["eos"]
-                    if nlr["text"][-1].original_bidi_class not in ("LRI", "RLI", "FSI"):
+        sos, eos = boundaries[index]
+        indices = list(range(start, end))
+        complete[index] = True
+        if original_bidi_classes[end - 1] in ISOLATE_INITIATORS:
+            for next_index in range(index + 1, len(level_runs)):
+                next_level, next_start, next_end = level_runs[next_index]
+                if next_level == level and original_bidi_classes[next_start] == "PDI":
+                    indices.extend(range(next_start, next_end))
+                    complete[next_index] = True
+                    eos = boundaries[next_index][1]
+                    if original_bidi_classes[next_end - 1] not in ISOLATE_INITIATORS:
                         break
-        isolate_runs.append(IsolatingRun(characters=ir_chars, sos=sos, eos=eos))
+        isolate_runs.append((indices, sos, eos))
 
     return isolate_runs
 
 
 class BidiParagraph:
+    """
+    Applies the Unicode Bidirectional Algorithm to a paragraph of text.
+
+    The algorithm state is kept in parallel lists, one item per character remaining after rule X9:
+    `text_indices` (position of the character in `text`), `bidi_classes`, `original_bidi_classes`
+    and `embedding_levels`. `BidiCharacter` objects are only built when requested.
+    """
+
     __slots__ = (
         "text",
         "base_direction",
         "debug",
         "base_embedding_level",
+        "text_indices",
+        "bidi_classes",
+        "original_bidi_classes",
+        "embedding_levels",
         "characters",
     )
 
@@ -535,23 +571,39 @@ class BidiParagraph:
         self.base_embedding_level = (
             0 if self.base_direction == TextDirection.LTR else 1
         )  # base level
-        self.characters: List[BidiCharacter] = []
+        self.text_indices: List[int] = []
+        self.bidi_classes: List[str] = []
+        self.original_bidi_classes: List[str] = []
+        self.embedding_levels: List[int] = []
+        self.characters: List[BidiCharacter] = None
         self.get_bidi_characters()
 
     def get_characters(self) -> List[BidiCharacter]:
+        if self.characters is None:
+            self.characters = [
+                BidiCharacter(
+                    text_index,
+                    self.text[text_index],
+                    self.bidi_classes[i],
+                    self.original_bidi_classes[i],
+                    self.embedding_levels[i],
+                )
+                for i, text_index in enumerate(self.text_indices)
+            ]
         return self.characters
 
     def get_characters_with_embedding_level(self) -> List[BidiCharacter]:
         # Calculate embedding level for each character after breaking isolating runs.
         # Only used on conformance testing
         self.reorder_resolved_levels()
-        return self.characters
+        return self.get_characters()
 
     def get_reordered_characters(self) -> List[BidiCharacter]:
         return self.reorder_resolved_levels()
 
     def get_all(self):
-        return self.characters, self.reorder_resolved_levels()
+        reordered_characters = self.reorder_resolved_levels()
+        return self.get_characters(), reordered_characters
 
     def get_reordered_string(self):
         "Used for conformance validation"
@@ -560,7 +612,33 @@ class BidiParagraph:
     def get_bidi_fragments(self):
         return self.split_bidi_fragments()
 
-    def get_bidi_characters(self) -> List[BidiCharacter]:
+    def get_bidi_characters(self) -> None:
+        if self.debug:
+            classes = [
+                "R" if char.isupper() else unicodedata.bidirectional(char)
+                for char in self.text
+            ]
+        else:
+            classes = [unicodedata.bidirectional(char) for char in self.text]
+        if not classes:
+            return
+        if EXPLICIT_BIDI_CLASSES.isdisjoint(classes):
+            # No explicit embedding, override or isolate: rules X1-X9 only assign
+            # the paragraph embedding level to every character.
+            self.text_indices = list(range(len(classes)))
+            self.bidi_classes = classes
+            self.original_bidi_classes = classes.copy()
+            self.embedding_levels = [self.base_embedding_level] * len(classes)
+        else:
+            self.resolve_explicit_levels(classes)
+            if not self.text_indices:
+                return
+        for indices, sos, eos in calculate_isolate_runs(
+            self.embedding_levels, self.original_bidi_classes
+        ):
+            IsolatingRun(self, indices, sos, eos)
+
+    def resolve_explicit_levels(self, classes: List[str]) -> None:
         # Explicit levels and directions. Rule X1
 
         stack: List[DirectionalStatus] = deque()
@@ -573,17 +651,15 @@ class BidiParagraph:
         overflow_isolate_count = 0
         overflow_embedding_count = 0
         valid_isolate_count = 0
-        results = []
 
         # Explicit embeddings. Process each character individually applying rules X2 through X8
-        for index, char in enumerate(self.text):
-            bidi_char = BidiCharacter(
-                index, char, current_status.embedding_level, self.debug
-            )
+        for index, original_bidi_class in enumerate(classes):
+            bidi_class = original_bidi_class
+            embedding_level = current_status.embedding_level
             new_bidi_class = None
 
-            if bidi_char.bidi_class == "FSI":
-                bidi_char.bidi_class = (
+            if bidi_class == "FSI":
+                bidi_class = (
                     "LRI"
                     if auto_detect_base_direction(
                         self.text[index + 1 :], stop_at_pdi=True, debug=self.debug
@@ -592,9 +668,9 @@ class BidiParagraph:
                     else "RLI"
                 )
 
-            if bidi_char.bidi_class in ("RLE", "LRE", "RLO", "LRO", "RLI", "LRI"):
+            if bidi_class in ("RLE", "LRE", "RLO", "LRO", "RLI", "LRI"):
                 # X2 - X5: calculate explicit embeddings and explicit overrides
-                if bidi_char.bidi_class[0] == "R":
+                if bidi_class[0] == "R":
                     new_embedding_level = (
                         current_status.embedding_level + 1
                     ) | 1  # least greater odd
@@ -603,7 +679,7 @@ class BidiParagraph:
                         current_status.embedding_level + 2
                     ) & ~1  # least greater even
                 if (
-                    bidi_char.bidi_class[2] == "I"
+                    bidi_class[2] == "I"
                     and current_status.directional_override_status != "N"
                 ):
                     new_bidi_class = current_status.directional_override_status
@@ -614,24 +690,22 @@ class BidiParagraph:
                 ):
                     current_status.embedding_level = new_embedding_level
                     current_status.directional_override_status = (
-                        bidi_char.bidi_class[0]
-                        if bidi_char.bidi_class[2] == "O"
-                        else "N"
+                        bidi_class[0] if bidi_class[2] == "O" else "N"
                     )
-                    if bidi_char.bidi_class[2] == "I":
+                    if bidi_class[2] == "I":
                         valid_isolate_count += 1
                         current_status.directional_isolate_status = True
                     else:
                         current_status.directional_isolate_status = False
                     stack.append(replace(current_status))
                 else:
-                    if bidi_char.bidi_class[2] == "I":
+                    if bidi_class[2] == "I":
                         overflow_isolate_count += 1
                     else:
                         if overflow_isolate_count == 0:
                             overflow_embedding_count += 1
 
-            if bidi_char.bidi_class not in (
+            if bidi_class not in (
                 "B",
                 "BN",
                 "RLE",
@@ -645,7 +719,7 @@ class BidiParagraph:
                 if current_status.directional_override_status != "N":
                     new_bidi_class = current_status.directional_override_status
 
-            if bidi_char.bidi_class == "PDI":  # X6a
+            if bidi_class == "PDI":  # X6a
                 if overflow_isolate_count > 0:
                     overflow_isolate_count -= 1
                 elif valid_isolate_count > 0:
@@ -659,11 +733,11 @@ class BidiParagraph:
                     current_status = replace(stack[-1])
                     valid_isolate_count -= 1
                 assert isinstance(current_status, DirectionalStatus)
-                bidi_char.embedding_level = current_status.embedding_level
+                embedding_level = current_status.embedding_level
                 if current_status.directional_override_status != "N":
                     new_bidi_class = current_status.directional_override_status
 
-            if bidi_char.bidi_class == "PDF":  # X7
+            if bidi_class == "PDF":  # X7
                 if overflow_isolate_count == 0:
                     if overflow_embedding_count > 0:
                         overflow_embedding_count -= 1
@@ -676,8 +750,8 @@ class BidiParagraph:
                             current_status = replace(stack[-1])
 
             if new_bidi_class:
-                bidi_char.bidi_class = new_bidi_class
-            if bidi_char.bidi_class not in (
+                bidi_class = new_bidi_class
+            if bidi_class not in (
                 "RLE",
                 "LRE",
                 "RLO",
@@ -685,65 +759,50 @@ class BidiParagraph:
                 "PDF",
                 "BN",
             ):  # X9
-                if bidi_char.bidi_class == "B":
-                    bidi_char.embedding_level = self.base_embedding_level
-                elif bidi_char.original_bidi_class not in ("LRI", "RLI", "FSI"):
-                    bidi_char.embedding_level = current_status.embedding_level
-                results.append(bidi_char)
-
-        if not results:
-            self.characters = []
-            return
-        self.characters = results
-        calculate_isolate_runs(results)
+                if bidi_class == "B":
+                    embedding_level = self.base_embedding_level
+                elif original_bidi_class not in ISOLATE_INITIATORS:
+                    embedding_level = current_status.embedding_level
+                self.text_indices.append(index)
+                self.bidi_classes.append(bidi_class)
+                self.original_bidi_classes.append(original_bidi_class)
+                self.embedding_levels.append(embedding_level)
 
     def split_bidi_fragments(self):
-        bidi_fragments = []
-        if len(self.characters) == 0:
+        if not self.text_indices:
             return ()
-        current_fragment = ""
-        current_direction = ""
-        for c in self.characters:
-            if c.get_direction_from_level() != current_direction:
-                if current_fragment:
-                    bidi_fragments.append(
-                        (
-                            current_fragment,
-                            (
-                                TextDirection.RTL
-                                if current_direction == "R"
-                                else TextDirection.LTR
-                            ),
-                        )
-                    )
-                current_fragment = ""
-                current_direction = c.get_direction_from_level()
-            current_fragment += c.character
-        if current_fragment:
-            bidi_fragments.append(
-                (
-                    current_fragment,
+        levels = self.embedding_levels
+        if len(self.text_indices) == len(self.text):
+            characters = self.text
+        else:  # some characters were removed by rule X9
+            characters = "".join(self.text[i] for i in self.text_indices)
+        bidi_fragments = []
+        start = 0
+        for i in range(1, len(levels) + 1):
+            if i == len(levels) or levels[i] % 2 != levels[start] % 2:
+                bidi_fragments.append(
                     (
-                        TextDirection.RTL
-                        if current_direction == "R"
-                        else TextDirection.LTR
-                    ),
+                        characters[start:i],
+                        TextDirection.RTL if levels[start] % 2 else TextDirection.LTR,
+                    )
                 )
-            )
+                start = i
         return tuple(bidi_fragments)
 
     def reorder_resolved_levels(self):
+        levels = self.embedding_levels
         before_separator = True
         end_of_line = True
         max_level = 0
         min_odd_level = 999
-        for bidi_char in reversed(self.characters):
+        for i in range(len(levels) - 1, -1, -1):
+            original_bidi_class = self.original_bidi_classes[i]
             # Rule L1. Reset the embedding level of segment separators, paragraph separators,
             # and any adjacent whitespace.
-            if bidi_char.original_bidi_class in ("S", "B"):
-                bidi_char.embedding_level = self.base_embedding_level
+            if original_bidi_class in ("S", "B"):
+                levels[i] = self.base_embedding_level
                 before_separator = True
-            elif bidi_char.original_bidi_class in (
+            elif original_bidi_class in (
                 "BN",
                 "WS",
                 "FSI",
@@ -752,36 +811,37 @@ class BidiParagraph:
                 "PDI",
             ):
                 if before_separator or end_of_line:
-                    bidi_char.embedding_level = self.base_embedding_level
+                    levels[i] = self.base_embedding_level
             else:
                 before_separator = False
                 end_of_line = False
 
-            if bidi_char.embedding_level > max_level:
-                max_level = bidi_char.embedding_level
-            if (
-                bidi_char.embedding_level % 2 != 0
-                and bidi_char.embedding_level < min_odd_level
-            ):
-                min_odd_level = bidi_char.embedding_level
+            if levels[i] > max_level:
+                max_level = levels[i]
+            if levels[i] % 2 != 0 and levels[i] < min_odd_level:
+                min_odd_level = levels[i]
+        if self.characters is not None:
+            for char, level in zip(self.characters, levels):
+                char.embedding_level = level
 
         # Rule L2. From the highest level found in the text to the lowest odd level on each line,
         # reverse any contiguous sequence of characters that are at that level or higher.
-        reordered_paragraph = self.characters.copy()
+        reordered_positions = list(range(len(levels)))
         for level in range(max_level, min_odd_level - 1, -1):
             temp_results = []
             rev = []
-            for bidi_char in reordered_paragraph:
-                if bidi_char.embedding_level >= level:
-                    rev.append(bidi_char)
+            for position in reordered_positions:
+                if levels[position] >= level:
+                    rev.append(position)
                 else:
                     if rev:
                         rev.reverse()
                         temp_results += rev
                         rev = []
-                    temp_results.append(bidi_char)
+                    temp_results.append(position)
             if rev:
                 rev.reverse()
                 temp_results += rev
-            reordered_paragraph = temp_results
-        return tuple(reordered_paragraph)
+            reordered_positions = temp_results
+        characters = self.get_characters()
+        return tuple(characters[position] for position in reordered_positions)
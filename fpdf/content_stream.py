@@ -0,0 +1,206 @@
+"""
+Peephole optimization of page content streams,
+enabled by setting `FPDF.optimize_content_streams` to `True`.
+
+The operators of a content stream are replayed while tracking the graphics & text state parameters they set,
+and the operators setting a parameter to its current value are dropped,
+as well as the empty `q`/`Q` & `BT`/`ET` pairs left behind.
+
+The contents of this module are internal to fpdf2, and not part of the public API.
+They may change at any time without prior warning or any deprecation period,
+in non-backward-compatible ways.
+"""
+
+import re
+
+TOKEN_REGEX = re.compile(
+    rb"""
+    (?P<ws>[\x00\t\n\x0c\r ]+|%[^\r\n]*)
+    |(?P<str>\((?:[^()\\]|\\.)*\))
+    |(?P<delim><<|>>|\[|\]|\{|\})
+    |(?P<hex><[^<>]*>)
+    |(?P<name>/[^\x00\t\n\x0c\r ()<>\[\]{}/%]*)
+    |(?P<regular>[^\x00\t\n\x0c\r ()<>\[\]{}/%]+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+NUMBER_REGEX = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+KEYWORD_OPERANDS = (b"true", b"false", b"null")
+
+# Operators setting a single state parameter, identified by the operator itself:
+PARAMETER_OPERATORS = {
+    b"w": "w",
+    b"J": "J",
+    b"j": "j",
+    b"M": "M",
+    b"d": "d",
+    b"ri": "ri",
+    b"i": "i",
+    b"G": "stroke_color",
+    b"RG": "stroke_color",
+    b"K": "stroke_color",
+    b"g": "fill_color",
+    b"rg": "fill_color",
+    b"k": "fill_color",
+    b"Tc": "Tc",
+    b"Tw": "Tw",
+    b"Tz": "Tz",
+    b"TL": "TL",
+    b"Tf": "Tf",
+    b"Tr": "Tr",
+    b"Ts": "Ts",
+}
+# Operators altering state parameters in ways that are not tracked:
+INVALIDATING_OPERATORS = {
+    b"CS": ("stroke_color",),
+    b"SC": ("stroke_color",),
+    b"SCN": ("stroke_color",),
+    b"cs": ("fill_color",),
+    b"sc": ("fill_color",),
+    b"scn": ("fill_color",),
+    b'"': ("Tw", "Tc"),
+    b"TD": ("TL",),  # sets the leading to the opposite of its 2nd operand
+    # An ExtGState can set any parameter but the colors:
+    b"gs": ("w", "J", "j", "M", "d", "ri", "i", "Tf"),
+}
+# Initial values of the state parameters at the beginning of each page,
+# cf. "8.4.1 Graphics state" & "9.3.1 Text state parameters and operators" of the PDF 2.0 spec:
+PAGE_INITIAL_STATE = {
+    "w": (1.0,),
+    "J": (0.0,),
+    "j": (0.0,),
+    "M": (10.0,),
+    "d": (b"[", b"]", 0.0),
+    "ri": (b"/RelativeColorimetric",),
+    "i": (0.0,),
+    "stroke_color": (b"G", 0.0),
+    "fill_color": (b"G", 0.0),
+    "Tc": (0.0,),
+    "Tw": (0.0,),
+    "Tz": (100.0,),
+    "TL": (0.0,),
+    "Tr": (0.0,),
+    "Ts": (0.0,),
+}
+# Operators that are dropped when immediately followed by their closing operator:
+PAIRED_OPERATORS = {b"Q": b"q", b"ET": b"BT"}
+
+
+class UnsupportedContentStream(Exception):
+    "Raised when a content stream contains constructs that the optimizer does not handle"
+
+
+def optimize_content_stream(contents):
+    """
+    Returns a copy of the content stream provided, without the operators setting
+    graphics or text state parameters to the value they already have.
+    The content stream is returned unchanged if it cannot be parsed.
+    """
+    try:
+        instructions = list(_parse_instructions(contents))
+    except UnsupportedContentStream:
+        return contents
+    # The output is built as a list of [instruction_bytes, whitespace_after] pairs:
+    output = []
+    output_operators = []
+    state = dict(PAGE_INITIAL_STATE)
+    state_stack = []
+    dropped = False
+    for start, end, operator, operands, gap in instructions:
+        if operator == b"q":
+            state_stack.append(state.copy())
+        elif operator == b"Q":
+            if not state_stack:  # unbalanced q/Q operators
+                return contents
+            state = state_stack.pop()
+        param = PARAMETER_OPERATORS.get(operator)
+        if param:
+            if param in ("stroke_color", "fill_color"):
+                # The same color can be set with an operator for the stroking or non-stroking color:
+                value = (operator.upper(), *operands)
+            else:
+                value = operands
+            if state.get(param) == value:
+                _drop(output, gap)
+                dropped = True
+                continue
+            state[param] = value
+        elif operator in INVALIDATING_OPERATORS:
+            for param in INVALIDATING_OPERATORS[operator]:
+                state.pop(param, None)
+        if output_operators and output_operators[-1] == PAIRED_OPERATORS.get(operator):
+            output.pop()
+            output_operators.pop()
+            _drop(output, gap)
+            dropped = True
+            continue
+        output.append([contents[start:end], gap])
+        output_operators.append(operator)
+    if not dropped:
+        return contents
+    prefix = contents[: instructions[0][0]] if instructions else b""
+    return prefix + b"".join(part for pair in output for part in pair)
+
+
+def _drop(output, gap):
+    # The whitespace following dropped instructions replaces the one preceding them,
+    # unless this would remove a line break:
+    if output and (b"\n" in gap or b"\n" not in output[-1][1]):
+        output[-1][1] = gap
+
+
+def _parse_instructions(contents):
+    """
+    Yields (start, end, operator, operands, gap) tuples, where `contents[start:end]`
+    is an instruction made of its operands followed by its operator,
+    and `gap` the whitespace & comments that follow it.
+    """
+    operands, start, end, operator = [], None, 0, None
+    pos, length = 0, len(contents)
+    while pos < length:
+        match = TOKEN_REGEX.match(contents, pos)
+        if not match:
+            if contents[pos : pos + 1] == b"(":  # string containing nested parentheses
+                token_end = _find_string_end(contents, pos)
+                kind, token = "str", contents[pos:token_end]
+            else:
+                raise UnsupportedContentStream(f"Invalid token at offset {pos}")
+        else:
+            kind, token, token_end = match.lastgroup, match.group(), match.end()
+        if kind == "ws":
+            pos = token_end
+            continue
+        if operator is not None:
+            yield start, end, operator, tuple(operands), contents[end:pos]
+            operands, start, operator = [], None, None
+        if start is None:
+            start = pos
+        if kind != "regular" or token in KEYWORD_OPERANDS:
+            operands.append(token)
+        elif NUMBER_REGEX.fullmatch(token):
+            operands.append(float(token))
+        elif token == b"BI":
+            raise UnsupportedContentStream("Inline images are not supported")
+        else:
+            operator, end = token, token_end
+        pos = token_end
+    if operator is None and operands:
+        raise UnsupportedContentStream("Content stream ends with dangling operands")
+    if operator is not None:
+        yield start, end, operator, tuple(operands), contents[end:]
+
+
+def _find_string_end(contents, pos):
+    depth = 0
+    while pos < len(contents):
+        char = contents[pos : pos + 1]
+        if char == b"\\":
+            pos += 1
+        elif char == b"(":
+            depth += 1
+        elif char == b")":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise UnsupportedContentStream("Unterminated string")
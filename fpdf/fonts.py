@@ -244,6 +244,11 @@ class CoreFont:
     def __repr__(self):
         return f"CoreFont(i={self.i}, fontkey={self.fontkey})"
 
+    def __deepcopy__(self, _memo):
+        # CoreFont instances are never modified once created,
+        # so they can be shared between a FPDF instance and the FPDFRecorder snapshots of it:
+        return self
+
 
 class TTFFont:
     __slots__ = (  # RAM usage optimization
@@ -478,12 +483,9 @@ class TTFFont:
         return buf.glyph_infos, buf.glyph_positions
 
     def encode_text(self, text):
-        txt_mapped = ""
-        for char in text:
-            uni = ord(char)
-            # Instead of adding the actual character to the stream its code is
-            # mapped to a position in the font's subset
-            txt_mapped += chr(self.subset.pick(uni))
+        # Instead of adding the actual characters to the stream, their codes are
+        # mapped to their positions in the font's subset
+        txt_mapped = self.subset.translate(text)
         return f'({escape_parens(txt_mapped.encode("utf-16-be").decode("latin-1"))}) Tj'
 
     def shape_text(self, text, font_size_pt, text_shaping_params):
@@ -622,6 +624,9 @@ class SubsetMap:
 
         # Maps Glyph instances to character IDs (integers):
         self._char_id_per_glyph = {}
+        # Translation table for str.translate(), mapping unicode code points
+        # to the characters whose code is their position in the subset:
+        self._translation_table = {}
         for x in self._reserved:
             glyph = self.get_glyph(unicode=x)
             if glyph:
@@ -648,6 +653,21 @@ class SubsetMap:
             self.font.missing_glyphs.append(unicode)
         return self.pick_glyph(glyph)
 
+    def translate(self, text: str) -> str:
+        """
+        Map all the characters of a string to their positions in the subset, at once.
+        Characters without any glyph in the font are dropped.
+        """
+        table = self._translation_table
+        # Code points are picked in order of appearance, like single calls to .pick():
+        for char in dict.fromkeys(text):
+            unicode = ord(char)
+            if unicode in table:
+                continue
+            char_id = self.pick(unicode)
+            table[unicode] = chr(char_id) if char_id else None
+        return text.translate(table)
+
     def pick_glyph(self, glyph):
         char_id = self._char_id_per_glyph.get(glyph)
         if glyph and char_id is None:
@@ -52,7 +52,7 @@ from .annotations import (
     PDFAnnotation,
     PDFEmbeddedFile,
 )
-from .bidi import BidiParagraph, auto_detect_base_direction
+from .bidi import BidiParagraph, auto_detect_base_direction, is_ltr_only
 from .deprecation import (
     WarnOnDeprecatedModuleAttributes,
     get_stack_level,
@@ -108,14 +108,16 @@ from .image_datastructures import (
 )
 from .image_parsing import (
     SUPPORTED_IMAGE_FILTERS,
-    get_img_info,
-    load_image,
+    get_img_variant_info,
     preload_image,
 )
 from .linearization import LinearizedOutputProducer
 from .line_break import (
     Fragment,
+    LayoutCache,
+    LineBox,
     MultiLineBreak,
+    TextLayout,
     TextLine,
     TotalPagesSubstitutionFragment,
 )
@@ -139,7 +141,7 @@ from .table import Table, draw_box_borders
 from .text_region import TextRegionMixin, TextColumns
 from .transitions import Transition
 from .unicode_script import UnicodeScript, get_unicode_script
-from .util import get_scale_factor, Padding
+from .util import freeze, get_scale_factor, Padding
 
 # Public global variables:
 FPDF_VERSION = "2.8.3"
@@ -367,11 +369,14 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
         self._page_mode = None
         self.viewer_preferences = None  # optional instance of ViewerPreferences
         self.compress = True  # switch enabling pages content compression
+        # switch enabling the removal of redundant operators from pages content streams:
+        self.optimize_content_streams = False
         self.pdf_version = "1.3"  # Set default PDF version No.
         self.creation_date = datetime.now(timezone.utc)
         self._security_handler = None
         self._fallback_font_ids = []
         self._fallback_font_exact_match = False
+        self._layout_cache = None  # optional instance of LayoutCache
 
         self._current_draw_context = None
         self._drawing_graphics_state_registry = GraphicsStateDictRegistry()
@@ -2333,6 +2338,51 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
         self._fallback_font_ids = tuple(fallback_font_ids)
         self._fallback_font_exact_match = exact_match
 
+    def set_layout_cache(self, max_size=256):
+        """
+        Enable caching of the line wrapping performed by `multi_cell()`.
+
+        When a paragraph is rendered several times with the same text, style, width
+        and wrapping options (table headers, repeated labels, identical table cells...),
+        its parsing and line breaking are only performed once.
+        Texts including page number aliases or markdown links are never cached.
+
+        Args:
+            max_size (int): maximum number of paragraphs kept in the cache,
+                the least recently used ones being evicted first.
+                `0` or `None` disables the cache. Default value: 256.
+        """
+        self._layout_cache = LayoutCache(max_size) if max_size else None
+
+    def _get_text_layout_key(self, text, markdown, *layout_params):
+        """
+        Build a hashable key identifying how some text would be laid out
+        with the current text style, for use with `self._layout_cache`.
+        Returns None if this text cannot be cached.
+        """
+        if self.str_alias_nb_pages and self.str_alias_nb_pages in text:
+            # Pages number placeholders are stateful fragments
+            return None
+        gstate = self._get_current_graphics_state()
+        # Not related to the text layout:
+        del gstate["current_font_is_set_on_page"]
+        if gstate["text_shaping"]:
+            # Computed from the text, while preloading bidirectional text:
+            gstate["text_shaping"] = {
+                key: value
+                for key, value in gstate["text_shaping"].items()
+                if key not in ("fragment_direction", "paragraph_direction")
+            }
+        return (
+            text,
+            markdown,
+            freeze(gstate),
+            self.k,
+            tuple(self._fallback_font_ids),
+            self._fallback_font_exact_match,
+            layout_params,
+        )
+
     def add_link(self, y=0, x=0, page=-1, zoom="null"):
         """
         Creates a new internal link and returns its identifier.
@@ -3400,6 +3450,7 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
         current_char_spacing = self.char_spacing
         fill_color_changed = False
         last_used_color = self.fill_color
+        text_substitutions = []  # pages number placeholders in this line
         if fragments:
             if text_line.align == Align.R:
                 dx = w - l_c_margin - styled_txt_width
@@ -3420,7 +3471,7 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
             underlines, strikethroughs = [], []
             for i, frag in enumerate(fragments):
                 if isinstance(frag, TotalPagesSubstitutionFragment):
-                    self.pages[self.page].add_text_substitution(frag)
+                    text_substitutions.append(frag)
                 if frag.graphics_state["text_color"] != last_used_color:
                     # allow to change color within the line of text.
                     last_used_color = frag.graphics_state["text_color"]
@@ -3574,7 +3625,25 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
             else:
                 s = " ".join(sl)
             # pylint: enable=too-many-boolean-expressions
+            if text_substitutions:
+                page = self.pages[self.page]
+                line_offset = len(page.contents)
             self._out(s)
+            if text_substitutions:
+                # Recording the placeholders positions, so that they can be replaced in place by .output().
+                # If the line has not been appended to the page contents, because _out() has been disabled
+                # or overridden, the placeholders will be searched for instead:
+                written = len(page.contents) == line_offset + len(s) + 1
+                position = 0
+                for frag in text_substitutions:
+                    placeholder = frag.get_placeholder_string()
+                    position = s.index(placeholder, position)
+                    page.add_text_substitution(
+                        frag,
+                        line_offset + position if written else None,
+                        len(placeholder),
+                    )
+                    position += len(placeholder)
         # If the text is empty, h = max_font_size ends up as 0.
         # We still need a valid default height for self.ln() (issue #601).
         self._lasth = h or self.font_size
@@ -3629,6 +3698,14 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
         """
         if not self.text_shaping:
             return self._preload_font_styles(text, markdown)
+        if (
+            text
+            and self.text_shaping["direction"] in (None, TextDirection.LTR)
+            and is_ltr_only(text)
+        ):
+            # Fast path: the bidirectional algorithm would produce a single LTR fragment
+            self._set_text_shaping_directions(TextDirection.LTR, TextDirection.LTR)
+            return self._preload_font_styles(text, markdown)
         paragraph_direction = (
             self.text_shaping["direction"]
             if self.text_shaping["direction"]
@@ -3637,14 +3714,21 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
 
         paragraph = BidiParagraph(text=text, base_direction=paragraph_direction)
         directional_segments = paragraph.get_bidi_fragments()
-        self.text_shaping["paragraph_direction"] = paragraph.base_direction
-
         fragments = []
         for bidi_text, bidi_direction in directional_segments:
-            self.text_shaping["fragment_direction"] = bidi_direction
+            self._set_text_shaping_directions(paragraph.base_direction, bidi_direction)
             fragments += self._preload_font_styles(bidi_text, markdown)
         return tuple(fragments)
 
+    def _set_text_shaping_directions(self, paragraph_direction, fragment_direction):
+        # The text shaping parameters are replaced instead of being modified in place,
+        # as they may be shared with an enclosing local context:
+        self.text_shaping = {
+            **self.text_shaping,
+            "paragraph_direction": paragraph_direction,
+            "fragment_direction": fragment_direction,
+        }
+
     def _preload_font_styles(self, text, markdown):
         """
         When Markdown styling is enabled, we require secondary fonts
@@ -3720,16 +3804,16 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
                     if seq > 0:
                         yield TotalPagesSubstitutionFragment(
                             self.str_alias_nb_pages,
-                            self._get_current_graphics_state(),
+                            self._get_fragment_graphics_state(),
                             self.k,
                         )
                     if fragment_text:
                         yield Fragment(
-                            fragment_text, self._get_current_graphics_state(), self.k
+                            fragment_text, self._get_fragment_graphics_state(), self.k
                         )
                 return
 
-            yield Fragment(text, self._get_current_graphics_state(), self.k)
+            yield Fragment(text, self._get_fragment_graphics_state(), self.k)
             return
         txt_frag, in_bold, in_italics, in_strikethrough, in_underline = (
             [],
@@ -3740,25 +3824,38 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
         )
         current_fallback_font = None
         current_text_script = None
+        # The graphics state does not change while parsing:
+        # fragments sharing the same style share the same GraphicsState
+        graphics_states = {}
+
+        def get_graphics_state(**overrides):
+            key = tuple(overrides.items())
+            gstate = graphics_states.get(key)
+            if gstate is None:
+                gstate = self._get_fragment_graphics_state(**overrides)
+                graphics_states[key] = gstate
+            return gstate
 
         def frag():
             nonlocal txt_frag, current_fallback_font, current_text_script
-            gstate = self._get_current_graphics_state()
-            gstate["font_style"] = ("B" if in_bold else "") + (
-                "I" if in_italics else ""
-            )
-            gstate["strikethrough"] = in_strikethrough
-            gstate["underline"] = in_underline
             if current_fallback_font:
-                gstate["font_family"] = "".join(
-                    c for c in current_fallback_font if c.islower()
-                )
-                gstate["font_style"] = "".join(
-                    c for c in current_fallback_font if c.isupper()
+                gstate = get_graphics_state(
+                    font_style="".join(c for c in current_fallback_font if c.isupper()),
+                    strikethrough=in_strikethrough,
+                    underline=in_underline,
+                    font_family="".join(
+                        c for c in current_fallback_font if c.islower()
+                    ),
+                    current_font=self.fonts[current_fallback_font],
                 )
-                gstate["current_font"] = self.fonts[current_fallback_font]
                 current_fallback_font = None
                 current_text_script = None
+            else:
+                gstate = get_graphics_state(
+                    font_style=("B" if in_bold else "") + ("I" if in_italics else ""),
+                    strikethrough=in_strikethrough,
+                    underline=in_underline,
+                )
             fragment = Fragment(
                 txt_frag,
                 gstate,
@@ -3795,15 +3892,14 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
                 if text[: len(self.str_alias_nb_pages)] == self.str_alias_nb_pages:
                     if txt_frag:
                         yield frag()
-                    gstate = self._get_current_graphics_state()
-                    gstate["font_style"] = ("B" if in_bold else "") + (
-                        "I" if in_italics else ""
-                    )
-                    gstate["strikethrough"] = in_strikethrough
-                    gstate["underline"] = in_underline
                     yield TotalPagesSubstitutionFragment(
                         self.str_alias_nb_pages,
-                        gstate,
+                        get_graphics_state(
+                            font_style=("B" if in_bold else "")
+                            + ("I" if in_italics else ""),
+                            strikethrough=in_strikethrough,
+                            underline=in_underline,
+                        ),
                         self.k,
                     )
                     text = text[len(self.str_alias_nb_pages) :]
@@ -3844,10 +3940,15 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
                     link_text, link_dest, text = is_link.groups()
                     if txt_frag:
                         yield frag()
-                    gstate = self._get_current_graphics_state()
-                    gstate["underline"] = self.MARKDOWN_LINK_UNDERLINE
                     if self.MARKDOWN_LINK_COLOR:
-                        gstate["text_color"] = self.MARKDOWN_LINK_COLOR
+                        gstate = get_graphics_state(
+                            underline=self.MARKDOWN_LINK_UNDERLINE,
+                            text_color=self.MARKDOWN_LINK_COLOR,
+                        )
+                    else:
+                        gstate = get_graphics_state(
+                            underline=self.MARKDOWN_LINK_UNDERLINE
+                        )
                     try:
                         page = int(link_dest)
                         link_dest = self.add_link(page=page)
@@ -3970,6 +4071,182 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
             # restore writing function:
             del self._out
 
+    def _get_text_lines(
+        self, text, w, clearance_margins, align, markdown, print_sh, wrapmode
+    ):
+        """
+        Split some text into styled fragments, then wrap them into `TextLine`s
+        fitting in the given width.
+        The result is reused from `self._layout_cache` if it is enabled.
+        """
+        normalized_string = self.normalize_text(text).replace("\r", "")
+        layout_key = (
+            self._get_text_layout_key(
+                normalized_string,
+                markdown,
+                w,
+                tuple(clearance_margins),
+                align,
+                print_sh,
+                wrapmode,
+            )
+            if self._layout_cache is not None
+            else None
+        )
+        text_lines = self._layout_cache.get(layout_key) if layout_key else None
+        if text_lines is None:
+            styled_text_fragments = (
+                self._preload_bidirectional_text(normalized_string, markdown)
+                if self.text_shaping
+                else self._preload_font_styles(normalized_string, markdown)
+            )
+            text_lines = []
+            multi_line_break = MultiLineBreak(
+                styled_text_fragments,
+                w,
+                clearance_margins,
+                align=align,
+                print_sh=print_sh,
+                wrapmode=wrapmode,
+            )
+            text_line = multi_line_break.get_line()
+            while (text_line) is not None:
+                text_lines.append(text_line)
+                text_line = multi_line_break.get_line()
+            if layout_key and not any(frag.link for frag in styled_text_fragments):
+                self._layout_cache.put(layout_key, text_lines)
+        elif markdown and any(
+            frag.font_style != self.font_style
+            for text_line in text_lines
+            for frag in text_line.fragments
+        ):
+            # Preloading markdown font styles would have switched the current font back and forth:
+            self.current_font_is_set_on_page = False
+        return text_lines
+
+    def measure_multi_cell(
+        self,
+        w,
+        h=None,
+        text="",
+        align=Align.J,
+        max_line_height=None,
+        markdown=False,
+        print_sh=False,
+        wrapmode: WrapMode = WrapMode.WORD,
+        center=False,
+        padding=0,
+    ):
+        """
+        Compute how `multi_cell()` would lay out some text from the current position,
+        without rendering anything, adding any page, nor moving the current position.
+
+        This is much cheaper than calling `multi_cell(dry_run=True)`,
+        and can be used to know the height of some text before rendering it.
+        The parameters have the same meaning as the ones of `multi_cell()`.
+
+        Known limitation: the lines following a page break are positioned
+        at the top margin of the next page, ignoring any content rendered by `header()`.
+
+        Args:
+            w (float): cell width. If 0, they extend up to the right margin of the page.
+            h (float): height of a single line of text.  Default value: None, meaning to use the current font size.
+            text (str): string to lay out.
+            align (fpdf.enums.Align, str): text alignment inside the cell. Default value: J (justify).
+            max_line_height (float): optional maximum height of each line.
+            markdown (bool): enable minimal markdown-like markup. Default to False.
+            print_sh (bool): treat a soft-hyphen (\\u00ad) as a normal printable character.
+            wrapmode (fpdf.enums.WrapMode): "WORD" for word based line wrapping (default),
+                "CHAR" for character based line wrapping.
+            center (bool): center the cell horizontally on the page.
+            padding (float or Sequence): padding to apply around the text. Default value: 0.
+
+        Returns: a `fpdf.line_break.TextLayout` describing the lines of text,
+            their positions and the total height of the cell, including padding.
+        """
+        padding = Padding.new(padding)
+        wrapmode = WrapMode.coerce(wrapmode)
+        align = Align.coerce(align)
+        if not self.font_family:
+            raise FPDFException("No font set, you need to call set_font() beforehand")
+        if isinstance(w, str) or isinstance(h, str):
+            raise ValueError(
+                "Parameter 'w' and 'h' must be numbers, not strings."
+                " You can omit them by passing string content with text="
+            )
+        if h is None:
+            h = self.font_size
+        if w == 0:
+            w = self.w - self.r_margin - self.x
+        w = w - padding.right - padding.left
+        clearance_margins = []
+        if not padding.left:
+            clearance_margins.append(self.c_margin)
+        if not padding.right:
+            clearance_margins.append(self.c_margin)
+        x = self.x + padding.left if align != Align.X else self.x
+        if center:
+            x = self.w / 2 if align == Align.X else self.l_margin + (self.epw - w) / 2
+        if align == Align.X:
+            x -= w / 2
+
+        prev_font_is_set_on_page = self.current_font_is_set_on_page
+        text_lines = self._get_text_lines(
+            text,
+            w,
+            clearance_margins,
+            align=align,
+            markdown=markdown,
+            print_sh=print_sh,
+            wrapmode=wrapmode,
+        )
+        self.current_font_is_set_on_page = prev_font_is_set_on_page
+        if not text_lines:
+            text_lines = [
+                TextLine(
+                    "",
+                    text_width=0,
+                    number_of_spaces=0,
+                    align=align,
+                    height=h,
+                    max_width=w,
+                    trailing_nl=False,
+                )
+            ]
+        if max_line_height is None or len(text_lines) == 1:
+            line_height = h
+        else:
+            line_height = min(h, max_line_height)
+
+        line_boxes, page_breaks = [], []
+        y = self.y + padding.top
+        total_height = 0
+        for text_line_index, text_line in enumerate(text_lines):
+            if (
+                y + h + padding.bottom > self.page_break_trigger
+                and not self.in_footer
+                and self.accept_page_break
+            ):
+                page_breaks.append(text_line_index)
+                y = self.t_margin + padding.top
+            line_boxes.append(
+                LineBox(
+                    text_line,
+                    page_offset=len(page_breaks),
+                    x=x,
+                    y=y,
+                    w=text_line.text_width,
+                    h=line_height,
+                )
+            )
+            y += line_height
+            total_height += line_height
+        return TextLayout(
+            lines=tuple(line_boxes),
+            height=max(total_height, h) + padding.top + padding.bottom,
+            page_breaks=tuple(page_breaks),
+        )
+
     @check_page
     @support_deprecated_txt_arg
     def multi_cell(
@@ -4161,33 +4438,20 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
             )
             prev_x = self.x
 
-        # Calculate text length
-        text = self.normalize_text(text)
-        normalized_string = text.replace("\r", "")
-        styled_text_fragments = (
-            self._preload_bidirectional_text(normalized_string, markdown)
-            if self.text_shaping
-            else self._preload_font_styles(normalized_string, markdown)
-        )
-
-        prev_current_font = self.current_font
-        prev_font_style = self.font_style
-        prev_underline = self.underline
-        total_height = 0
-
-        text_lines = []
-        multi_line_break = MultiLineBreak(
-            styled_text_fragments,
+        text_lines = self._get_text_lines(
+            text,
             maximum_allowed_width,
             clearance_margins,
             align=align,
+            markdown=markdown,
             print_sh=print_sh,
             wrapmode=wrapmode,
         )
-        text_line = multi_line_break.get_line()
-        while (text_line) is not None:
-            text_lines.append(text_line)
-            text_line = multi_line_break.get_line()
+
+        prev_current_font = self.current_font
+        prev_font_style = self.font_style
+        prev_underline = self.underline
+        total_height = 0
 
         if not text_lines:  # ensure we display at least one cell - cf. issue #349
             text_lines = [
@@ -4732,13 +4996,10 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
                     if info["w"] * info["h"] < dims[0] * dims[1]:
                         # The existing low-res image is too small, we need a bigger low-res image:
                         info.update(
-                            get_img_info(
-                                name,
-                                img or load_image(name),
-                                self.image_cache.image_filter,
-                                dims,
-                            )
+                            get_img_variant_info(self.image_cache, name, img, dims)
                         )
+                        if self.image_cache.spill_file:
+                            self.image_cache.spill_file.spill_image(info)
                         LOGGER.debug(
                             "OVERSIZED: Updated low-res image with name=%s id=%d to dims=%s",
                             lowres_name,
@@ -4747,16 +5008,11 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
                         )
                     info["usages"] += 1
                 else:
-                    info = RasterImageInfo(
-                        get_img_info(
-                            name,
-                            img or load_image(name),
-                            self.image_cache.image_filter,
-                            dims,
-                        )
-                    )
+                    info = get_img_variant_info(self.image_cache, name, img, dims)
                     info["i"] = len(images) + 1
                     info["usages"] = 1
+                    if self.image_cache.spill_file:
+                        self.image_cache.spill_file.spill_image(info)
                     images[lowres_name] = info
                     LOGGER.debug(
                         "OVERSIZED: Generated new low-res image with name=%s dims=%s id=%d",
@@ -5122,6 +5378,7 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
             s = s.encode("latin1")
         if not self.page:
             raise FPDFException("No page open, you need to call add_page() first")
+        # Pages contents are only ever appended to, cf. fpdf.recorder.PagesJournal:
         self.pages[self.page].contents += s + b"\n"
 
     @check_page
@@ -5311,12 +5568,6 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
         """
         Ensures that all rendering performed in this context appear on a single page
         by performing page break beforehand if need be.
-
-        Notes
-        -----
-
-        Using this method means to duplicate the FPDF `bytearray` buffer:
-        when generating large PDFs, doubling memory usage may be troublesome.
         """
         prev_page, prev_y = self.page, self.y
         recorder = FPDFRecorder(self, accept_page_break=False)
@@ -5472,14 +5723,10 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
             align = Align.L
             if isinstance(text_style.l_margin, (Align, str)):
                 align = Align.coerce(text_style.l_margin)
-            page_break_triggered = self.multi_cell(
+            text_layout = self.measure_multi_cell(
                 w=self.epw,
                 h=self.font_size,
                 text=name,
-                new_x=XPos.LMARGIN,
-                new_y=YPos.NEXT,
-                dry_run=True,  # => does not produce any output
-                output=MethodReturnValue.PAGE_BREAK,
                 align=align,
                 padding=Padding(
                     top=text_style.t_margin or 0,
@@ -5493,7 +5740,7 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
             )
             if text_style.size_pt is not None:
                 self.font_size_pt = prev_font_size_pt
-            if page_break_triggered:
+            if text_layout.page_breaks:
                 # If so, we trigger a page break manually beforehand:
                 self.add_page()
             with self._marked_sequence(title=name) as struct_elem:
@@ -5615,6 +5862,9 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
                 first_row_as_headings needs to be True if num_heading_rows>1 and False if num_heading_rows=0. For backwards compatibility,
                 first_row_as_headings is used in case num_heading_rows is 1.
             repeat_headings (fpdf.enums.TableHeadingsDisplay): optional, indicates whether to print table headings on every page, default to 1.
+            streaming (bool): optional, default to False. Render rows as soon as they are complete,
+                instead of once the table is finished, and release them once rendered,
+                so that memory usage does not grow with the number of rows.
         """
         table = Table(self, *args, **kwargs)
         yield table
@@ -5658,19 +5908,13 @@ class FPDF(GraphicsStateMixin, TextRegionMixin):
                 self._insert_table_of_contents()
             if self.str_alias_nb_pages:
                 for page in self.pages.values():
-                    for substitution_item in page.get_text_substitutions():
-                        page.contents = page.contents.replace(
-                            substitution_item.get_placeholder_string().encode(
-                                "latin-1"
-                            ),
-                            substitution_item.render_text_substitution(
-                                str(self.pages_count)
-                            ).encode("latin-1"),
-                        )
+                    page.substitute_texts(str(self.pages_count))
             if linearize:
                 output_producer_class = LinearizedOutputProducer
             output_producer = output_producer_class(self)
             self.buffer = output_producer.bufferize()
+            # Releasing the decoded images kept to build low-res variants:
+            self.image_cache.variant_sources.clear()
         if name:
             if isinstance(name, os.PathLike):
                 name.write_bytes(self.buffer)
@@ -7,10 +7,12 @@ in non-backward-compatible ways.
 """
 
 from copy import copy
+from weakref import WeakValueDictionary
 
 from .drawing import DeviceGray
 from .enums import CharVPos, TextEmphasis, TextMode
 from .fonts import FontFace
+from .util import freeze
 
 
 class GraphicsStateMixin:
@@ -64,7 +66,9 @@ class GraphicsStateMixin:
     def _push_local_stack(self, new=None):
         "Push a graphics state on the stack"
         if not new:
-            new = self._get_current_graphics_state()
+            # Copy-on-write: the current state is shared with the new stack level,
+            # and will only be copied when modified, by __get_writable_state()
+            new = self.__statestack[-1]
         self.__statestack.append(new)
         return new
 
@@ -72,6 +76,14 @@ class GraphicsStateMixin:
         "Pop the last graphics state on the stack"
         return self.__statestack.pop()
 
+    def __get_writable_state(self):
+        "Return the current graphics state, copying it first if it is shared with the previous stack level"
+        stack = self.__statestack
+        state = stack[-1]
+        if len(stack) > 1 and state is stack[-2]:
+            state = stack[-1] = copy(state)
+        return state
+
     def _get_current_graphics_state(self):
         "Retrieve the current graphics state"
         # "current_font" must be shallow copied
@@ -81,6 +93,14 @@ class GraphicsStateMixin:
         gs["text_shaping"] = copy(gs["text_shaping"])
         return gs
 
+    def _get_fragment_graphics_state(self, **overrides):
+        """
+        Retrieve the current graphics state, with some optional overridden values,
+        as an immutable `GraphicsState`, to be attached to a text fragment
+        """
+        gs = self.__statestack[-1]
+        return GraphicsState.intern({**gs, **overrides} if overrides else gs)
+
     def _is_current_graphics_state_nested(self):
         "Indicate if the stack contains items (else it is empty)"
         return len(self.__statestack) > 1
@@ -91,7 +111,7 @@ class GraphicsStateMixin:
 
     @draw_color.setter
     def draw_color(self, v):
-        self.__statestack[-1]["draw_color"] = v
+        self.__get_writable_state()["draw_color"] = v
 
     @property
     def fill_color(self):
@@ -99,7 +119,7 @@ class GraphicsStateMixin:
 
     @fill_color.setter
     def fill_color(self, v):
-        self.__statestack[-1]["fill_color"] = v
+        self.__get_writable_state()["fill_color"] = v
 
     @property
     def text_color(self):
@@ -107,7 +127,7 @@ class GraphicsStateMixin:
 
     @text_color.setter
     def text_color(self, v):
-        self.__statestack[-1]["text_color"] = v
+        self.__get_writable_state()["text_color"] = v
 
     @property
     def underline(self):
@@ -115,7 +135,7 @@ class GraphicsStateMixin:
 
     @underline.setter
     def underline(self, v):
-        self.__statestack[-1]["underline"] = v
+        self.__get_writable_state()["underline"] = v
 
     @property
     def strikethrough(self):
@@ -123,7 +143,7 @@ class GraphicsStateMixin:
 
     @strikethrough.setter
     def strikethrough(self, v):
-        self.__statestack[-1]["strikethrough"] = v
+        self.__get_writable_state()["strikethrough"] = v
 
     @property
     def font_style(self):
@@ -131,7 +151,7 @@ class GraphicsStateMixin:
 
     @font_style.setter
     def font_style(self, v):
-        self.__statestack[-1]["font_style"] = v
+        self.__get_writable_state()["font_style"] = v
 
     @property
     def font_stretching(self):
@@ -139,7 +159,7 @@ class GraphicsStateMixin:
 
     @font_stretching.setter
     def font_stretching(self, v):
-        self.__statestack[-1]["font_stretching"] = v
+        self.__get_writable_state()["font_stretching"] = v
 
     @property
     def char_spacing(self):
@@ -147,7 +167,7 @@ class GraphicsStateMixin:
 
     @char_spacing.setter
     def char_spacing(self, v):
-        self.__statestack[-1]["char_spacing"] = v
+        self.__get_writable_state()["char_spacing"] = v
 
     @property
     def font_family(self):
@@ -155,7 +175,7 @@ class GraphicsStateMixin:
 
     @font_family.setter
     def font_family(self, v):
-        self.__statestack[-1]["font_family"] = v
+        self.__get_writable_state()["font_family"] = v
 
     @property
     def font_size_pt(self):
@@ -163,7 +183,7 @@ class GraphicsStateMixin:
 
     @font_size_pt.setter
     def font_size_pt(self, v):
-        self.__statestack[-1]["font_size_pt"] = v
+        self.__get_writable_state()["font_size_pt"] = v
 
     @property
     def font_size(self):
@@ -171,7 +191,7 @@ class GraphicsStateMixin:
 
     @font_size.setter
     def font_size(self, v):
-        self.__statestack[-1]["font_size_pt"] = v * self.k
+        self.__get_writable_state()["font_size_pt"] = v * self.k
 
     @property
     def current_font(self):
@@ -179,7 +199,7 @@ class GraphicsStateMixin:
 
     @current_font.setter
     def current_font(self, v):
-        self.__statestack[-1]["current_font"] = v
+        self.__get_writable_state()["current_font"] = v
 
     @property
     def current_font_is_set_on_page(self):
@@ -187,7 +207,7 @@ class GraphicsStateMixin:
 
     @current_font_is_set_on_page.setter
     def current_font_is_set_on_page(self, v):
-        self.__statestack[-1]["current_font_is_set_on_page"] = v
+        self.__get_writable_state()["current_font_is_set_on_page"] = v
 
     @property
     def dash_pattern(self):
@@ -195,7 +215,7 @@ class GraphicsStateMixin:
 
     @dash_pattern.setter
     def dash_pattern(self, v):
-        self.__statestack[-1]["dash_pattern"] = v
+        self.__get_writable_state()["dash_pattern"] = v
 
     @property
     def line_width(self):
@@ -203,7 +223,7 @@ class GraphicsStateMixin:
 
     @line_width.setter
     def line_width(self, v):
-        self.__statestack[-1]["line_width"] = v
+        self.__get_writable_state()["line_width"] = v
 
     @property
     def text_mode(self):
@@ -211,7 +231,7 @@ class GraphicsStateMixin:
 
     @text_mode.setter
     def text_mode(self, v):
-        self.__statestack[-1]["text_mode"] = TextMode.coerce(v)
+        self.__get_writable_state()["text_mode"] = TextMode.coerce(v)
 
     @property
     def char_vpos(self):
@@ -227,7 +247,7 @@ class GraphicsStateMixin:
         Set vertical character position relative to line.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["char_vpos"] = CharVPos.coerce(v)
+        self.__get_writable_state()["char_vpos"] = CharVPos.coerce(v)
 
     @property
     def sub_scale(self):
@@ -243,7 +263,7 @@ class GraphicsStateMixin:
         Set scale factor for subscript text.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["sub_scale"] = float(v)
+        self.__get_writable_state()["sub_scale"] = float(v)
 
     @property
     def sup_scale(self):
@@ -259,7 +279,7 @@ class GraphicsStateMixin:
         Set scale factor for superscript text.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["sup_scale"] = float(v)
+        self.__get_writable_state()["sup_scale"] = float(v)
 
     @property
     def nom_scale(self):
@@ -275,7 +295,7 @@ class GraphicsStateMixin:
         Set scale factor for nominator text.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["nom_scale"] = float(v)
+        self.__get_writable_state()["nom_scale"] = float(v)
 
     @property
     def denom_scale(self):
@@ -291,7 +311,7 @@ class GraphicsStateMixin:
         Set scale factor for denominator text.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["denom_scale"] = float(v)
+        self.__get_writable_state()["denom_scale"] = float(v)
 
     @property
     def sub_lift(self):
@@ -307,7 +327,7 @@ class GraphicsStateMixin:
         Set lift factor for subscript text.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["sub_lift"] = float(v)
+        self.__get_writable_state()["sub_lift"] = float(v)
 
     @property
     def sup_lift(self):
@@ -323,7 +343,7 @@ class GraphicsStateMixin:
         Set lift factor for superscript text.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["sup_lift"] = float(v)
+        self.__get_writable_state()["sup_lift"] = float(v)
 
     @property
     def nom_lift(self):
@@ -339,7 +359,7 @@ class GraphicsStateMixin:
         Set lift factor for nominator text.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["nom_lift"] = float(v)
+        self.__get_writable_state()["nom_lift"] = float(v)
 
     @property
     def denom_lift(self):
@@ -355,7 +375,7 @@ class GraphicsStateMixin:
         Set lift factor for denominator text.
         ([docs](../TextStyling.html#subscript-superscript-and-fractional-numbers))
         """
-        self.__statestack[-1]["denom_lift"] = float(v)
+        self.__get_writable_state()["denom_lift"] = float(v)
 
     @property
     def text_shaping(self):
@@ -363,7 +383,7 @@ class GraphicsStateMixin:
 
     @text_shaping.setter
     def text_shaping(self, v):
-        self.__statestack[-1]["text_shaping"] = v
+        self.__get_writable_state()["text_shaping"] = v
 
     def font_face(self):
         """
@@ -383,9 +403,81 @@ class GraphicsStateMixin:
         )
 
 
+class GraphicsState(dict):
+    """
+    An immutable snapshot of graphics state variables, attached to text fragments.
+
+    Instances are interned: `GraphicsState.intern()` returns the same object for identical states,
+    so that fragments sharing the same style also share the same `GraphicsState`,
+    and can be compared by identity.
+    """
+
+    __slots__ = ("_key", "_hash", "_derived", "__weakref__")
+
+    _interned = WeakValueDictionary()
+    # Maximum number of results of .replace() cached by each instance:
+    MAX_DERIVED_STATES = 64
+
+    def __init__(self, state, key=None):
+        super().__init__(state)
+        if self.get("text_shaping"):
+            # The text shaping parameters of the FPDF instance are modified in place:
+            dict.__setitem__(self, "text_shaping", copy(self["text_shaping"]))
+        self._key = freeze(state) if key is None else key
+        self._hash = hash(self._key)
+        self._derived = {}  # cache of the results of .replace()
+
+    @classmethod
+    def intern(cls, state):
+        "Return the unique `GraphicsState` instance equal to the given mapping"
+        if isinstance(state, GraphicsState):
+            return state
+        key = freeze(state)
+        gs = cls._interned.get(key)
+        if gs is None:
+            gs = cls._interned.setdefault(key, cls(state, key))
+        return gs
+
+    def replace(self, **changes):
+        "Return the `GraphicsState` that differs from this one by the given values"
+        key = freeze(changes)
+        gs = self._derived.get(key)
+        if gs is None:
+            if all(self.get(name) is value for name, value in changes.items()):
+                gs = self
+            else:
+                gs = GraphicsState.intern({**self, **changes})
+            if len(self._derived) >= self.MAX_DERIVED_STATES:
+                self._derived.clear()
+            self._derived[key] = gs
+        return gs
+
+    def __eq__(self, other):
+        if isinstance(other, GraphicsState):
+            return self is other or self._key == other._key
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return GraphicsState.intern, (dict(self),)
+
+    # pylint: disable=no-self-use
+    def _immutable(self, *_args, **_kwargs):
+        raise TypeError("GraphicsState instances are immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+
 __pdoc__ = {
     "GraphicsStateMixin._push_local_stack": True,
     "GraphicsStateMixin._pop_local_stack": True,
     "GraphicsStateMixin._get_current_graphics_state": True,
+    "GraphicsStateMixin._get_fragment_graphics_state": True,
     "GraphicsStateMixin._is_current_graphics_state_nested": True,
 }
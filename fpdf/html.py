@@ -16,6 +16,7 @@ from .drawing import color_from_hex_string, convert_to_device_color
 from .enums import Align, TextEmphasis, XPos, YPos
 from .errors import FPDFException
 from .fonts import FontFace, TextStyle
+from .resource_loader import prefetch_resources
 from .table import Table
 from .util import get_scale_factor, int2roman
 
@@ -1164,7 +1165,12 @@ class HTML2FPDF(HTMLParser):
             self._in_title = False
 
     def feed(self, data):
-        super().feed(data)
+        # Fetching all the remote images concurrently, before rendering the document:
+        collector = _ImageSourcesCollector(self.image_map)
+        collector.feed(data)
+        collector.close()
+        with prefetch_resources(self.pdf.image_cache, collector.sources):
+            super().feed(data)
         while self._tags_stack and self._tags_stack[-1] in self.HTML_UNCLOSED_TAGS:
             self._tags_stack.pop()
         self._end_paragraph()  # render the final chunk of text and clean up our local context.
@@ -1215,6 +1221,34 @@ class HTML2FPDF(HTMLParser):
         raise RuntimeError(message)
 
 
+class _ImageSourcesCollector(HTMLParser):
+    "Collects the sources of the <img> tags, as they will be passed to `FPDF.image()`"
+
+    def __init__(self, image_map):
+        super().__init__()
+        self.image_map = image_map
+        self.sources = []
+        self._table_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._table_depth += 1
+        elif tag == "img":
+            src = dict(attrs).get("src")
+            if src:
+                # image_map is not applied on images in tables:
+                self.sources.append(src if self._table_depth else self.image_map(src))
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self._table_depth:
+            self._table_depth -= 1
+
+    # Subclasses of _markupbase.ParserBase must implement this:
+    # pylint: disable=no-self-use
+    def error(self, message):
+        raise RuntimeError(message)
+
+
 def _scale_units(pdf, in_tag_styles):
     conversion_factor = get_scale_factor("mm") / pdf.k
     out_tag_styles = {}
@@ -1,5 +1,10 @@
+import json, os, tempfile, threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from .resource_loader import ResourceLoader
 
 
 class ImageInfo(dict):
@@ -69,6 +74,201 @@ class VectorImageInfo(ImageInfo):
     # pass
 
 
+class DiskImageCache:
+    """
+    Persistent cache of processed raster images, storing one file per image in a directory.
+
+    It can be shared by many `FPDF` instances, possibly in different processes,
+    by assigning it to their `image_cache.persistent_cache` attribute.
+    Entries are identified by a hash of the image source content, the requested dimensions & the image filter.
+    When the total size of the files goes over `max_size` bytes,
+    the least recently used ones are deleted.
+    """
+
+    FILE_SUFFIX = ".fpdf-img"
+
+    def __init__(self, directory, max_size=256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+    def get(self, key):
+        "Returns the `RasterImageInfo` stored for this key, or `None`"
+        file_path = self.directory / f"{key}{self.FILE_SUFFIX}"
+        try:
+            with file_path.open("rb") as cache_file:
+                header = json.loads(cache_file.readline())
+                info = RasterImageInfo(header["values"])
+                for name, length in header["bytes"]:
+                    info[name] = cache_file.read(length)
+            os.utime(file_path)  # marks the entry as recently used
+        except (OSError, ValueError, KeyError):
+            return None  # missing, evicted in the meantime or corrupted entry
+        return info
+
+    def set(self, key, info):
+        "Stores a `RasterImageInfo`, then evicts the least recently used entries if needed"
+        values, binary_values = {}, []
+        for name, value in info.items():
+            if isinstance(value, (bytes, bytearray)):
+                binary_values.append((name, value))
+            else:
+                values[name] = value
+        header = {
+            "values": values,
+            "bytes": [(name, len(value)) for name, value in binary_values],
+        }
+        # The file is written under a temporary name, so that readers never see it partially written:
+        fd, tmp_file_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as cache_file:
+                cache_file.write(json.dumps(header).encode() + b"\n")
+                for _, value in binary_values:
+                    cache_file.write(value)
+            os.replace(tmp_file_path, self.directory / f"{key}{self.FILE_SUFFIX}")
+        except BaseException:
+            os.unlink(tmp_file_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.FILE_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # concurrently evicted
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, file_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(file_path)
+            except FileNotFoundError:  # concurrently evicted
+                pass
+            total_size -= size
+
+
+class MemoryImageCache:
+    """
+    In-memory cache of processed raster images, that can be shared by many `FPDF` instances,
+    including ones built concurrently in different threads,
+    by assigning it to their `image_cache.persistent_cache` attribute.
+
+    The image data stored is never altered: each document gets its own copy of the `RasterImageInfo`,
+    where it keeps its bookkeeping (`i` index & `usages` count), referencing the same image bytes.
+    When the total size of the image data goes over `max_size` bytes,
+    the least recently used entries are dropped.
+    """
+
+    def __init__(self, max_size=256 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (RasterImageInfo, size)
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, _memo):
+        # This cache is meant to be shared, including by copies of a FPDF instance:
+        return self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        "Returns a copy of the `RasterImageInfo` stored for this key, or `None`"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        return RasterImageInfo(entry[0])
+
+    def set(self, key, info):
+        "Stores a copy of a `RasterImageInfo`, then drops the least recently used entries if needed"
+        info = RasterImageInfo(
+            (name, bytes(value) if isinstance(value, bytearray) else value)
+            for name, value in info.items()
+        )
+        size = sum(len(value) for value in info.values() if isinstance(value, bytes))
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (info, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+
+class SpilledImageData:
+    "Reference to some image data stored in an `ImageSpillFile`"
+
+    __slots__ = ("spill_file", "offset", "length")
+
+    def __init__(self, spill_file, offset, length):
+        self.spill_file = spill_file
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def read(self):
+        return self.spill_file.read(self.offset, self.length)
+
+
+class ImageSpillFile:
+    """
+    Temporary file where the data of processed raster images is moved as soon as they are inserted,
+    so that it does not stay in memory until the document is produced.
+    The data of each image is then read back only while `FPDF.output()` serializes it.
+
+    It is enabled by assigning an instance to the `image_cache.spill_file` attribute of a `FPDF` instance.
+    """
+
+    def __init__(self, directory=None):
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, _memo):
+        # The data stored is never altered, so this file can be shared by copies of a FPDF instance:
+        return self
+
+    def spill_image(self, info):
+        "Moves the image data & soft mask of a `RasterImageInfo` to this file"
+        for key in ("data", "smask"):
+            value = info.get(key)
+            if isinstance(value, (bytes, bytearray)):
+                info[key] = self.write(value)
+
+    def write(self, data):
+        with self._lock:
+            offset = self._file.seek(0, os.SEEK_END)
+            self._file.write(data)
+        return SpilledImageData(self, offset, len(data))
+
+    def read(self, offset, length):
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def close(self):
+        self._file.close()
+
+
+class VariantSources(OrderedDict):
+    """
+    Map image identifiers to the (source, decoded PIL image) pairs used to build their low-res variants.
+    This is only a cache of decoded images, that is released by `FPDF.output()`.
+    """
+
+    def __deepcopy__(self, _memo):
+        # Not worth copying nor rolling back, so this cache is shared by copies of a FPDF instance:
+        return self
+
+
 @dataclass
 class ImageCache:
     # Map image identifiers to dicts describing the raster images
@@ -77,6 +277,20 @@ class ImageCache:
     icc_profiles: Dict[bytes, int] = field(default_factory=dict)
     # Must be one of SUPPORTED_IMAGE_FILTERS values
     image_filter: str = "AUTO"
+    # Optional cache of processed raster images, persisting across FPDF instances,
+    # providing get(key) & set(key, info) methods, like DiskImageCache or MemoryImageCache:
+    persistent_cache: Optional[Union[DiskImageCache, MemoryImageCache]] = None
+    # Optional temporary file where the raster images data is stored until the document is produced:
+    spill_file: Optional[ImageSpillFile] = None
+    # Optional loader of the images provided as http(s):// URLs, that can be shared among FPDF instances,
+    # in order to reuse its connections & cached responses:
+    resource_loader: Optional[ResourceLoader] = field(
+        default=None, repr=False, compare=False
+    )
+    # Map image identifiers to the (source, decoded PIL image) pairs used to build their low-res variants:
+    variant_sources: VariantSources = field(
+        default_factory=VariantSources, repr=False, compare=False
+    )
 
     def reset_usages(self):
         for img in self.images.values():
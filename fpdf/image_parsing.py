@@ -1,4 +1,5 @@
-import base64, hashlib, io, zlib
+import base64, hashlib, io, struct, zlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from io import BytesIO
 from math import ceil
@@ -22,6 +23,7 @@ except ImportError:
 
 from .errors import FPDFException
 from .image_datastructures import ImageCache, RasterImageInfo, VectorImageInfo
+from .resource_loader import is_remote_url
 from .svg import SVGObject
 
 
@@ -29,11 +31,16 @@ from .svg import SVGObject
 class ImageSettings:
     # Passed to zlib.compress() - In range 0-9 - Default is currently equivalent to 6:
     compression_level: int = -1
+    # Images bigger than this number of pixels are processed in horizontal strips of that size,
+    # in order to avoid making full copies of their data:
+    strip_size: int = 4 * 1024 * 1024
 
 
 LOGGER = logging.getLogger(__name__)
 SUPPORTED_IMAGE_FILTERS = ("AUTO", "FlateDecode", "DCTDecode", "JPXDecode", "LZWDecode")
 SETTINGS = ImageSettings()
+# Maximum number of decoded source images kept in ImageCache.variant_sources:
+MAX_VARIANT_SOURCES = 2
 
 # fmt: off
 TIFFBitRevTable = [
@@ -66,6 +73,14 @@ TIFFBitRevTable = [
 ]
 # fmt: on
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG color types whose IDAT data can be embedded as is, mapped to (dpn, colspace):
+PNG_PASSTHROUGH_COLOR_TYPES = {
+    0: (1, "DeviceGray"),
+    2: (3, "DeviceRGB"),
+    3: (1, "Indexed"),
+}
+
 LZW_CLEAR_TABLE_MARKER = 256  # Special code to indicate table reset
 LZW_EOD_MARKER = 257  # End-of-data marker
 LZW_INITIAL_BITS_PER_CODE = 9  # Initial code bit width
@@ -94,7 +109,9 @@ def preload_image(image_cache: ImageCache, name, dims=None):
     # Identify and load SVG data:
     if str(name).endswith(".svg"):
         try:
-            return get_svg_info(name, load_image(str(name)), image_cache=image_cache)
+            return get_svg_info(
+                name, _load_source(image_cache, str(name)), image_cache=image_cache
+            )
         except Exception as error:
             raise ValueError(f"Could not parse file: {name}") from error
     if isinstance(name, bytes) and _is_svg(name.strip()):
@@ -102,51 +119,215 @@ def preload_image(image_cache: ImageCache, name, dims=None):
     if isinstance(name, io.BytesIO) and _is_svg(name.getvalue().strip()):
         return get_svg_info("vector_image", name, image_cache=image_cache)
 
-    # Load raster data.
+    name, img = _identify_raster_image(name)
+    info = image_cache.images.get(name)
+    if info:
+        info["usages"] += 1
+    else:
+        info = _process_raster_image(image_cache, name, img, dims)
+        _add_to_image_cache(image_cache, name, info)
+    return name, img, info
+
+
+def preload_images(image_cache: ImageCache, names, dims=None, max_workers=None):
+    """
+    Read several images and load them into memory, decoding & compressing raster images concurrently.
+
+    The result is the same as calling `preload_image()` on each image, in order:
+    the raster images are inserted in `image_cache.images` with the same `i` indices.
+
+    Args:
+        image_cache: an `ImageCache` instance, usually the `.image_cache` attribute of a `FPDF` instance.
+        names: an iterable of images, each one in any of the forms accepted by `preload_image()`.
+        dims (Tuple[float]): optional dimensions as a tuple (width, height) to resize the images
+            (raster only) before storing them in the PDF.
+        max_workers (int): optional maximum number of threads used to process the images.
+            Defaults to the `concurrent.futures.ThreadPoolExecutor` default.
+
+    Returns: A list of tuples, one per image provided, as returned by `preload_image()`.
+    """
+    images = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for source in names:
+            if _is_svg_source(source):
+                images.append((True, source, None))
+                continue
+            name, img = _identify_raster_image(source)
+            if name not in image_cache.images and name not in pending:
+                # Pillow & zlib release the GIL while decoding & compressing:
+                pending[name] = executor.submit(
+                    _process_raster_image, image_cache, name, img, dims
+                )
+            images.append((False, name, img))
+        results = []
+        for is_svg, name, img in images:
+            if is_svg:
+                results.append(preload_image(image_cache, name, dims))
+                continue
+            info = image_cache.images.get(name)
+            if info:
+                info["usages"] += 1
+            else:
+                info = pending[name].result()
+                _add_to_image_cache(image_cache, name, info)
+            results.append((name, img, info))
+    return results
+
+
+def _is_svg_source(name):
+    if str(name).endswith(".svg"):
+        return True
+    if isinstance(name, bytes):
+        return _is_svg(name.strip())
+    if isinstance(name, io.BytesIO):
+        return _is_svg(name.getvalue().strip())
+    return False
+
+
+def _identify_raster_image(name):
+    "Returns the key identifying a raster image in the cache, and its source, if not a file path or URL"
     if isinstance(name, str):
-        img = None
-    elif isinstance(name, Image.Image):
+        return name, None
+    if isinstance(name, Image.Image):
         bytes_ = name.tobytes()
-        img_hash = hashlib.new("md5", usedforsecurity=False)  # nosec B324
-        img_hash.update(bytes_)
-        name, img = img_hash.hexdigest(), name
     elif isinstance(name, (bytes, io.BytesIO)):
         bytes_ = name.getvalue() if isinstance(name, io.BytesIO) else name
         bytes_ = bytes_.strip()
-        img_hash = hashlib.new("md5", usedforsecurity=False)  # nosec B324
-        img_hash.update(bytes_)
-        name, img = img_hash.hexdigest(), name
     else:
-        name, img = str(name), name
-    info = image_cache.images.get(name)
-    if info:
-        info["usages"] += 1
+        return str(name), name
+    img_hash = hashlib.new("md5", usedforsecurity=False)  # nosec B324
+    img_hash.update(bytes_)
+    return img_hash.hexdigest(), name
+
+
+def _process_raster_image(image_cache, name, img, dims, decoded_img=None):
+    """
+    Calls `get_img_info()`, unless the processed image is found in `image_cache.persistent_cache`.
+    If provided, `decoded_img` is the `PIL.Image.Image` opened from `img`, that is processed instead of it.
+    """
+    if img is None and is_remote_url(name):
+        img = _load_source(image_cache, name)
+    persistent_cache = image_cache.persistent_cache
+    # In-memory Pillow images have no source content that could identify them:
+    if persistent_cache is None or isinstance(img, Image.Image):
+        return get_img_info(name, decoded_img or img, image_cache.image_filter, dims)
+    if not img or isinstance(img, (Path, str)):
+        img = load_image(name)
+    elif not isinstance(img, (bytes, BytesIO)):
+        # Generic file-like objects are read, so that their content can be hashed:
+        img = _read_file_object(img)
+    key = persistent_cache_key(img, image_cache.image_filter, dims)
+    info = persistent_cache.get(key)
+    if info is None:
+        info = get_img_info(name, decoded_img or img, image_cache.image_filter, dims)
+        persistent_cache.set(key, info)
+    return info
+
+
+def get_img_variant_info(image_cache: ImageCache, name, img, dims):
+    """
+    Process a raster image, resized to the dimensions provided.
+
+    The decoded source images of the last variants built are kept in `image_cache.variant_sources`,
+    so that several variants of the same image can be built without reading & decoding it again.
+    If `image_cache.persistent_cache` is set, variants are looked up in it first.
+
+    Args:
+        image_cache: an `ImageCache` instance, usually the `.image_cache` attribute of a `FPDF` instance.
+        name: the name identifying the image in `image_cache.images`
+        img: the image source, as returned by `preload_image()`
+        dims (Tuple[int]): dimensions as a tuple (width, height) to resize the image to.
+
+    Returns: an instance of `RasterImageInfo`.
+    """
+    sources = image_cache.variant_sources
+    if name in sources:
+        sources.move_to_end(name)
+        img, decoded_img = sources[name]
     else:
-        info = get_img_info(name, img, image_cache.image_filter, dims)
-        info["i"] = len(image_cache.images) + 1
-        info["usages"] = 1
-        info["iccp_i"] = None
-        iccp = info.get("iccp")
-        if iccp:
-            LOGGER.debug(
-                "ICC profile found for image %s - It will be inserted in the PDF document",
-                name,
-            )
-            if iccp in image_cache.icc_profiles:
-                info["iccp_i"] = image_cache.icc_profiles[iccp]
-            else:
-                iccp_i = len(image_cache.icc_profiles)
-                image_cache.icc_profiles[iccp] = iccp_i
-                info["iccp_i"] = iccp_i
-            info["iccp"] = None
-        image_cache.images[name] = info
-    return name, img, info
+        if isinstance(img, Image.Image):
+            decoded_img = img
+        else:
+            if not img or isinstance(img, (Path, str)):
+                img = _load_source(image_cache, name)
+            elif isinstance(img, bytes):
+                img = BytesIO(img)
+            elif not isinstance(img, BytesIO):
+                img = _read_file_object(img)
+            decoded_img = Image.open(img)
+        sources[name] = img, decoded_img
+        if len(sources) > MAX_VARIANT_SOURCES:
+            sources.popitem(last=False)
+    return RasterImageInfo(
+        _process_raster_image(image_cache, name, img, dims, decoded_img)
+    )
+
+
+def _read_file_object(file):
+    "Returns the whole content of a file-like object as a `BytesIO`, reading it from its start, like `PIL.Image.open()`"
+    try:
+        file.seek(0)
+    except (AttributeError, io.UnsupportedOperation):
+        pass
+    return BytesIO(file.read())
+
+
+def persistent_cache_key(img, image_filter, dims=None):
+    """
+    Returns the key identifying a processed raster image in a persistent cache,
+    which is a hash of the image source content, of the requested dimensions & image filter,
+    and of the settings & fpdf2 version that could alter the processing.
+
+    Args:
+        img: `bytes` or `BytesIO` image source content
+        image_filter (str): one of the SUPPORTED_IMAGE_FILTERS
+        dims (Tuple[float]): optional dimensions to resize the image to
+    """
+    # We lazy-import this constant to circumvent a circular import problem:
+    # pylint: disable=cyclic-import,import-outside-toplevel
+    from .fpdf import FPDF_VERSION
+
+    key_hash = hashlib.sha256(
+        f"{FPDF_VERSION}:{SETTINGS.compression_level}:{image_filter}:{dims}:".encode()
+    )
+    key_hash.update(img.getbuffer() if isinstance(img, BytesIO) else img)
+    return key_hash.hexdigest()
+
+
+def _add_to_image_cache(image_cache, name, info):
+    info["i"] = len(image_cache.images) + 1
+    info["usages"] = 1
+    info["iccp_i"] = None
+    iccp = info.get("iccp")
+    if iccp:
+        LOGGER.debug(
+            "ICC profile found for image %s - It will be inserted in the PDF document",
+            name,
+        )
+        if iccp in image_cache.icc_profiles:
+            info["iccp_i"] = image_cache.icc_profiles[iccp]
+        else:
+            iccp_i = len(image_cache.icc_profiles)
+            image_cache.icc_profiles[iccp] = iccp_i
+            info["iccp_i"] = iccp_i
+        info["iccp"] = None
+    if image_cache.spill_file:
+        image_cache.spill_file.spill_image(info)
+    image_cache.images[name] = info
 
 
 def _is_svg(bytes_):
     return bytes_.startswith(b"<?xml ") or bytes_.startswith(b"<svg ")
 
 
+def _load_source(image_cache, name):
+    "Calls `load_image()`, or `image_cache.resource_loader.load()` for remote URLs"
+    if image_cache.resource_loader and is_remote_url(name):
+        return image_cache.resource_loader.load(name)
+    return load_image(name)
+
+
 def load_image(filename):
     """
     This method is used to load external resources, such as images.
@@ -302,6 +483,42 @@ def get_img_info(filename, img=None, image_filter="AUTO", dims=None):
                 }
             )
             return info
+        # The IDAT chunks of 8-bits non-interlaced PNG images without alpha channel
+        # already are a valid FlateDecode stream, with a PNG predictor:
+        if (
+            img.format == "PNG"
+            and image_filter == "FlateDecode"
+            and img.mode in ("L", "RGB", "P")
+            and not (img.mode == "P" and img.info.get("transparency") is not None)
+            and not getattr(img, "is_animated", False)
+        ):
+            img_raw_data.seek(0)
+            png_payload = png_idat_payload(img_raw_data.read())
+            if png_payload:
+                color_type, idat = png_payload
+                dpn, colspace = PNG_PASSTHROUGH_COLOR_TYPES[color_type]
+                info.update(
+                    {
+                        "data": idat,
+                        "w": w,
+                        "h": h,
+                        "cs": colspace,
+                        "iccp": iccp,
+                        "dpn": dpn,
+                        "bpc": 8,
+                        "f": image_filter,
+                        "inverted": jpeg_inverted,
+                        "dp": f"/Predictor 15 /Colors {dpn} /Columns {w}",
+                    }
+                )
+                if img.mode == "P":
+                    info["pal"] = img.palette.palette
+                if not is_pil_img:
+                    if keep_bytes_io_open:
+                        img.fp = None  # cf. issue #881
+                    else:
+                        img.close()
+                return info
         # We can directly copy the data out of a CCITT Group 4 encoded TIFF, if it
         # only contains a single strip
         if (
@@ -484,6 +701,41 @@ def ccitt_payload_location_from_pil(img):
     return offset, length
 
 
+def png_idat_payload(png_bytes):
+    """
+    returns the color type and the concatenated IDAT chunks of a PNG image,
+    if those can be embedded as is in a PDF image XObject: 8-bits per component,
+    non-interlaced, grayscale, RGB or palette-based image.
+    Returns None otherwise.
+    """
+    if not png_bytes.startswith(PNG_SIGNATURE):
+        return None
+    idat_chunks = []
+    color_type = None
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(png_bytes):
+        length, chunk_type = struct.unpack_from(">I4s", png_bytes, offset)
+        data_start = offset + 8
+        if chunk_type == b"IHDR":
+            bit_depth, color_type, _, _, interlace = struct.unpack_from(
+                ">5B", png_bytes, data_start + 8
+            )
+            if (
+                bit_depth != 8
+                or color_type not in PNG_PASSTHROUGH_COLOR_TYPES
+                or interlace
+            ):
+                return None
+        elif chunk_type == b"IDAT":
+            idat_chunks.append(png_bytes[data_start : data_start + length])
+        elif chunk_type == b"IEND":
+            break
+        offset = data_start + length + 4  # skipping the CRC
+    if color_type is None or not idat_chunks:
+        return None
+    return color_type, b"".join(idat_chunks)
+
+
 def transcode_monochrome(img):
     """
     Convert the open PIL.Image imgdata to compressed CCITT Group4 data.
@@ -538,117 +790,102 @@ def transcode_monochrome(img):
 
 
 def _to_lzwdata(img, remove_slice=None, select_slice=None):
-    data = bytearray(img.tobytes())
+    return lzw_encode(_iter_padded_raster_strips(img, remove_slice, select_slice))
 
-    if remove_slice:
-        del data[remove_slice]
-    if select_slice:
-        data = data[select_slice]
 
-    if img.mode == "1":
-        row_size = ceil(img.size[0] / 8)
-    else:
-        channels_count = len(data) // (img.size[0] * img.size[1])
-        row_size = img.size[0] * channels_count
+def _iter_padded_raster_strips(img, remove_slice=None, select_slice=None):
+    "Yields the pixels data of an image, strip by strip, with every row left-padded with a single zero"
+    for data, row_size in _iter_raster_strips(img, remove_slice, select_slice):
+        data_with_padding = bytearray()
+        with memoryview(data) as rows:
+            for i in range(0, len(data), row_size):
+                data_with_padding.extend(b"\0")
+                data_with_padding.extend(rows[i : i + row_size])
+        yield data_with_padding
 
-    data_with_padding = bytearray()
-    for i in range(0, len(data), row_size):
-        data_with_padding.extend(b"\0")
-        data_with_padding.extend(data[i : i + row_size])
-    data = data_with_padding
-    # Start compression
 
+def lzw_encode(data):
+    """
+    LZW-compress the data provided, as expected by the LZWDecode filter with an EarlyChange of 1.
+    `data` can be a bytes-like object, or an iterable of bytes-like chunks,
+    that are encoded as a single sequence, without having to be concatenated.
+
+    The string table is a trie stored in a dict, where each sequence is identified by its code,
+    and extended by a byte with the `(prefix_code << 8) | byte` integer key.
+    The codes are packed into bytes as they are emitted, with a bit-width starting at 9 bits
+    and expanding as needed, up to 12 bits.
+    """
+    chunks = (data,) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    output = bytearray()
+    max_next_code = (1 << LZW_MAX_BITS_PER_CODE) - 1
+    bits_per_code = LZW_INITIAL_BITS_PER_CODE
+    max_code_value = (1 << bits_per_code) - 1
+    next_code = LZW_EOD_MARKER + 1
+    table = {}
+    # Local aliases, as those methods are called for every byte:
+    lookup, append = table.get, output.append
     # The encoder shall begin by issuing a clear-table code:
-    result_codes = [LZW_CLEAR_TABLE_MARKER]
-    table, next_code, bits_per_code, max_code_value = clear_table()
-
-    current_sequence = b""
-    for byte in data:
-        next_sequence = current_sequence + bytes([byte])
-
-        if next_sequence in table:
-            # Extend current sequence if already in the table
-            current_sequence = next_sequence
-        else:
+    buffer, bits_in_buffer = LZW_CLEAR_TABLE_MARKER, bits_per_code
+    current_code = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        chunk_bytes = memoryview(chunk).cast("B")
+        if current_code is None:
+            current_code, chunk_bytes = chunk_bytes[0], chunk_bytes[1:]
+        for byte in chunk_bytes:
+            key = (current_code << 8) | byte
+            code = lookup(key)
+            if code is not None:
+                # Extend current sequence, as it is already in the table
+                current_code = code
+                continue
             # Output code for the current sequence
-            result_codes.append(table[current_sequence])
-
-            # Add the new sequence to the table if there's room
-            if next_code <= (1 << LZW_MAX_BITS_PER_CODE) - 1:
-                table[next_sequence] = next_code
+            buffer = (buffer << bits_per_code) | current_code
+            bits_in_buffer += bits_per_code
+            while bits_in_buffer >= 8:
+                bits_in_buffer -= 8
+                append((buffer >> bits_in_buffer) & 0xFF)
+            buffer &= (1 << bits_in_buffer) - 1
+            if next_code <= max_next_code:
+                # Add the new sequence to the table
+                table[key] = next_code
                 next_code += 1
                 if next_code > max_code_value and bits_per_code < LZW_MAX_BITS_PER_CODE:
                     bits_per_code += 1
                     max_code_value = (1 << bits_per_code) - 1
             else:
-                # If the table is full, emit a clear-table command
-                result_codes.append(LZW_CLEAR_TABLE_MARKER)
-                table, next_code, bits_per_code, max_code_value = clear_table()
-
+                # The table is full: emit a clear-table code
+                buffer = (buffer << bits_per_code) | LZW_CLEAR_TABLE_MARKER
+                bits_in_buffer += bits_per_code
+                while bits_in_buffer >= 8:
+                    bits_in_buffer -= 8
+                    append((buffer >> bits_in_buffer) & 0xFF)
+                buffer &= (1 << bits_in_buffer) - 1
+                table.clear()
+                next_code = LZW_EOD_MARKER + 1
+                bits_per_code = LZW_INITIAL_BITS_PER_CODE
+                max_code_value = (1 << bits_per_code) - 1
             # Start new sequence
-            current_sequence = bytes([byte])
-
-    # Ensure everything actually is encoded
-    if current_sequence:
-        result_codes.append(table[current_sequence])
-
-    result_codes.append(LZW_EOD_MARKER)
-
-    return pack_codes_into_bytes(result_codes)
-
-
-def pack_codes_into_bytes(codes):
-    """
-    Convert the list of result codes into a continuous byte stream, with codes packed as per the code bit-width.
-    The bit-width starts at 9 bits and expands as needed.
-
-    """
-
-    (
-        _,
-        next_code,
-        bits_per_code,
-        max_code_value,
-    ) = clear_table()
-    buffer = 0
-    bits_in_buffer = 0
-    output = bytearray()
-
+            current_code = byte
+    codes = [LZW_EOD_MARKER] if current_code is None else [current_code, LZW_EOD_MARKER]
     for code in codes:
         buffer = (buffer << bits_per_code) | code
         bits_in_buffer += bits_per_code
-
         while bits_in_buffer >= 8:
             bits_in_buffer -= 8
-            output.append((buffer >> bits_in_buffer) & 0xFF)
-
-        if code == LZW_CLEAR_TABLE_MARKER:
-            _, next_code, bits_per_code, max_code_value = clear_table()
-        elif code != LZW_EOD_MARKER:
+            append((buffer >> bits_in_buffer) & 0xFF)
+        buffer &= (1 << bits_in_buffer) - 1
+        if code != LZW_EOD_MARKER:
             next_code += 1
             if next_code > max_code_value and bits_per_code < LZW_MAX_BITS_PER_CODE:
                 bits_per_code += 1
                 max_code_value = (1 << bits_per_code) - 1
-
     if bits_in_buffer > 0:
-        output.append((buffer << (8 - bits_in_buffer)) & 0xFF)
-
+        append((buffer << (8 - bits_in_buffer)) & 0xFF)
     return bytes(output)
 
 
-def clear_table():
-    """
-    Reset the encoding table and coding state to initial conditions.
-
-    """
-
-    table = {bytes([i]): i for i in range(256)}
-    next_code = LZW_EOD_MARKER + 1
-    bits_per_code = LZW_INITIAL_BITS_PER_CODE
-    max_code_value = (1 << bits_per_code) - 1
-    return table, next_code, bits_per_code, max_code_value
-
-
 def _to_data(img, image_filter, **kwargs):
     if image_filter == "FlateDecode":
         return _to_zdata(img, **kwargs)
@@ -679,26 +916,65 @@ def _to_data(img, image_filter, **kwargs):
 
 
 def _to_zdata(img, remove_slice=None, select_slice=None):
-    data = bytearray(img.tobytes())
-    if remove_slice:
-        del data[remove_slice]
+    # Left-padding every row with a single zero, while compressing them:
+    compressor = zlib.compressobj(level=SETTINGS.compression_level)
+    chunks = []
+    for data, row_size in _iter_raster_strips(img, remove_slice, select_slice):
+        with memoryview(data) as rows:
+            for i in range(0, len(data), row_size):
+                chunks.append(compressor.compress(b"\0"))
+                chunks.append(compressor.compress(rows[i : i + row_size]))
+    chunks.append(compressor.flush())
+    return b"".join(chunks)
+
+
+def _iter_strips(img):
+    """
+    Yields horizontal strips of an image, each one made of at most `SETTINGS.strip_size` pixels,
+    or the image itself if it is not bigger than that.
+    """
+    width, height = img.size
+    strip_height = max(1, SETTINGS.strip_size // width)
+    if strip_height >= height:
+        yield img
+        return
+    for top in range(0, height, strip_height):
+        yield img.crop((0, top, width, min(top + strip_height, height)))
+
+
+def _iter_raster_strips(img, remove_slice=None, select_slice=None):
+    "Yields the pixels data of an image, strip by strip, along with the size of its rows"
+    for strip in _iter_strips(img):
+        data = _get_raster_data(strip, remove_slice, select_slice)
+        yield data, _get_row_size(strip, data)
+
+
+def _get_raster_data(img, remove_slice=None, select_slice=None):
+    """
+    Returns the pixels data of an image, without the channel matching `remove_slice`,
+    or only with the channel matching `select_slice`.
+    Channels are extracted with Pillow band operations, without copying the whole image data.
+    """
     if select_slice:
-        data = data[select_slice]
-    # Left-padding every row with a single zero:
-    if img.mode == "1":
-        row_size = ceil(img.size[0] / 8)
-    else:
-        channels_count = len(data) // (img.size[0] * img.size[1])
-        row_size = img.size[0] * channels_count
+        return img.getchannel(select_slice.start).tobytes()
+    if remove_slice:
+        bands = [band for i, band in enumerate(img.split()) if i != remove_slice.start]
+        if len(bands) == 1:
+            return bands[0].tobytes()
+        return Image.merge("RGB", bands).tobytes()
+    return img.tobytes()
 
-    data_with_padding = bytearray()
-    for i in range(0, len(data), row_size):
-        data_with_padding.extend(b"\0")
-        data_with_padding.extend(data[i : i + row_size])
 
-    return zlib.compress(data_with_padding, level=SETTINGS.compression_level)
+def _get_row_size(img, data):
+    if img.mode == "1":
+        return ceil(img.size[0] / 8)
+    channels_count = len(data) // (img.size[0] * img.size[1])
+    return img.size[0] * channels_count
 
 
 def _has_alpha(img, alpha_channel):
-    alpha = bytearray(img.tobytes())[alpha_channel]
-    return any(c != 255 for c in alpha)
+    for strip in _iter_strips(img):
+        min_alpha, _ = strip.getchannel(alpha_channel.start).getextrema()
+        if min_alpha != 255:
+            return True
+    return False
@@ -7,6 +7,9 @@ They may change at any time without prior warning or any deprecation period,
 in non-backward-compatible ways.
 """
 
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import accumulate
 from numbers import Number
 from typing import NamedTuple, Any, List, Optional, Union, Sequence
 from uuid import uuid4
@@ -14,6 +17,7 @@ from uuid import uuid4
 from .enums import Align, CharVPos, TextDirection, WrapMode
 from .errors import FPDFException
 from .fonts import CoreFont, TTFFont
+from .graphics_state import GraphicsState
 from .util import escape_parens
 
 SOFT_HYPHEN = "\u00ad"
@@ -75,7 +79,9 @@ class Fragment:
 
     @font.setter
     def font(self, v):
-        self.graphics_state["current_font"] = v
+        self.graphics_state = GraphicsState.intern(self.graphics_state).replace(
+            current_font=v
+        )
 
     @property
     def is_ttf_font(self):
@@ -226,6 +232,19 @@ class Fragment:
         (char_len, w) = self.font.get_text_width(
             chars, self.font_size_pt, self.text_shaping_parameters
         )
+        return self._scale_width(w, char_len, initial_cs)
+
+    def get_width_from_units(self, units: int, char_len: int, initial_cs: bool = True):
+        """
+        Return the width of `char_len` characters whose glyph widths sum up to `units`
+        (in 1/1000 of the font size), the same way `get_width()` computes it.
+        Only valid without text shaping.
+        """
+        return self._scale_width(
+            units * self.font_size_pt * 0.001, char_len, initial_cs
+        )
+
+    def _scale_width(self, w: float, char_len: int, initial_cs: bool):
         char_spacing = self.char_spacing
         if self.font_stretching != 100:
             w *= self.font_stretching * 0.01
@@ -256,6 +275,74 @@ class Fragment:
             character = HYPHEN
         return self.get_width(chars=character, initial_cs=initial_cs)
 
+    def get_character_units(self, character: str):
+        "Return the glyph width of a single character, in 1/1000 of the font size"
+        if self.is_ttf_font:
+            return self.font.cw[ord(character)]
+        return self.font.cw[character]
+
+    def get_character_widths(self, print_sh: bool = False):
+        """
+        Measure all the characters of this fragment at once, for MultiLineBreak.
+
+        Returns a `CharacterWidths`, or None when the width of a string
+        is not the sum of the widths of its characters:
+        with text shaping (kerning, ligatures...) or with a negative char spacing.
+        """
+        if (
+            self.text_shaping_parameters
+            or self.char_spacing < 0
+            or not isinstance(self.font, (CoreFont, TTFFont))
+        ):
+            return None
+        characters = self.characters
+        # Measurements of each distinct character:
+        advance_per_char = {}
+        units_per_char = {}
+        count_per_char = {}
+        space_per_char = {}
+        for character in set(characters):
+            advance_per_char[character] = self.get_character_width(character, print_sh)
+            count_per_char[character] = 1
+            space_per_char[character] = 0
+            if character in (NEWLINE, FORM_FEED):
+                units_per_char[character] = 0
+            elif character == SOFT_HYPHEN and not print_sh:
+                # Not added to the line, only a break opportunity:
+                units_per_char[character] = 0
+                count_per_char[character] = 0
+            elif character == NBSP:
+                # Replaced by a regular space when added to a line:
+                units_per_char[character] = self.get_character_units(SPACE)
+                space_per_char[character] = 1
+            else:
+                units_per_char[character] = self.get_character_units(character)
+                if character in BREAKING_SPACE_SYMBOLS_STR:
+                    space_per_char[character] = 1
+        advances = [advance_per_char[c] for c in characters]
+        units = [units_per_char[c] for c in characters]
+        counts = [count_per_char[c] for c in characters]
+        spaces = [space_per_char[c] for c in characters]
+        breaking_spaces = [
+            i for i, c in enumerate(characters) if c in BREAKING_SPACE_SYMBOLS_STR
+        ]
+        soft_hyphens = (
+            []
+            if print_sh
+            else [i for i, c in enumerate(characters) if c == SOFT_HYPHEN]
+        )
+        line_breaks = [i for i, c in enumerate(characters) if c in (NEWLINE, FORM_FEED)]
+        return CharacterWidths(
+            advances=advances,
+            max_advance=max(advances, default=0),
+            unit_sums=list(accumulate(units, initial=0)),
+            character_counts=list(accumulate(counts, initial=0)),
+            space_counts=list(accumulate(spaces, initial=0)),
+            breaking_spaces=breaking_spaces,
+            soft_hyphens=soft_hyphens,
+            line_breaks=line_breaks,
+        )
+
     def render_pdf_text(self, frag_ws, current_ws, word_spacing, adjust_x, adjust_y, h):
         if self.is_ttf_font:
             if self.text_shaping_parameters:
@@ -267,11 +354,7 @@ class Fragment:
 
     def render_pdf_text_ttf(self, frag_ws, word_spacing):
         ret = ""
-        mapped_text = ""
-        for char in self.string:
-            mapped_char = self.font.subset.pick(ord(char))
-            if mapped_char:
-                mapped_text += chr(mapped_char)
+        mapped_text = self.font.subset.translate(self.string)
         if word_spacing:
             # do this once in advance
             u_space = escape_parens(" ".encode("utf-16-be").decode("latin-1"))
@@ -442,6 +525,80 @@ class TextLine(NamedTuple):
         return tuple(ordered_fragments)
 
 
+class LineBox(NamedTuple):
+    "Position of a line of text, as computed by `FPDF.measure_multi_cell()`"
+
+    text_line: TextLine
+    page_offset: int  # number of page breaks occurring before this line
+    x: float  # left edge of the text area
+    y: float
+    w: float  # width of the text
+    h: float
+
+
+class TextLayout(NamedTuple):
+    "Result of `FPDF.measure_multi_cell()`"
+
+    lines: tuple  # of LineBox
+    height: float  # total height of the cell, including padding
+    page_breaks: tuple  # indices of the lines starting a new page
+
+    def get_strings(self) -> List[str]:
+        'Return the text of each line, like `multi_cell(output="LINES")`'
+        return [
+            "".join(
+                character
+                for frag in line.text_line.fragments
+                for character in frag.characters
+            )
+            for line in self.lines
+        ]
+
+
+class CharacterWidths(NamedTuple):
+    """
+    Measurements of all the characters of a Fragment, computed once by
+    `Fragment.get_character_widths()`, so that MultiLineBreak can find break
+    positions from cumulative sums instead of measuring each character.
+    The cumulative lists have one more item than the fragment has characters.
+    """
+
+    # width of each character, compared to the space remaining on a line
+    # (char spacing & stretching applied, hyphen width for soft hyphens):
+    advances: list
+    max_advance: float
+    # cumulative glyph widths, in 1/1000 of the font size, of the characters
+    # as they are added to a line (soft hyphens are skipped, NBSP become spaces):
+    unit_sums: list
+    # cumulative number of characters added to a line:
+    character_counts: list
+    # cumulative number of breaking & non-breaking spaces:
+    space_counts: list
+    # indices of the break opportunities and of the forced line breaks:
+    breaking_spaces: list
+    soft_hyphens: list
+    line_breaks: list
+
+
+def _first_index(lo: int, hi: int, predicate: callable):
+    """
+    Search the first index in [lo, hi) matching a monotonic predicate, or return hi.
+    Exponential search: the cost depends on the distance from `lo`, not on `hi`.
+    """
+    step = 1
+    while lo + step < hi and not predicate(lo + step):
+        lo += step
+        step *= 2
+    hi = min(lo + step, hi)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
 class SpaceHint(NamedTuple):
     original_fragment_index: int
     original_character_index: int
@@ -569,6 +726,122 @@ class CurrentLine:
         if character != SOFT_HYPHEN or self.print_sh:
             active_fragment.characters.append(character)
 
+    def add_characters(
+        self,
+        fragment: Fragment,
+        fragment_index: int,
+        start: int,
+        character_widths: CharacterWidths,
+        max_width: float,
+        height: float,
+    ):
+        """
+        Add characters of `fragment`, starting at index `start`,
+        until the next newline / form feed or the first character that does not fit
+        in `max_width`, with the same result as calling `add_character()` for each of them.
+        Returns the index of the first character that was not added.
+
+        Line widths are computed from cumulative glyph widths, with the same
+        floating point operations as the `width` property. As they never decrease,
+        the first character that does not fit is found by bisection.
+        """
+        line_breaks = character_widths.line_breaks
+        next_line_break = bisect_left(line_breaks, start)
+        end = (
+            line_breaks[next_line_break]
+            if next_line_break < len(line_breaks)
+            else len(fragment.characters)
+        )
+        if start >= end:
+            return start
+        new_fragment = not fragment.has_same_style(self.fragments[-1])
+        if new_fragment:
+            base_width = self.width
+            units, count, initial_cs = 0, 0, True
+        else:
+            base_width = 0
+            for i, previous_fragment in enumerate(self.fragments[:-1]):
+                base_width += previous_fragment.get_width(initial_cs=i > 0)
+            active_characters = self.fragments[-1].characters
+            units = sum(fragment.get_character_units(c) for c in active_characters)
+            count = len(active_characters)
+            initial_cs = len(self.fragments) > 1
+        unit_sums = character_widths.unit_sums
+        character_counts = character_widths.character_counts
+        advances = character_widths.advances
+
+        def line_width(index):
+            "Width of the line before adding the character at `index`"
+            return base_width + fragment.get_width_from_units(
+                units + unit_sums[index] - unit_sums[start],
+                count + character_counts[index] - character_counts[start],
+                initial_cs,
+            )
+
+        # Any character that does not fit starts after this index:
+        # (the margin covers floating point rounding)
+        lower_bound = max_width - character_widths.max_advance
+        lower_bound -= 1e-9 * (1 + abs(lower_bound))
+        lo = _first_index(start, end, lambda i: line_width(i) > lower_bound)
+        # ...and not after this one:
+        hi = _first_index(lo, end, lambda i: line_width(i) > max_width)
+        stop = end
+        for index in range(lo, min(hi + 1, end)):
+            if line_width(index) + advances[index] > max_width:
+                stop = index
+                break
+        if stop == start:
+            return start
+
+        self.height = height
+        if new_fragment:
+            self.fragments.append(
+                fragment.__class__(
+                    characters="",
+                    graphics_state=fragment.graphics_state,
+                    k=fragment.k,
+                    link=fragment.link,
+                )
+            )
+        space_counts = character_widths.space_counts
+        for break_indices, is_hyphen in (
+            (character_widths.breaking_spaces, False),
+            (character_widths.soft_hyphens, True),
+        ):
+            last_break = bisect_left(break_indices, stop) - 1
+            if last_break < 0 or break_indices[last_break] < start:
+                continue
+            index = break_indices[last_break]
+            hint_args = (
+                fragment_index,
+                index,
+                len(self.fragments),
+                count + character_counts[index] - character_counts[start],
+                line_width(index),
+                self.number_of_spaces + space_counts[index] - space_counts[start],
+            )
+            if is_hyphen:
+                self.hyphen_break_hint = HyphenHint(
+                    *hint_args,
+                    HYPHEN,
+                    advances[index],
+                    fragment.graphics_state,
+                    fragment.k,
+                )
+            else:
+                self.space_break_hint = SpaceHint(*hint_args)
+        self.number_of_spaces += space_counts[stop] - space_counts[start]
+
+        characters = fragment.characters[start:stop]
+        if NBSP in characters or (SOFT_HYPHEN in characters and not self.print_sh):
+            characters = [
+                SPACE if c == NBSP else c
+                for c in characters
+                if c != SOFT_HYPHEN or self.print_sh
+            ]
+        self.fragments[-1].characters.extend(characters)
+        return stop
+
     def trim_trailing_spaces(self):
         if not self.fragments:
             return
@@ -692,6 +965,14 @@ class MultiLineBreak:
         self.idx_last_forced_break = None
         self.first_line_indent = first_line_indent
         self._is_first_line = True
+        self._character_widths = {}
+
+    def _get_character_widths(self, fragment_index: int):
+        if fragment_index not in self._character_widths:
+            self._character_widths[fragment_index] = self.fragments[
+                fragment_index
+            ].get_character_widths(self.print_sh)
+        return self._character_widths[fragment_index]
 
     # pylint: disable=too-many-return-statements
     def get_line(self):
@@ -752,10 +1033,27 @@ class MultiLineBreak:
                 self.fragment_index += 1
                 continue
 
-            character = current_fragment.characters[self.character_index]
-            character_width = current_fragment.get_character_width(
-                character, self.print_sh, initial_cs=not first_char
+            character_widths = (
+                None if first_char else self._get_character_widths(self.fragment_index)
             )
+            if character_widths is not None:
+                self.character_index = current_line.add_characters(
+                    current_fragment,
+                    self.fragment_index,
+                    self.character_index,
+                    character_widths,
+                    max_width,
+                    current_font_height * self.line_height,
+                )
+                if self.character_index >= len(current_fragment.characters):
+                    continue
+                character = current_fragment.characters[self.character_index]
+                character_width = character_widths.advances[self.character_index]
+            else:
+                character = current_fragment.characters[self.character_index]
+                character_width = current_fragment.get_character_width(
+                    character, self.print_sh, initial_cs=not first_char
+                )
             first_char = False
 
             if character in (NEWLINE, FORM_FEED):
@@ -815,3 +1113,51 @@ class MultiLineBreak:
                 Align.L if self.align == Align.J else self.align,
             )
         return None
+
+
+class LayoutCache:
+    """
+    Bounded least-recently-used cache of the `TextLine`s computed for a paragraph.
+
+    `FPDF.multi_cell()` stores there the result of parsing & wrapping a text,
+    indexed by a key combining the text, its full style, the available width
+    and the line wrapping options, so that identical paragraphs
+    (table headers, repeated labels...) are laid out only once.
+    """
+
+    def __init__(self, max_size: int = 256):
+        if max_size < 1:
+            raise ValueError(f"Invalid cache size: {max_size}")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._text_lines = OrderedDict()
+
+    def __deepcopy__(self, _memo):
+        # Entries only depend on their key, so this cache does not need to be rolled back
+        # by FPDFRecorder, and is shared by the copies of a FPDF instance:
+        return self
+
+    def __len__(self):
+        return len(self._text_lines)
+
+    def get(self, key) -> Optional[tuple]:
+        "Return the `TextLine`s stored for this key, or None"
+        text_lines = self._text_lines.get(key)
+        if text_lines is None:
+            self.misses += 1
+            return None
+        self._text_lines.move_to_end(key)
+        self.hits += 1
+        return text_lines
+
+    def put(self, key, text_lines: Sequence[TextLine]):
+        "Store some `TextLine`s, evicting the least recently used entry if the cache is full"
+        self._text_lines[key] = tuple(text_lines)
+        self._text_lines.move_to_end(key)
+        if len(self._text_lines) > self.max_size:
+            self._text_lines.popitem(last=False)
+
+    def clear(self):
+        "Remove all entries"
+        self._text_lines.clear()
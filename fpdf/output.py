@@ -16,11 +16,12 @@ from io import BytesIO
 from fontTools import subset as ftsubset
 
 from .annotations import PDFAnnotation
+from .content_stream import optimize_content_stream
 from .enums import PDFResourceType, PageLabelStyle, SignatureFlag
 from .enums import OutputIntentSubType
 from .errors import FPDFException
 from .line_break import TotalPagesSubstitutionFragment
-from .image_datastructures import RasterImageInfo
+from .image_datastructures import RasterImageInfo, SpilledImageData
 from .outline import build_outline_objs
 from .sign import Signature, sign_content
 from .syntax import (
@@ -42,7 +43,7 @@ try:
 except ImportError:
     signer = None
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
 if TYPE_CHECKING:
     from .fpdf import FPDF
@@ -215,6 +216,18 @@ class PDFXObject(PDFContentStream):
         self.decode_parms = decode_parms
         self.s_mask = None
 
+    # method override
+    def serialize(self, obj_dict=None, _security_handler=None):
+        if not isinstance(self._contents, SpilledImageData):
+            return super().serialize(obj_dict, _security_handler)
+        # The image data is only read back from the spill file while being serialized:
+        spilled_data = self._contents
+        self._contents = spilled_data.read()
+        try:
+            return super().serialize(obj_dict, _security_handler)
+        finally:
+            self._contents = spilled_data
+
 
 class PDFICCProfile(PDFContentStream):
     """
@@ -298,6 +311,15 @@ class PDFPageLabel:
         return self.st
 
 
+class TextSubstitution(NamedTuple):
+    "A placeholder written in a page content stream, to be replaced when the document is output"
+
+    # position of the placeholder in the page content stream, or None if it is unknown:
+    offset: Optional[int]
+    length: int  # length of the placeholder, in bytes
+    fragment: TotalPagesSubstitutionFragment
+
+
 class PDFPage(PDFObject):
     __slots__ = (  # RAM usage optimization
         "_id",
@@ -315,7 +337,7 @@ class PDFPage(PDFObject):
         "_width_pt",
         "_height_pt",
         "_page_label",
-        "_text_substitution_fragments",
+        "_text_substitutions",
     )
 
     def __init__(
@@ -330,6 +352,7 @@ class PDFPage(PDFObject):
         self.contents = contents
         self.dur = duration if duration else None
         self.trans = transition
+        # .contents & .annots are only ever appended to, cf. fpdf.recorder.PagesJournal:
         self.annots = PDFArray()  # list of PDFAnnotation
         self.group = None
         self.media_box = None
@@ -340,7 +363,7 @@ class PDFPage(PDFObject):
         self._index = index
         self._width_pt, self._height_pt = None, None
         self._page_label: PDFPageLabel = None
-        self._text_substitution_fragments: list[TotalPagesSubstitutionFragment] = []
+        self._text_substitutions: list[TextSubstitution] = []
 
     def index(self):
         return self._index
@@ -388,10 +411,66 @@ class PDFPage(PDFObject):
         return str(self.index()) if not self._page_label else str(self._page_label)
 
     def get_text_substitutions(self):
-        return self._text_substitution_fragments
+        return self._text_substitutions
 
-    def add_text_substitution(self, fragment):
-        self._text_substitution_fragments.append(fragment)
+    def insert_contents(self, offset, data):
+        """
+        Insert some instructions in the page contents, at the given offset,
+        moving the placeholders recorded after it accordingly.
+        Apart from this method, the page contents are only ever appended to.
+        The offset must not be lower than the contents length recorded by any active `fpdf.recorder.PagesJournal`.
+        """
+        self.contents[offset:offset] = data
+        self._text_substitutions = [
+            (
+                substitution._replace(offset=substitution.offset + len(data))
+                if substitution.offset is not None and substitution.offset >= offset
+                else substitution
+            )
+            for substitution in self._text_substitutions
+        ]
+
+    def add_text_substitution(self, fragment, offset, length):
+        """
+        Record a placeholder that has just been written at the given offset of the page contents.
+        If `offset` is None, the placeholder will be searched for in the page contents.
+        """
+        self._text_substitutions.append(TextSubstitution(offset, length, fragment))
+
+    def substitute_texts(self, replacement_text):
+        """
+        Replace all the placeholders recorded on this page by the rendering of `replacement_text`,
+        in a single pass over the page contents for those whose position is known.
+        """
+        if not self._text_substitutions:
+            return
+        chunks, position = [], 0
+        with memoryview(self.contents) as contents:
+            for substitution in self._text_substitutions:
+                if substitution.offset is None:
+                    continue
+                chunks.append(contents[position : substitution.offset])
+                chunks.append(
+                    substitution.fragment.render_text_substitution(
+                        replacement_text
+                    ).encode("latin-1")
+                )
+                position = substitution.offset + substitution.length
+            chunks.append(contents[position:])
+            self.contents = bytearray().join(chunks)
+        for substitution in self._text_substitutions:
+            if substitution.offset is not None:
+                continue
+            placeholder = substitution.fragment.get_placeholder_string().encode(
+                "latin-1"
+            )
+            if placeholder in self.contents:
+                self.contents = self.contents.replace(
+                    placeholder,
+                    substitution.fragment.render_text_substitution(
+                        replacement_text
+                    ).encode("latin-1"),
+                )
 
 
 class PDFPagesRoot(PDFObject):
@@ -530,6 +609,25 @@ class ResourceCatalog:
         self.resources = defaultdict(dict)
         self.resources_per_page = defaultdict(set)
 
+    def __deepcopy__(self, _memo):
+        """
+        Registered resources are never modified, and are shared with the copy:
+        only the mappings indexing them, whose size grows with the number of pages, are copied.
+        This reduces the cost of FPDFRecorder snapshots.
+        """
+        copy = ResourceCatalog.__new__(ResourceCatalog)
+        copy.resources = defaultdict(
+            dict,
+            {
+                resource_type: dict(registry)
+                for resource_type, registry in self.resources.items()
+            },
+        )
+        copy.resources_per_page = defaultdict(
+            set, {key: set(names) for key, names in self.resources_per_page.items()}
+        )
+        return copy
+
     def add(self, resource_type: PDFResourceType, resource, page_number: int):
         if resource_type in (PDFResourceType.PATTERN, PDFResourceType.SHADDING):
             registry = self.resources[resource_type]
@@ -747,9 +845,10 @@ class OutputProducer:
             page_objs.append(page_obj)
 
             # Extracting the page contents to insert it as a content stream:
-            cs_obj = PDFContentStream(
-                contents=page_obj.contents, compress=fpdf.compress
-            )
+            contents = page_obj.contents
+            if fpdf.optimize_content_streams:
+                contents = optimize_content_stream(contents)
+            cs_obj = PDFContentStream(contents=contents, compress=fpdf.compress)
             self._add_pdf_obj(cs_obj, "pages")
             page_obj.contents = cs_obj
 
@@ -29,13 +29,15 @@ class FPDFRecorder:
     Note that method can be called on a FPDFRecorder instance using its .pdf attribute
     so that they are not recorded & replayed later, on a call to .replay().
 
-    Note that using this class means to duplicate the FPDF `bytearray` buffer:
-    when generating large PDFs, doubling memory usage may be troublesome.
+    Note that the pages of the document are not copied:
+    instead, their state is recorded & restored by a `PagesJournal`,
+    so that the cost of creating a FPDFRecorder does not grow with the document contents,
+    nor with its number of pages.
     """
 
     def __init__(self, pdf, accept_page_break=True):
         self.pdf = pdf
-        self._initial = deepcopy(self.pdf.__dict__)
+        self._initial = self._snapshot()
         self._calls = []
         if not accept_page_break:
             self.accept_page_break = False
@@ -43,12 +45,26 @@ class FPDFRecorder:
     def __getattr__(self, name):
         attr = getattr(self.pdf, name)
         if callable(attr):
+            journal = self._initial[0]
+            if name == "output":
+                # The document gets closed, and all its pages are modified:
+                journal.record_all()
+            else:
+                journal.record(self.pdf.page)
             return CallRecorder(attr, self._calls)
         return attr
 
+    def _snapshot(self):
+        journal = PagesJournal(self.pdf.pages)
+        journal.record(self.pdf.page)
+        # The pages are shared instead of being deep-copied:
+        memo = {id(self.pdf.pages): self.pdf.pages}
+        return journal, deepcopy(self.pdf.__dict__, memo)
+
     def rewind(self):
-        self.pdf.__dict__ = self._initial
-        self._initial = deepcopy(self.pdf.__dict__)
+        journal, self.pdf.__dict__ = self._initial
+        journal.restore()
+        self._initial = self._snapshot()
 
     def replay(self):
         for call in self._calls:
@@ -68,6 +84,77 @@ class FPDFRecorder:
         self._calls = []
 
 
+class PagesJournal:
+    """
+    Records the state of some `fpdf.output.PDFPage` objects, so that they can be restored later on.
+
+    FPDF methods only modify the current page, so only the pages that may have been modified are recorded:
+    the current page when the journal is created, and then every page that becomes the current one before a recorded call.
+    The only exceptions are `output()`, before which all pages are recorded,
+    and the `page` parameter of annotation methods, whose changes to other pages are not restored.
+    The pages added after the creation of the journal are deleted on restore.
+
+    Pages contents & annotations are only ever appended to:
+    instead of copying them, only their lengths are recorded, and they get truncated on restore.
+    `fpdf.output.PDFPage.insert_contents()` must not insert content before the recorded length of a page.
+    """
+
+    def __init__(self, pages):
+        self._pages = pages
+        self._pages_count = len(pages)
+        self._entries = {}  # page number -> recorded state
+        self._pages_order = None
+
+    def record(self, page_number):
+        "Record the state of this page, unless it already has been, or has been added after the creation of this journal"
+        if page_number in self._entries or not 0 < page_number <= self._pages_count:
+            return
+        page = self._pages[page_number]
+        self._entries[page_number] = (
+            page,
+            {attr: getattr(page, attr) for attr in _get_slots(page)},
+            len(page.contents),
+            len(page.annots),
+            len(page._text_substitutions),  # pylint: disable=protected-access
+        )
+
+    def record_all(self):
+        "Record the state of all the pages, and their order, that may change when inserting a table of contents"
+        if self._pages_order is None:
+            self._pages_order = {
+                number: page
+                for number, page in self._pages.items()
+                if number <= self._pages_count
+            }
+        for page_number in range(1, self._pages_count + 1):
+            self.record(page_number)
+
+    def restore(self):
+        if self._pages_order is None:
+            for page_number in range(len(self._pages), self._pages_count, -1):
+                del self._pages[page_number]
+        else:
+            self._pages.clear()
+            self._pages.update(self._pages_order)
+        for (
+            page,
+            attrs,
+            contents_len,
+            annots_len,
+            fragments_len,
+        ) in self._entries.values():
+            for attr, value in attrs.items():
+                setattr(page, attr, value)
+            del page.contents[contents_len:]
+            del page.annots[annots_len:]
+            # pylint: disable=protected-access
+            del page._text_substitutions[fragments_len:]
+
+
+def _get_slots(obj):
+    return [slot for cls in type(obj).__mro__ for slot in getattr(cls, "__slots__", ())]
+
+
 class CallRecorder:
     def __init__(self, func, calls):
         self._func = func
@@ -0,0 +1,186 @@
+"""
+Loading of remote resources, like images, over HTTP(S).
+
+A `ResourceLoader` can be assigned to the `image_cache.resource_loader` attribute of `FPDF` instances,
+in order to be used to fetch the images provided as URLs.
+"""
+
+import http.client, logging, sys, threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+from urllib.request import getproxies, urlopen
+
+LOGGER = logging.getLogger(__name__)
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Same value as the one sent by urllib.request.urlopen():
+USER_AGENT = f"Python-urllib/{sys.version_info.major}.{sys.version_info.minor}"
+
+
+def is_remote_url(name):
+    return isinstance(name, str) and name.startswith(("http://", "https://"))
+
+
+@contextmanager
+def prefetch_resources(image_cache, urls):
+    """
+    Concurrently fetches the remote resources at those URLs with `image_cache.resource_loader`.
+    If it is not set, a temporary `ResourceLoader` is used until the end of this context,
+    and then closed, releasing its connections & cached responses.
+    """
+    urls = [url for url in urls if is_remote_url(url)]
+    temporary_loader = None
+    if urls and image_cache.resource_loader is None:
+        temporary_loader = image_cache.resource_loader = ResourceLoader()
+    try:
+        if urls:
+            image_cache.resource_loader.prefetch(urls)
+        yield
+    finally:
+        if temporary_loader:
+            temporary_loader.close()
+            image_cache.resource_loader = None
+
+
+class ResourceLoader:
+    """
+    Fetches remote resources over HTTP(S), reusing the connections to each host,
+    and keeping the responses in a size-bounded in-memory cache.
+    Many resources can be fetched concurrently beforehand with `prefetch()`.
+
+    Args:
+        max_workers (int): maximum number of resources fetched concurrently by `prefetch()`
+        timeout (float): timeout in seconds of the network operations
+        max_cache_size (int): maximum size in bytes of the responses kept in cache
+    """
+
+    def __init__(self, max_workers=8, timeout=30, max_cache_size=64 * 1024 * 1024):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_cache_size = max_cache_size
+        self._cache = OrderedDict()  # URL -> response content
+        self._cache_size = 0
+        self._idle_connections = {}  # (scheme, netloc) -> list of HTTP(S)Connection
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, _memo):
+        # This object holds no document-specific state, and can be shared by copies of a FPDF instance:
+        return self
+
+    def load(self, url):
+        "Returns the content of the resource at this URL, as a `BytesIO`"
+        with self._lock:
+            content = self._cache.get(url)
+            if content is not None:
+                self._cache.move_to_end(url)
+        if content is None:
+            content = self._fetch(url)
+            self._store(url, content)
+        return BytesIO(content)
+
+    def prefetch(self, urls):
+        """
+        Concurrently fetches the remote resources at those URLs, that are not in cache yet.
+        Errors are ignored, and will be raised when the resources are loaded.
+        """
+        with self._lock:
+            urls = [
+                url
+                for url in dict.fromkeys(urls)
+                if is_remote_url(url) and url not in self._cache
+            ]
+        if not urls:
+            return
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(urls))
+        ) as executor:
+            futures = [(url, executor.submit(self._fetch, url)) for url in urls]
+            for url, future in futures:
+                try:
+                    self._store(url, future.result())
+                except (OSError, http.client.HTTPException) as error:
+                    LOGGER.debug("Could not prefetch %s: %s", url, error)
+
+    def close(self):
+        "Closes all the idle connections"
+        with self._lock:
+            for connections in self._idle_connections.values():
+                for connection in connections:
+                    connection.close()
+            self._idle_connections.clear()
+
+    def _store(self, url, content):
+        with self._lock:
+            if url in self._cache:
+                return
+            self._cache[url] = content
+            self._cache_size += len(content)
+            while self._cache_size > self.max_cache_size:
+                _, evicted_content = self._cache.popitem(last=False)
+                self._cache_size -= len(evicted_content)
+
+    def _fetch(self, url):
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            if getproxies().get(parts.scheme):
+                # Letting urllib handle proxies:
+                # disabling bandit & semgrep rules as permitted schemes are whitelisted:
+                # nosemgrep: python.lang.security.audit.dynamic-urllib-use-detected.dynamic-urllib-use-detected
+                with urlopen(url, timeout=self.timeout) as response:  # nosec B310
+                    return response.read()
+            path = parts.path or "/"
+            if parts.query:
+                path += f"?{parts.query}"
+            response, content = self._request(parts.scheme, parts.netloc, path)
+            location = response.getheader("Location")
+            if response.status in REDIRECT_STATUSES and location:
+                url = urljoin(url, location)
+                if not is_remote_url(url):
+                    raise HTTPError(
+                        url,
+                        response.status,
+                        "Redirection to a non-HTTP(S) URL",
+                        response.msg,
+                        None,
+                    )
+                continue
+            if not 200 <= response.status < 300:
+                raise HTTPError(
+                    url, response.status, response.reason, response.msg, None
+                )
+            return content
+        raise HTTPError(url, response.status, "Too many redirects", response.msg, None)
+
+    def _request(self, scheme, netloc, path):
+        host = (scheme, netloc)
+        while True:
+            with self._lock:
+                idle_connections = self._idle_connections.get(host)
+                connection = idle_connections.pop() if idle_connections else None
+            reused = connection is not None
+            if not reused:
+                connection_class = (
+                    http.client.HTTPSConnection
+                    if scheme == "https"
+                    else http.client.HTTPConnection
+                )
+                connection = connection_class(netloc, timeout=self.timeout)
+            try:
+                connection.request("GET", path, headers={"User-Agent": USER_AGENT})
+                response = connection.getresponse()
+                content = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if reused:
+                    continue  # the server may have closed this idle connection: retrying with a new one
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                with self._lock:
+                    self._idle_connections.setdefault(host, []).append(connection)
+            return response, content
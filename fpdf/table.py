@@ -1,5 +1,7 @@
 from dataclasses import dataclass, replace
+from itertools import chain, combinations, repeat
 from numbers import Number
+from types import MethodType
 from typing import Optional, Union
 
 from .enums import (
@@ -7,17 +9,24 @@ from .enums import (
     CellBordersLayout,
     MethodReturnValue,
     TableBordersLayout,
+    TableBorderStyle,
     TableCellFillMode,
     TableHeadingsDisplay,
+    TableCellStyle,
     TableSpan,
     VAlign,
     WrapMode,
 )
 from .errors import FPDFException
 from .fonts import CORE_FONTS, FontFace
+from .line_break import LayoutCache
+from .resource_loader import prefetch_resources
+from .syntax import wrap_in_local_context
 from .util import Padding
 
 DEFAULT_HEADINGS_STYLE = FontFace(emphasis="BOLD")
+# Number of rows added at once by Table.add_rows() before rendering them in streaming mode:
+STREAMING_BATCH_SIZE = 100
 
 
 class Table:
@@ -51,6 +60,7 @@ class Table:
         num_heading_rows=1,
         repeat_headings=1,
         min_row_height=None,
+        streaming=False,
     ):
         """
         Args:
@@ -87,12 +97,18 @@ class Table:
                 first_row_as_headings needs to be True if num_heading_rows>1 and False if num_heading_rows=0. For backwards compatibility,
                 first_row_as_headings is used in case num_heading_rows is 1.
             repeat_headings (fpdf.enums.TableHeadingsDisplay): optional, indicates whether to print table headings on every page, default to 1.
+            min_row_height (number): optional. Sets a minimum height for all rows.
+            streaming (bool): optional, default to False. Render rows as soon as they are complete,
+                instead of once the table is finished, and release them once rendered,
+                so that memory usage does not grow with the number of rows.
+                The number of columns is then defined by the first rows.
         """
         self._fpdf = fpdf
         self._table_align = Align.coerce(align)
         self._v_align = VAlign.coerce(v_align)
         self._borders_layout = TableBordersLayout.coerce(borders_layout)
         self._outer_border_width = outer_border_width
+        self._grid = TableGrid(fpdf)
         self._cell_fill_color = cell_fill_color
         self._cell_fill_mode = TableCellFillMode.coerce(cell_fill_mode)
         self._col_widths = col_widths
@@ -109,7 +125,22 @@ class Table:
         self._repeat_headings = TableHeadingsDisplay.coerce(repeat_headings)
         self._min_row_height = min_row_height
         self._initial_style = None
+        self._streaming = streaming
         self.rows = []
+        # Rendering state, the rendering of a streaming table starts before it is finished:
+        self._finished = False
+        self._prev_position = None  # (x, y, l_margin) before rendering the table
+        self._cell_x_positions = None
+        self._headings_info = None  # RowLayoutInfo of the heading rows
+        self._first_pending_row = (
+            0  # index in self.rows of the first row not rendered yet
+        )
+        self._rows_offset = 0  # number of rendered rows removed from self.rows
+        self._converted_rows_count = (
+            0  # number of rows of self.rows with converted spans
+        )
+        self._active_rowspans = {}
+        self._prev_row_in_col = {}
 
         if padding is None:
             self._padding = Padding.new(0)
@@ -157,6 +188,9 @@ class Table:
         "Adds a row to the table. Returns a `Row` object."
         if self._initial_style is None:
             self._initial_style = self._fpdf.font_face()
+        if self._streaming and self.rows:
+            # All the rows added so far are complete:
+            self._render_rows(len(self.rows))
         row = Row(self, style=style, v_align=v_align, min_height=min_height)
         self.rows.append(row)
         for cell in cells:
@@ -166,8 +200,117 @@ class Table:
                 row.cell(cell)
         return row
 
+    def add_rows(self, rows, styles=None, aligns=None, formats=None):
+        """
+        Adds several rows to the table at once.
+
+        This is equivalent to calling `row()` with each of them, but faster for large tables,
+        as the current font settings and the per-column options are only processed once.
+
+        Args:
+            rows: iterable of rows, each row being a sequence of cell values, like the rows of a database cursor.
+                `None` values are rendered as empty cells, and `fpdf.enums.TableSpan` placeholders are supported.
+            styles (sequence of fpdf.fonts.FontFace): optional text style of each column.
+            aligns (sequence of str or fpdf.enums.Align): optional text alignment of each column.
+            formats (sequence): optional conversion to text of the values of each column.
+                Each item can be a format specification passed to `format()`, like `".2f"`,
+                or a callable returning a string. By default, non-string values are converted with `str()`.
+        """
+        if self._initial_style is None:
+            self._initial_style = self._fpdf.font_face()
+        # We capture the current font settings, like Row.cell() does:
+        font_face = self._fpdf.font_face()
+        default_style = None if font_face == self._initial_style else font_face
+        styles, aligns, formats = (
+            list(styles or ()),
+            list(aligns or ()),
+            list(formats or ()),
+        )
+        columns_count = max(len(styles), len(aligns), len(formats))
+        styles += [None] * (columns_count - len(styles))
+        aligns += [None] * (columns_count - len(aligns))
+        formats += [None] * (columns_count - len(formats))
+        columns = [
+            (
+                _get_formatter(fmt),
+                Align.coerce(align) if align else None,
+                style or default_style,
+            )
+            for style, align, fmt in zip(styles, aligns, formats)
+        ]
+        default_column = (_format_cell_value, None, default_style)
+        for values in rows:
+            if self._streaming and self.rows:
+                if len(self.rows) - self._first_pending_row >= STREAMING_BATCH_SIZE:
+                    self._render_rows(len(self.rows))
+            row = Row(self)
+            row.cells = [
+                (
+                    value
+                    if isinstance(value, TableSpan)
+                    else Cell(
+                        formatter(value),
+                        align,
+                        None,
+                        style,
+                        None,
+                        False,
+                        1,
+                        1,
+                        None,
+                        None,
+                        CellBordersLayout.INHERIT,
+                    )
+                )
+                for value, (formatter, align, style) in zip(
+                    values,
+                    (
+                        columns
+                        if len(values) <= columns_count
+                        else chain(columns, repeat(default_column))
+                    ),
+                )
+            ]
+            self.rows.append(row)
+
+    def add_columns(
+        self, columns, styles=None, aligns=None, formats=None, include_names=True
+    ):
+        """
+        Adds rows to the table from data organized by columns.
+
+        Args:
+            columns: a sequence of columns, each column being a sequence of cell values,
+                or a mapping of column names to columns, like a `dict` or a `pandas.DataFrame`.
+            styles (sequence of fpdf.fonts.FontFace): optional text style of each column.
+            aligns (sequence of str or fpdf.enums.Align): optional text alignment of each column.
+            formats (sequence): optional conversion to text of the values of each column,
+                as described in `add_rows()`.
+            include_names (bool): when `columns` is a mapping, add a first row
+                containing the columns names. Default to True.
+        """
+        if hasattr(columns, "keys"):
+            names = list(columns.keys())
+            if include_names:
+                self.add_rows((names,))
+            columns = [columns[name] for name in names]
+        else:
+            columns = list(columns)
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError(
+                f"All columns must have the same length, got lengths: {[len(column) for column in columns]}"
+            )
+        self.add_rows(zip(*columns), styles=styles, aligns=aligns, formats=formats)
+
     def render(self):
         "This is an internal method called by `fpdf.FPDF.table()` once the table is finished"
+        self._finished = True
+        self._render_rows(len(self.rows))
+        # Restoring altered FPDF settings:
+        self._fpdf.l_margin = self._prev_position[2]
+        self._fpdf.x = self._fpdf.l_margin
+
+    def _start_rendering(self):
         # Starting with some sanity checks:
         self._cols_count = max(row.cols_count for row in self.rows) if self.rows else 0
         if self._width is None:
@@ -206,7 +349,7 @@ class Table:
                     )
 
         # Defining table global horizontal position:
-        prev_x, prev_y, prev_l_margin = self._fpdf.x, self._fpdf.y, self._fpdf.l_margin
+        self._prev_position = (self._fpdf.x, self._fpdf.y, self._fpdf.l_margin)
         if self._table_align == Align.C:
             self._fpdf.l_margin = (self._fpdf.w - self._width) / 2
             self._fpdf.x = self._fpdf.l_margin
@@ -218,66 +361,142 @@ class Table:
 
         # Pre-Compute the relative x-positions of the individual columns:
         xx = self._fpdf.l_margin + self._outer_border_margin[0]
-        cell_x_positions = [xx]
+        self._cell_x_positions = [xx]
         if self.rows:
             for i in range(self._cols_count):
                 xx += self._get_col_width(0, i)
                 xx += self._gutter_width
-                cell_x_positions.append(xx)
+                self._cell_x_positions.append(xx)
 
-        # Process any rowspans
-        rows_info = list(self._compute_rows_info())
+        self._fpdf.y += self._outer_border_margin[1]
 
-        # actually render the cells
-        repeat_headings = (
-            self._repeat_headings is TableHeadingsDisplay.ON_TOP_OF_EVERY_PAGE
+    def _render_rows(self, end):
+        """
+        Render the pending rows among `self.rows[:end]`, that are all complete.
+        Unless the table is finished, the last one is kept pending,
+        as it could still be extended by a `TableSpan.ROW` in the next row,
+        as well as any row spanned over by a cell of a pending row.
+        Once rendered, rows that are not headings are removed from `self.rows`.
+        """
+        if self._prev_position is None:
+            self._start_rendering()
+        start = self._first_pending_row
+        self._convert_spans(end)
+        if self._finished:
+            cut = end
+        else:
+            # Looking for the last row boundary not crossed by any rowspan:
+            cut, spanned_until = start, start
+            for i in range(start, end - 1):
+                spanned_until = max(spanned_until, i + self.rows[i].max_rowspan)
+                if spanned_until == i + 1:
+                    cut = i + 1
+            if cut <= self._num_heading_rows:
+                return  # heading rows are only rendered along with the first row below them
+
+        # Fetching all the remote images of those rows concurrently, before measuring them:
+        remote_images = (
+            cell.img
+            for row in self.rows[start:cut]
+            for cell in row.cells
+            if isinstance(cell, Cell) and isinstance(cell.img, str)
         )
-        self._fpdf.y += self._outer_border_margin[1]
-        if len(self.rows) > self._num_heading_rows > 0:
-            # We avoid having the heading rows alone on a page - issue #1391
+        with prefetch_resources(self._fpdf.image_cache, remote_images):
+            # The text lines computed for each cell while measuring them
+            # are kept in a layout cache, to be reused when rendering them:
             # pylint: disable=protected-access
-            self._fpdf._perform_page_break_if_need_be(
-                sum(
-                    rows_info[i].pagebreak_height
-                    for i in range(self._num_heading_rows + 1)
+            prev_layout_cache = self._fpdf._layout_cache
+            self._fpdf._layout_cache = LayoutCache(
+                max_size=1
+                + sum(
+                    1
+                    for row in self.rows[:cut]
+                    for cell in row.cells
+                    if isinstance(cell, Cell) and cell.text
                 )
             )
-        for i in range(len(self.rows)):
-            pagebreak_height = rows_info[i].pagebreak_height
-            # pylint: disable=protected-access
-            page_break = self._fpdf._perform_page_break_if_need_be(pagebreak_height)
-            if (
-                page_break
-                and self._fpdf.y + pagebreak_height > self._fpdf.page_break_trigger
-            ):
-                # Restoring original position on page:
-                self._fpdf.x = prev_x
-                self._fpdf.y = prev_y
-                self._fpdf.l_margin = prev_l_margin
-                raise ValueError(
-                    f"The row with index {i} is too high and cannot be rendered on a single page"
+            try:
+                # Process any rowspans
+                rows_info = list(self._compute_rows_info(start, cut))
+                if start == 0:
+                    self._headings_info = rows_info[: self._num_heading_rows]
+
+                # actually render the cells
+                repeat_headings = (
+                    self._repeat_headings is TableHeadingsDisplay.ON_TOP_OF_EVERY_PAGE
                 )
-            if page_break and repeat_headings and i >= self._num_heading_rows:
-                # repeat headings on top:
-                self._fpdf.y += self._outer_border_margin[1]
-                for row_idx in range(self._num_heading_rows):
+                if start == 0 and cut > self._num_heading_rows > 0:
+                    # We avoid having the heading rows alone on a page - issue #1391
+                    self._fpdf._perform_page_break_if_need_be(
+                        sum(
+                            rows_info[i].pagebreak_height
+                            for i in range(self._num_heading_rows + 1)
+                        )
+                    )
+                for i in range(start, cut):
+                    pagebreak_height = rows_info[i - start].pagebreak_height
+                    page_break = self._fpdf._perform_page_break_if_need_be(
+                        pagebreak_height
+                    )
+                    if (
+                        page_break
+                        and self._fpdf.y + pagebreak_height
+                        > self._fpdf.page_break_trigger
+                    ):
+                        # Restoring original position on page:
+                        self._fpdf.x, self._fpdf.y, self._fpdf.l_margin = (
+                            self._prev_position
+                        )
+                        raise ValueError(
+                            f"The row with index {self._get_row_number(i)} is too high and cannot be rendered on a single page"
+                        )
+                    if page_break and repeat_headings and i >= self._num_heading_rows:
+                        # repeat headings on top:
+                        self._fpdf.y += self._outer_border_margin[1]
+                        for row_idx in range(self._num_heading_rows):
+                            self._render_table_row(
+                                row_idx,
+                                self._headings_info[row_idx],
+                                cell_x_positions=self._cell_x_positions,
+                            )
+                    if self._get_row_number(i) > 0:
+                        self._fpdf.y += self._gutter_height
                     self._render_table_row(
-                        row_idx,
-                        rows_info[row_idx],
-                        cell_x_positions=cell_x_positions,
+                        i, rows_info[i - start], self._cell_x_positions
                     )
-            if i > 0:
-                self._fpdf.y += self._gutter_height
-            self._render_table_row(i, rows_info[i], cell_x_positions)
-
-        # Restoring altered FPDF settings:
-        self._fpdf.l_margin = prev_l_margin
-        self._fpdf.x = self._fpdf.l_margin
+                if self._finished:
+                    self._grid.render()
+            finally:
+                self._fpdf._layout_cache = prev_layout_cache
+
+        if not self._finished:
+            # Releasing the rendered rows, except headings:
+            released_rows_count = cut - self._num_heading_rows
+            del self.rows[self._num_heading_rows : cut]
+            self._rows_offset += released_rows_count
+            self._converted_rows_count -= released_rows_count
+            self._first_pending_row = self._num_heading_rows
+
+    def _get_row_number(self, i):
+        "Convert an index in `self.rows` into the index of this row in the whole table"
+        return i if i < self._num_heading_rows else i + self._rows_offset
+
+    def _get_rows_count(self):
+        """
+        Return the total number of rows in the table.
+        While a streaming table is still being built, the pending row is counted,
+        as well as one extra row, so that rendered rows are never considered as the last one.
+        """
+        return self._rows_offset + len(self.rows) + (0 if self._finished else 1)
 
     def _render_table_row(self, i, row_layout_info, cell_x_positions, **kwargs):
         row = self.rows[i]
         y = self._fpdf.y  # remember current y position, reset after each cell
 
+        # The cells borders & backgrounds are collected in the grid,
+        # and inserted before the content of the table on each page, once it is complete:
+        self._add_row_to_grid(i, row_layout_info, cell_x_positions)
+
         for j, cell in enumerate(row.cells):
             if cell is None:
                 continue
@@ -294,6 +513,69 @@ class Table:
 
         self._fpdf.ln(row_layout_info.height)
 
+    def _add_row_to_grid(self, i, row_layout_info, cell_x_positions):
+        row = self.rows[i]
+        row_number = self._get_row_number(i)
+        rows_count = self._get_rows_count()
+        y1 = self._fpdf.y
+        for j, cell in enumerate(row.cells):
+            if cell is None:
+                continue
+            x1 = cell_x_positions[j]
+            # already includes gutter for cells spanning multiple columns:
+            x2 = x1 + self._get_col_width(i, j, cell.colspan)
+            if cell.rowspan > 1:
+                y2 = y1 + row_layout_info.merged_heights[cell.rowspan]
+            else:
+                y2 = y1 + row_layout_info.height
+            style = self._get_cell_style(i, j, cell)
+            cell_idx = row.cells.index(cell)
+            cell_style = self._borders_layout.cell_style_getter(
+                row_idx=row_number,
+                col_idx=sum(1 for cell in row.cells[:cell_idx] if cell is not None),
+                col_pos=j,
+                num_heading_rows=self._num_heading_rows,
+                num_rows=rows_count,
+                num_col_idx=sum(1 for cell in row.cells if cell is not None),
+                num_col_pos=row.cols_count,
+            ).override_cell_border(cell.border)
+            self._grid.add_cell(
+                cell_style,
+                x1,
+                y1,
+                x2,
+                y2,
+                fill_color=style.fill_color if style else None,
+            )
+
+            if self._outer_border_width:
+                # draw the outer box separated by the gutter dimensions
+                outer_style = TableBorderStyle(thickness=self._outer_border_width)
+                outer_x1 = self._fpdf.l_margin
+                outer_x2 = outer_x1 + self._width
+                outer_y1 = y1 - self._outer_border_margin[1]
+                outer_y2 = y2 + self._outer_border_margin[1]
+                if j == 0:
+                    # lhs border
+                    self._grid.add_segment(
+                        outer_style, outer_x1, outer_y1, outer_x1, outer_y2
+                    )
+                if j + cell.colspan == self._cols_count:
+                    # rhs border
+                    self._grid.add_segment(
+                        outer_style, outer_x2, outer_y1, outer_x2, outer_y2
+                    )
+                    # top border
+                    if row_number == 0:
+                        self._grid.add_segment(
+                            outer_style, outer_x1, outer_y1, outer_x2, outer_y1
+                        )
+                    # bottom border
+                    if row_number + cell.rowspan == rows_count:
+                        self._grid.add_segment(
+                            outer_style, outer_x1, outer_y2, outer_x2, outer_y2
+                        )
+
     def _render_table_cell(
         self,
         i,
@@ -333,14 +615,7 @@ class Table:
         if not isinstance(text_align, (Align, str)):
             text_align = text_align[j]
 
-        style = self._initial_style
-        cell_mode_fill = self._cell_fill_mode.should_fill_cell(i, j)
-        if cell_mode_fill and self._cell_fill_color:
-            style = style.replace(fill_color=self._cell_fill_color)
-        if i < self._num_heading_rows:
-            style = FontFace.combine(style, self._headings_style)
-        style = FontFace.combine(style, row.style)
-        style = FontFace.combine(style, cell.style)
+        style = self._get_cell_style(i, j, cell)
 
         padding = Padding.new(cell.padding) if cell.padding else self._padding
 
@@ -363,70 +638,6 @@ class Table:
             cell_x = cell_x_positions[j]
         self._fpdf.set_x(cell_x)
 
-        # render cell border and background
-        # if cell_height is defined, that means that we already know the size at which the cell will be rendered
-        # so we can draw the borders now
-        #
-        # If cell_height is None then we're still in the phase of calculating the height of the cell meaning that
-        # we do not need to set fonts & draw borders yet.
-        if not height_query_only:
-            x1 = self._fpdf.x
-            y1 = self._fpdf.y
-            x2 = (
-                x1 + col_width
-            )  # already includes gutter for cells spanning multiple columns
-            y2 = y1 + cell_height
-
-            cell_idx = row.cells.index(cell)
-            (
-                self._borders_layout.cell_style_getter(
-                    row_idx=i,
-                    col_idx=sum(1 for cell in row.cells[:cell_idx] if cell is not None),
-                    col_pos=j,
-                    num_heading_rows=self._num_heading_rows,
-                    num_rows=len(self.rows),
-                    num_col_idx=sum(1 for cell in row.cells if cell is not None),
-                    num_col_pos=row.cols_count,
-                )
-                .override_cell_border(cell.border)
-                .draw_cell_border(
-                    self._fpdf,
-                    x1,
-                    y1,
-                    x2,
-                    y2,
-                    fill_color=style.fill_color if style else None,
-                )
-            )
-
-            # draw outer box if needed:
-            if self._outer_border_width:
-                _remember_linewidth = self._fpdf.line_width
-                self._fpdf.set_line_width(self._outer_border_width)
-
-                # draw the outer box separated by the gutter dimensions
-                # the top and bottom borders are one continuous line
-                # whereas the left and right borders are segments because of possible pagebreaks
-                x1 = self._fpdf.l_margin
-                x2 = x1 + self._width
-                y1 = y1 - self._outer_border_margin[1]
-                y2 = y2 + self._outer_border_margin[1]
-
-                if j == 0:
-                    # lhs border
-                    self._fpdf.line(x1, y1, x1, y2)
-                if j + cell.colspan == self._cols_count:
-                    # rhs border
-                    self._fpdf.line(x2, y1, x2, y2)
-                    # continuous top line border
-                    if i == 0:
-                        self._fpdf.line(x1, y1, x2, y1)
-                    # continuous bottom line border
-                    if i + cell.rowspan == len(self.rows):
-                        self._fpdf.line(x1, y2, x2, y2)
-
-                self._fpdf.set_line_width(_remember_linewidth)
-
         if cell.img:
             x, y = self._fpdf.x, self._fpdf.y
 
@@ -482,23 +693,35 @@ class Table:
             self._fpdf.y += dy
 
             with self._fpdf.use_font_face(style):
-                page_break_text, cell_height = self._fpdf.multi_cell(
-                    w=col_width,
-                    h=row_height,
-                    text=cell.text,
-                    max_line_height=self._line_height,
-                    border=0,
-                    align=text_align,
-                    new_x="RIGHT",
-                    new_y="TOP",
-                    fill=False,  # fill is already done above
-                    markdown=self._markdown,
-                    output=MethodReturnValue.PAGE_BREAK | MethodReturnValue.HEIGHT,
-                    wrapmode=self._wrapmode,
-                    padding=padding,
-                    link=cell.link,
-                    **kwargs,
-                )
+                if height_query_only:
+                    cell_height = self._fpdf.measure_multi_cell(
+                        w=col_width,
+                        h=row_height,
+                        text=cell.text,
+                        max_line_height=self._line_height,
+                        align=text_align,
+                        markdown=self._markdown,
+                        wrapmode=self._wrapmode,
+                        padding=padding,
+                    ).height
+                else:
+                    page_break_text, cell_height = self._fpdf.multi_cell(
+                        w=col_width,
+                        h=row_height,
+                        text=cell.text,
+                        max_line_height=self._line_height,
+                        border=0,
+                        align=text_align,
+                        new_x="RIGHT",
+                        new_y="TOP",
+                        fill=False,  # fill is already done above
+                        markdown=self._markdown,
+                        output=MethodReturnValue.PAGE_BREAK | MethodReturnValue.HEIGHT,
+                        wrapmode=self._wrapmode,
+                        padding=padding,
+                        link=cell.link,
+                        **kwargs,
+                    )
 
             self._fpdf.y -= dy
         else:
@@ -508,6 +731,19 @@ class Table:
 
         return do_pagebreak, img_height, cell_height
 
+    def _get_cell_style(self, i, j, cell):
+        "Return the `fpdf.fonts.FontFace` of a cell, combining the table, row & cell styles"
+        style = self._initial_style
+        cell_mode_fill = self._cell_fill_mode.should_fill_cell(
+            self._get_row_number(i), j
+        )
+        if cell_mode_fill and self._cell_fill_color:
+            style = style.replace(fill_color=self._cell_fill_color)
+        if i < self._num_heading_rows:
+            style = FontFace.combine(style, self._headings_style)
+        style = FontFace.combine(style, self.rows[i].style)
+        return FontFace.combine(style, cell.style)
+
     def _get_col_width(self, i, j, colspan=1):
         """Gets width of a column in a table, this excludes the outer gutter (outside the table) but includes the inner gutter
         between columns if the cell spans multiple columns."""
@@ -536,16 +772,22 @@ class Table:
                 col_width += self._gutter_width
         return col_width
 
-    def _compute_rows_info(self):
-        # First pass: Regularise the table by processing the rowspan and colspan entries
-        active_rowspans = {}
-        prev_row_in_col = {}
-        for i, row in enumerate(self.rows):
+    def _convert_spans(self, end):
+        "Regularise the rows up to `end` by processing their rowspan and colspan entries"
+        for row in self.rows[self._converted_rows_count : end]:
+            if self._prev_position is not None and row.cols_count > self._cols_count:
+                # Only possible in streaming mode, once the columns widths have been computed:
+                raise FPDFException(
+                    f"Row with index {self._get_row_number(self.rows.index(row))} has"
+                    f" {row.cols_count} columns, more than the {self._cols_count} of the rows before it"
+                )
             # Link up rowspans
-            active_rowspans, prior_rowspans = row.convert_spans(active_rowspans)
+            self._active_rowspans, prior_rowspans = row.convert_spans(
+                self._active_rowspans
+            )
             for col_idx in prior_rowspans:
                 # This cell is TableSpan.ROW, so accumulate to the previous row
-                prev_row = prev_row_in_col[col_idx]
+                prev_row = self._prev_row_in_col[col_idx]
                 if prev_row is not None:
                     # Since Cell objects are frozen, we need to recreate them to update the rowspan
                     cell = prev_row.cells[col_idx]
@@ -553,20 +795,24 @@ class Table:
             for j, cell in enumerate(row.cells):
                 if isinstance(cell, Cell):
                     # Keep track of the non-span cells
-                    prev_row_in_col[j] = row
+                    self._prev_row_in_col[j] = row
                     for k in range(j + 1, j + cell.colspan):
-                        prev_row_in_col[k] = None
-        if len(active_rowspans) != 0:
+                        self._prev_row_in_col[k] = None
+        self._converted_rows_count = end
+        if self._finished and len(self._active_rowspans) != 0:
             raise FPDFException("Rowspan extends beyond end of table")
 
-        # Second pass: Estimate the cell sizes
+    def _compute_rows_info(self, start, end):
+        "Compute the layout of the rows `self.rows[start:end]`, that must not be crossed by any rowspan"
+        # First pass: Estimate the cell sizes
         rowspan_list = []
         row_min_heights = []
         row_span_max = []
         rendered_heights = []
         # pylint: disable=protected-access
         with self._fpdf._disable_writing():
-            for i, row in enumerate(self.rows):
+            for i in range(start, end):
+                row = self.rows[i]
                 dictated_heights = []
                 img_heights = []
                 rendered_heights.append({})
@@ -588,13 +834,16 @@ class Table:
                         dictated_height = text_height
 
                     # Store the dictated heights in a dict (not list) because of span elements
-                    rendered_heights[i][j] = dictated_height
+                    rendered_heights[-1][j] = dictated_height
 
                     if cell.rowspan > 1:
                         # For spanned rows, use img_height if dictated_height is zero
                         rowspan_list.append(
                             RowSpanLayoutInfo(
-                                j, i, cell.rowspan, dictated_height or img_height
+                                j,
+                                i - start,
+                                cell.rowspan,
+                                dictated_height or img_height,
                             )
                         )
                         # Often we want rowspans in headings, but issues arise if the span crosses outside the heading
@@ -633,7 +882,7 @@ class Table:
         rowspan_list = sorted(rowspan_list, key=lambda span: span.length)
 
         # Third pass: allocate space required for the rowspans
-        row_span_padding = [0 for row in self.rows]
+        row_span_padding = [0 for _ in range(start, end)]
         for span in rowspan_list:
             # accumulate already assigned properties
             max_padding = 0
@@ -659,7 +908,7 @@ class Table:
                         row_span_padding[i] += extra / span.length
 
         # Fourth pass: compute the final element sizes
-        for i, row in enumerate(self.rows):
+        for i in range(end - start):
             row_height = row_min_heights[i] + row_span_padding[i]
             # Compute the size of merged cells
             merged_sizes = [0, row_height]
@@ -689,6 +938,21 @@ class Table:
             )
 
 
+def _format_cell_value(value):
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+
+def _get_formatter(fmt):
+    "Return a function converting cell values to text, as specified by `Table.add_rows()`"
+    if fmt is None:
+        return _format_cell_value
+    if callable(fmt):
+        return fmt
+    return lambda value: "" if value is None else format(value, fmt)
+
+
 class Row:
     "Object that `Table.row()` yields, used to build a row in a table"
 
@@ -917,3 +1181,174 @@ def draw_box_borders(pdf, x1, y1, x2, y2, border, fill_color=None):
 
     if fill_color:
         pdf.set_fill_color(prev_fill_color)
+
+
+class TableGrid:
+    """
+    Collects the borders & backgrounds of the cells of a table,
+    in order to render them with few drawing operations:
+    the backgrounds of the same color are filled at once,
+    and the collinear borders sharing the same style are merged into single lines,
+    so that the edges shared by adjacent cells are only drawn once.
+
+    Once all the rows of the table on a page have been rendered, the backgrounds & borders collected
+    are inserted in the page contents before the cells content, at the position where the table started.
+    Borders of different styles that overlap are drawn in the order they were added,
+    as if each cell was drawn separately.
+    """
+
+    def __init__(self, pdf):
+        self._pdf = pdf
+        self._fills = {}  # fill color -> list of rectangles
+        # Borders grouped by style, as [style key, TableBorderStyle, lines] lists,
+        # where lines map (is_vertical, position) to a list of (start, end) intervals, in PDF coordinates:
+        self._borders = []
+        self._page = None  # page where the elements collected are located
+        self._offset = None  # position in this page contents where the table starts
+
+    def add_cell(self, cell_style, x1, y1, x2, y2, fill_color=None):
+        "Add the borders & background of a cell, given its `fpdf.enums.TableCellStyle`"
+        self._start_page()
+        if fill_color is not None:
+            self._fills.setdefault(fill_color, []).append((x1, y1, x2, y2))
+        self.add_segment(cell_style.left, x1, y1, x1, y2)
+        self.add_segment(cell_style.top, x1, y1, x2, y1)
+        self.add_segment(cell_style.right, x2, y1, x2, y2)
+        self.add_segment(cell_style.bottom, x1, y2, x2, y2)
+
+    def add_segment(self, border_style, x1, y1, x2, y2):
+        "Add an horizontal or vertical border line, with a style given as a boolean or a `fpdf.enums.TableBorderStyle`"
+        border_style = TableBorderStyle.from_bool(border_style)
+        if not border_style.should_render():
+            return
+        self._start_page()
+        color = border_style.color
+        key = (
+            border_style.thickness,
+            tuple(color) if isinstance(color, list) else color,
+            border_style.dash,
+            border_style.gap,
+            border_style.phase,
+            border_style.changes_stroke(self._pdf),
+        )
+        k, h = self._pdf.k, self._pdf.h
+        x1, x2 = round(x1 * k, 2), round(x2 * k, 2)
+        y1, y2 = round((h - y1) * k, 2), round((h - y2) * k, 2)
+        if x1 == x2:
+            line, interval = (True, x1), (min(y1, y2), max(y1, y2))
+        else:
+            line, interval = (False, y1), (min(x1, x2), max(x1, x2))
+        # Looking for the last group of borders of the same style,
+        # that is not followed by a group with an overlapping border:
+        group = None
+        for other in reversed(self._borders):
+            if other[0] == key:
+                group = other
+                break
+            if any(
+                start <= interval[1] and interval[0] <= end
+                for start, end in other[2].get(line, ())
+            ):
+                break
+        if group is None:
+            group = [key, border_style, {}]
+            self._borders.append(group)
+        group[2].setdefault(line, []).append(interval)
+
+    def render(self):
+        "Insert the backgrounds & borders collected before the table content on the current page"
+        if self._page is None:
+            return
+        draw_commands = []
+        if self._fills:
+            k, h = self._pdf.k, self._pdf.h
+            fill_commands = []
+            for fill_color, rects in self._fills.items():
+                fill_commands.extend(
+                    TableCellStyle.get_change_fill_color_command(fill_color)
+                )
+                fill_commands.extend(
+                    f"{x1 * k:.2f} {(h - y2) * k:.2f} {(x2 - x1) * k:.2f} {(y2 - y1) * k:.2f} re"
+                    for x1, y1, x2, y2 in rects
+                )
+                fill_commands.append("f")
+            draw_commands.extend(wrap_in_local_context(fill_commands))
+        for key, border_style, lines in self._borders:
+            line_commands = _get_path_commands(lines)
+            line_commands.append("S")
+            if key[-1]:  # the style changes the stroke
+                # wrap in local context to prevent stroke changes from affecting later rendering
+                line_commands = wrap_in_local_context(
+                    border_style.get_change_stroke_commands(scale=self._pdf.k)
+                    + line_commands
+                )
+            draw_commands.extend(line_commands)
+        # Nothing is written while FPDF._out() is disabled, e.g. by FPDF._disable_writing():
+        if draw_commands and isinstance(
+            self._pdf._out, MethodType  # pylint: disable=protected-access
+        ):
+            self._pdf.pages[self._page].insert_contents(
+                self._offset, (" ".join(draw_commands) + "\n").encode("latin-1")
+            )
+        self._fills, self._borders = {}, []
+        self._page = self._offset = None
+
+    def _start_page(self):
+        if self._page != self._pdf.page:
+            # The table goes on a new page: rendering what has been collected on the previous one
+            self.render()
+            self._page = self._pdf.page
+            self._offset = len(self._pdf.pages[self._page].contents)
+
+
+def _get_path_commands(lines):
+    """
+    Build the path of the given lines, merging the collinear ones.
+    Rectangles whose 4 sides are complete lines once merged are drawn with a single "re" operator.
+    """
+    lines = {line: _merge_intervals(intervals) for line, intervals in lines.items()}
+    horizontal_lines, vertical_lines = {}, set()
+    for (vertical, pos), intervals in lines.items():
+        for start, end in intervals:
+            if vertical:
+                vertical_lines.add((pos, start, end))
+            else:
+                horizontal_lines.setdefault((start, end), []).append(pos)
+    drawn_as_rect = set()
+    commands = []
+    for (x1, x2), positions in horizontal_lines.items():
+        positions.sort()
+        for y1, y2 in combinations(positions, 2):
+            if (
+                (x1, y1, y2) in vertical_lines
+                and (x2, y1, y2) in vertical_lines
+                and (False, y1, x1, x2) not in drawn_as_rect
+                and (False, y2, x1, x2) not in drawn_as_rect
+            ):
+                drawn_as_rect.update(
+                    ((False, y1, x1, x2), (False, y2, x1, x2))
+                    + ((True, x1, y1, y2), (True, x2, y1, y2))
+                )
+                commands.append(f"{x1:.2f} {y1:.2f} {x2 - x1:.2f} {y2 - y1:.2f} re")
+    for (vertical, pos), intervals in lines.items():
+        for start, end in intervals:
+            if (vertical, pos, start, end) in drawn_as_rect:
+                continue
+            commands.append(
+                f"{pos:.2f} {start:.2f} m {pos:.2f} {end:.2f} l"
+                if vertical
+                else f"{start:.2f} {pos:.2f} m {end:.2f} {pos:.2f} l"
+            )
+    return commands
+
+
+def _merge_intervals(intervals):
+    "Merge overlapping or contiguous (start, end) intervals"
+    intervals.sort()
+    merged = [list(intervals[0])]
+    for start, end in intervals[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
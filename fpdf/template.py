@@ -324,15 +324,13 @@ class FlexTemplate:
         if element.get("underline"):
             style += "U"
         self.splitting_pdf.set_font(element["font"], style, element["size"])
-        return self.splitting_pdf.multi_cell(
+        return self.splitting_pdf.measure_multi_cell(
             w=element["x2"] - element["x1"],
             h=element["y2"] - element["y1"],
             text=str(text),
             align=element.get("align", ""),
-            dry_run=True,
-            output="LINES",
             wrapmode=element.get("wrapmode", "WORD"),
-        )
+        ).get_strings()
 
     def _text(
         self,
@@ -395,15 +393,13 @@ class FlexTemplate:
                 wrapmode=wrapmode,
             )
         else:  # trim to fit exactly the space defined
-            text = pdf.multi_cell(
+            text = pdf.measure_multi_cell(
                 w=width,
                 h=height,
                 text=text,
                 align=align,
                 wrapmode=wrapmode,
-                dry_run=True,
-                output="LINES",
-            )[0]
+            ).get_strings()[0]
             pdf.cell(w=width, h=height, text=text, border=0, align=align, fill=fill)
 
     def _line(
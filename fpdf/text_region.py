@@ -1,4 +1,5 @@
 import math
+from collections import deque
 from typing import NamedTuple, Sequence, List, NewType
 
 from .errors import FPDFException
@@ -176,7 +177,9 @@ class Paragraph:  # pylint: disable=function-redefined
         if h is None:
             h = self.pdf.font_size * self.line_height
         fragment = self.pdf._preload_font_styles("\n", markdown=False)[0]
-        fragment.graphics_state["font_size_pt"] = h * fragment.k
+        fragment.graphics_state = fragment.graphics_state.replace(
+            font_size_pt=h * fragment.k
+        )
         self._text_fragments.append(fragment)
 
     def build_lines(self, print_sh) -> List[LineWrapper]:
@@ -209,6 +212,42 @@ class Paragraph:  # pylint: disable=function-redefined
         return text_lines
 
 
+class LineQueue:
+    """
+    Queue of the lines of a text region, built lazily paragraph by paragraph
+    as they are consumed by the rendering of columns & pages.
+    """
+
+    def __init__(self, paragraphs_lines):
+        self._paragraphs_lines = paragraphs_lines  # iterator of lists of lines
+        self._lines = deque()
+
+    def _fill(self):
+        while not self._lines:
+            lines = next(self._paragraphs_lines, None)
+            if lines is None:
+                return False
+            self._lines.extend(lines)
+        return True
+
+    def __bool__(self):
+        return self._fill()
+
+    def peek(self):
+        "Return the next line, without consuming it"
+        return self._lines[0] if self._fill() else None
+
+    def popleft(self):
+        "Consume the next line"
+        return self._lines.popleft()
+
+    def remaining(self):
+        "Build all the lines left, and return them without consuming them"
+        for lines in self._paragraphs_lines:
+            self._lines.extend(lines)
+        return self._lines
+
+
 class ImageParagraph:
     def __init__(
         self,
@@ -500,17 +539,18 @@ class TextRegion(ParagraphCollectorMixin):
                 self.pdf.y += margin
         return rendered
 
-    def _render_column_lines(self, text_lines, top, bottom):
+    def _render_column_lines(self, text_lines: LineQueue, top, bottom):
+        "Render lines in a single column, consuming them from the queue provided"
         if not text_lines:
             return 0  # no rendered height
         self.pdf.y = top
         prev_line_height = 0
         last_line_height = None
-        rendered_lines = 0
-        for tl_wrapper in text_lines:
+        while text_lines:
+            tl_wrapper = text_lines.peek()
             if isinstance(tl_wrapper, ImageParagraph):
                 if self._render_image_paragraph(tl_wrapper):
-                    rendered_lines += 1
+                    text_lines.popleft()
                 else:  # not enough room for image
                     break
             else:
@@ -572,25 +612,21 @@ class TextRegion(ParagraphCollectorMixin):
                     margin = cur_paragraph.bottom_margin
                     if margin and text_rendered and (self.pdf.y + margin) < bottom:
                         self.pdf.y += cur_paragraph.bottom_margin
-                rendered_lines += 1
+                text_lines.popleft()
                 if text_line.trailing_form_feed:  # column break
                     break
-        if rendered_lines:
-            del text_lines[:rendered_lines]
         return last_line_height
 
-    def collect_lines(self):
-        text_lines = []
+    def _build_paragraphs_lines(self):
+        "Yield the list of lines of each paragraph, building them on demand"
         for paragraph in self._paragraphs:
             if isinstance(paragraph, ImageParagraph):
-                line = paragraph.build_line()
-                text_lines.append(line)
+                yield [paragraph.build_line()]
             else:
-                cur_lines = paragraph.build_lines(self.print_sh)
-                if not cur_lines:
-                    continue
-                text_lines.extend(cur_lines)
-        return text_lines
+                yield paragraph.build_lines(self.print_sh)
+
+    def collect_lines(self):
+        return [line for lines in self._build_paragraphs_lines() for line in lines]
 
     def render(self):
         raise NotImplementedError()
@@ -664,7 +700,7 @@ class TextColumns(TextRegion, TextColumnarMixin):
         else:
             self.write(FORM_FEED)
 
-    def _render_page_lines(self, text_lines, top, bottom):
+    def _render_page_lines(self, text_lines: LineQueue, top, bottom):
         """Rendering a set of lines in one or several columns on one page."""
         balancing = False
         next_y = self.pdf.y
@@ -678,7 +714,9 @@ class TextColumns(TextRegion, TextColumnarMixin):
             page_bottom = bottom
             if not text_lines:
                 return
-            tot_height = sum(l.line.height for l in text_lines)
+            # Balancing requires the height of all the lines left:
+            remaining_lines = text_lines.remaining()
+            tot_height = sum(l.line.height for l in remaining_lines)
             col_height = tot_height / self._ncols
             avail_height = bottom - top
             if col_height < avail_height:
@@ -686,8 +724,8 @@ class TextColumns(TextRegion, TextColumnarMixin):
                 # total height divided by n
                 bottom = top + col_height
                 # A bit more generous: Try to keep the rightmost column the shortest.
-                lines_per_column = math.ceil(len(text_lines) / self._ncols) + 0.5
-                mult_height = text_lines[0].line.height * lines_per_column
+                lines_per_column = math.ceil(len(remaining_lines) / self._ncols) + 0.5
+                mult_height = remaining_lines[0].line.height * lines_per_column
                 if mult_height > col_height:
                     bottom = top + mult_height
                 if bottom > page_bottom:
@@ -713,13 +751,13 @@ class TextColumns(TextRegion, TextColumnarMixin):
     def render(self):
         if not self._paragraphs:
             return
-        text_lines = self.collect_lines()
+        text_lines = LineQueue(self._build_paragraphs_lines())
         if not text_lines:
             return
         page_bottom = self.pdf.h - self.pdf.b_margin
         first_page_top = max(self.pdf.t_margin, self.pdf.y)
         self._render_page_lines(text_lines, first_page_top, page_bottom)
-        # Note: text_lines is progressively emptied by ._render_column_lines()
+        # Note: text_lines is progressively consumed by ._render_column_lines()
         while text_lines:
             page_break = self.pdf._perform_page_break_if_need_be(self.pdf.h)
             if not page_break:
@@ -40,6 +40,19 @@ class Padding(NamedTuple):
         )
 
 
+def freeze(value):
+    """
+    Convert a value containing dicts & lists into a hashable equivalent.
+    Other values are paired with their type, so that equal values of different types,
+    like `0`, `0.0` & `False`, are not frozen into equal keys.
+    """
+    if isinstance(value, dict):
+        return tuple((key, freeze(val)) for key, val in value.items())
+    if isinstance(value, list):
+        return list, tuple(freeze(val) for val in value)
+    return type(value), value
+
+
 def buffer_subst(buffer, placeholder, value):
     buffer_size = len(buffer)
     assert len(placeholder) == len(value), f"placeholder={placeholder} value={value}"
@@ -1,8 +1,28 @@
+from pathlib import Path
+
+from fpdf import FPDF
 from fpdf.fonts import Glyph
 
+HERE = Path(__file__).resolve().parent
+
 
 def test_glyph_class():
     glyph = Glyph(glyph_id=32, unicode=(0,), glyph_name=".notdef", glyph_width=0)
     # pylint: disable=comparison-with-itself
     assert glyph == glyph
     assert hash(glyph) == hash(glyph)
+
+
+def test_subset_translate_matches_pick():
+    pdf = FPDF()
+    pdf.add_font(fname=HERE / "DejaVuSans.ttf")
+    pdf.add_font("Reference", fname=HERE / "DejaVuSans.ttf")
+    text = "Ça coûte 10€ (naïve façade) — çà et là\U0001f600"
+    subset = pdf.fonts["dejavusans"].subset
+    reference = pdf.fonts["reference"].subset
+    char_ids = [reference.pick(ord(char)) for char in text]
+    expected = "".join(chr(char_id) for char_id in char_ids if char_id)
+    assert subset.translate(text) == expected
+    # Translating again must reuse the same codes without picking new ones:
+    assert subset.translate(text[::-1]) == expected[::-1]
+    assert list(subset.items()) == list(reference.items())
@@ -54,10 +54,6 @@ def test_insert_jpg_flatedecode(tmp_path):
         assert_pdf_equal(pdf, HERE / "image_types_insert_jpg_flatedecode.pdf", tmp_path)
 
 
-@pytest.mark.skipif(
-    sys.version_info.minor != 13,
-    reason="LZWDecode is currently VERY slow, so we want to only execute it ONCE among all Python versions in the test pipeline",
-)
 def test_insert_jpg_lzwdecode(tmp_path):
     pdf = fpdf.FPDF()
     pdf.compress = False
@@ -210,7 +206,8 @@ def test_insert_pillow(tmp_path):
     pdf.add_page()
     img = Image.open(HERE / "insert_images_insert_png.png")
     pdf.image(img, x=15, y=15, h=140)
-    assert_pdf_equal(pdf, HERE / "image_types_insert_png.pdf", tmp_path)
+    # The pixels of PIL images are always compressed again:
+    assert_pdf_equal(pdf, HERE / "image_types_insert_pillow.pdf", tmp_path)
 
 
 def test_insert_pillow_issue_139(tmp_path):
@@ -232,7 +229,8 @@ def test_insert_bytesio(tmp_path):
     img_bytes = io.BytesIO()
     img.save(img_bytes, "PNG")
     pdf.image(img_bytes, x=15, y=15, h=140)
-    assert_pdf_equal(pdf, HERE / "image_types_insert_png.pdf", tmp_path)
+    # The PNG data produced by Pillow is embedded as is:
+    assert_pdf_equal(pdf, HERE / "image_types_insert_png_bytes.pdf", tmp_path)
     assert not img_bytes.closed  # cf. issue #881
 
 
@@ -243,4 +241,4 @@ def test_insert_bytes(tmp_path):
     img_bytes = io.BytesIO()
     img.save(img_bytes, "PNG")
     pdf.image(img_bytes.getvalue(), x=15, y=15, h=140)
-    assert_pdf_equal(pdf, HERE / "image_types_insert_png.pdf", tmp_path)
+    assert_pdf_equal(pdf, HERE / "image_types_insert_png_bytes.pdf", tmp_path)
@@ -1,7 +1,9 @@
-import json
+import json, zlib
 from io import BytesIO
 from pathlib import Path
 
+from PIL import Image
+
 import fpdf
 
 HERE = Path(__file__).resolve().parent
@@ -98,3 +100,64 @@ def test_get_img_info_data_gray():
         b"\xe0O\r\xf7\xee2\xe0O\r\xfb\xf62\xe0O\r\xf3\xe62\xe0O\ru\xb5\x0c\xf8SC\\,"
         b"\x03\xfe\xd4`g\xcb\x80?5\xc8\xc92\xe0O\rL\xcc\x00\x17\xb3\xfc\x18"
     )
+
+
+def test_get_img_info_png_idat_passthrough():
+    for path in sorted((HERE / "png_test_suite").glob("bas*.png")):
+        png_bytes = path.read_bytes()
+        features = break_down_filename(path.name)
+        passthrough = (
+            features["noninterlace"]
+            and features["n_bits_depth"] == 8
+            and features["colortype_nm"] in (0, 2, 3)
+        )
+        info = fpdf.image_parsing.get_img_info(BytesIO(png_bytes))
+        idat = fpdf.image_parsing.png_idat_payload(png_bytes)
+        assert (idat is not None) == passthrough, path.name
+        if passthrough:
+            assert info["data"] == idat[1]
+            assert info["dp"] == f"/Predictor 15 /Colors {info['dpn']} /Columns 32"
+
+
+def test_get_img_info_rgba_alpha_channel():
+    rgb = Image.linear_gradient("L").resize((64, 32)).convert("RGB")
+    opaque = rgb.convert("RGBA")
+    info = fpdf.image_parsing.get_img_info("opaque.png", opaque)
+    assert "smask" not in info
+    translucent = rgb.copy()
+    translucent.putalpha(Image.new("L", (64, 32), 128))
+    info = fpdf.image_parsing.get_img_info("translucent.png", translucent)
+    assert zlib.decompress(info["data"]) == b"".join(
+        b"\0" + row for row in _rows(rgb.tobytes(), 64 * 3)
+    )
+    assert zlib.decompress(info["smask"]) == b"\0" + b"\0".join([b"\x80" * 64] * 32)
+
+
+def test_get_img_info_in_strips(monkeypatch):
+    gradient = Image.linear_gradient("L").resize((100, 77))
+    rgba = gradient.convert("RGBA")
+    rgba.putalpha(gradient.rotate(90))
+    images = [rgba, rgba.convert("RGB"), gradient, gradient.convert("1")]
+    images.append(rgba.convert("P"))
+    expected_infos = [fpdf.image_parsing.get_img_info("img", img) for img in images]
+    expected_lzw = fpdf.image_parsing.get_img_info("img", rgba, "LZWDecode")
+    # Strips of 3 rows, as the image width is 100 pixels:
+    monkeypatch.setattr(fpdf.image_parsing.SETTINGS, "strip_size", 399)
+    for img, expected_info in zip(images, expected_infos):
+        assert fpdf.image_parsing.get_img_info("img", img) == expected_info
+    assert fpdf.image_parsing.get_img_info("img", rgba, "LZWDecode") == expected_lzw
+
+
+def _rows(data, row_size):
+    return [data[i : i + row_size] for i in range(0, len(data), row_size)]
+
+
+def test_lzw_encode_chunks():
+    # Enough data for the string table to be cleared several times:
+    data = bytes(range(256)) + bytes((i * 7) % 251 for i in range(50000))
+    expected = fpdf.image_parsing.lzw_encode(data)
+    chunks = [b"", data[:1], data[1:1000], b"", data[1000:30000], data[30000:]]
+    assert fpdf.image_parsing.lzw_encode(iter(chunks)) == expected
+    assert fpdf.image_parsing.lzw_encode(iter([b"", b""])) == (
+        fpdf.image_parsing.lzw_encode(b"")
+    )
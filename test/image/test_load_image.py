@@ -1,10 +1,19 @@
 import binascii
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 from pathlib import Path
 
 import pytest
+from PIL import Image
 
 import fpdf
+from fpdf.image_datastructures import (
+    DiskImageCache,
+    ImageSpillFile,
+    MemoryImageCache,
+    SpilledImageData,
+)
+from fpdf.image_parsing import persistent_cache_key, preload_image, preload_images
 
 from test.conftest import assert_pdf_equal, ensure_rss_memory_below, time_execution
 
@@ -68,3 +77,175 @@ def test_share_images_cache(tmp_path):
     with time_execution() as duration:
         build_pdf_with_big_images()
     assert duration.seconds < first_time_duration / 2
+
+
+def test_preload_images(tmp_path):
+    img_paths = sorted(glob(f"{HERE}/png_images/*.png"))
+    img_paths.insert(2, img_paths[0])
+    img_paths.append(f"{HERE}/../svg/svg_sources/SVG_logo.svg")
+    img_paths.append(Image.open(HERE / "image_types/insert_images_insert_png.png"))
+
+    def build_pdf(preload):
+        pdf = fpdf.FPDF()
+        if preload:
+            results = preload_images(pdf.image_cache, img_paths, max_workers=4)
+            assert len(results) == len(img_paths)
+        pdf.add_page()
+        for img in img_paths:
+            pdf.image(img, w=20)
+        return pdf
+
+    sequential_pdf = build_pdf(preload=False)
+    preloaded_pdf = build_pdf(preload=True)
+    assert [info["i"] for info in preloaded_pdf.image_cache.images.values()] == [
+        info["i"] for info in sequential_pdf.image_cache.images.values()
+    ]
+    assert_pdf_equal(preloaded_pdf, sequential_pdf, tmp_path)
+
+
+def test_disk_image_cache(tmp_path, monkeypatch):
+    disk_cache = DiskImageCache(tmp_path / "cache")
+    img_paths = sorted(glob(f"{HERE}/png_images/*.png"))[:4]
+
+    def build_pdf():
+        pdf = fpdf.FPDF()
+        pdf.image_cache.persistent_cache = disk_cache
+        pdf.add_page()
+        for img_path in img_paths:
+            pdf.image(img_path, w=50)
+            pdf.image(img_path, w=20)
+        with (HERE / "image_types/insert_images_insert_png.png").open("rb") as f:
+            pdf.image(f.read(), w=20)
+        return pdf
+
+    first_pdf = build_pdf()
+    assert len(list((tmp_path / "cache").iterdir())) == 5
+
+    def get_img_info(*_, **__):
+        assert False, "Images should be loaded from the persistent cache"
+
+    monkeypatch.setattr(fpdf.image_parsing, "get_img_info", get_img_info)
+    assert_pdf_equal(build_pdf(), first_pdf, tmp_path)
+
+
+def test_persistent_cache_with_file_object(tmp_path):
+    memory_cache = MemoryImageCache()
+    img_path = HERE / "image_types/insert_images_insert_png.png"
+
+    def build_pdf():
+        pdf = fpdf.FPDF()
+        pdf.image_cache.persistent_cache = memory_cache
+        pdf.oversized_images = "DOWNSCALE"
+        pdf.add_page()
+        with img_path.open("rb") as img_file:
+            pdf.image(img_file, w=20)
+        return pdf
+
+    first_pdf = build_pdf()
+    # The source image & its downscaled variant have been cached:
+    assert len(memory_cache) == 2
+    assert_pdf_equal(build_pdf(), first_pdf, tmp_path)
+    assert len(memory_cache) == 2
+
+
+def test_disk_image_cache_eviction(tmp_path):
+    disk_cache = DiskImageCache(tmp_path)
+    img_path_a, img_path_b = sorted(glob(f"{HERE}/png_images/*.png"))[:2]
+
+    def preload(img_path, dims=None):
+        image_cache = fpdf.image_datastructures.ImageCache(persistent_cache=disk_cache)
+        preload_image(image_cache, img_path, dims)
+        with open(img_path, "rb") as img_file:
+            key = persistent_cache_key(img_file.read(), "AUTO", dims)
+        return tmp_path / f"{key}{DiskImageCache.FILE_SUFFIX}"
+
+    file_path_a = preload(img_path_a)
+    file_path_b = preload(img_path_b)
+    preload(img_path_a)  # marks A as recently used
+    disk_cache.max_size = file_path_a.stat().st_size + file_path_b.stat().st_size
+    file_path_c = preload(img_path_b, dims=(8, 8))
+    assert file_path_a.exists()
+    assert not file_path_b.exists()
+    assert file_path_c.exists()
+
+
+def test_memory_image_cache_shared_among_threads(tmp_path):
+    memory_cache = MemoryImageCache()
+    img_paths = sorted(glob(f"{HERE}/png_images/*.png"))
+
+    def build_pdf(_=None):
+        pdf = fpdf.FPDF()
+        pdf.image_cache.persistent_cache = memory_cache
+        for img_path in img_paths:
+            pdf.add_page()
+            pdf.image(img_path, w=50)
+        return pdf
+
+    first_pdf = build_pdf()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pdfs = [first_pdf, *executor.map(build_pdf, range(4))]
+    assert len(memory_cache) == len(img_paths)
+    for pdf in pdfs[1:]:
+        for info, first_info in zip(
+            pdf.image_cache.images.values(), pdfs[0].image_cache.images.values()
+        ):
+            assert info is not first_info
+            assert info["data"] is first_info["data"]
+        assert_pdf_equal(pdf, pdfs[0], tmp_path)
+
+
+def test_memory_image_cache_eviction():
+    img_path_a, img_path_b = sorted(glob(f"{HERE}/png_images/*.png"))[:2]
+    memory_cache = MemoryImageCache()
+
+    def preload(img_path, dims=None):
+        image_cache = fpdf.image_datastructures.ImageCache(
+            persistent_cache=memory_cache
+        )
+        return preload_image(image_cache, img_path, dims)[2]
+
+    preload(img_path_a)
+    size_a = memory_cache.size
+    preload(img_path_b)
+    preload(img_path_a)  # marks A as recently used
+    memory_cache.max_size = memory_cache.size
+    size_c = len(preload(img_path_b, dims=(8, 8))["data"])
+    assert len(memory_cache) == 2
+    assert memory_cache.size == size_a + size_c
+
+
+def test_memory_image_cache_with_unbreakable():
+    memory_cache = MemoryImageCache()
+    pdf = fpdf.FPDF()
+    pdf.image_cache.persistent_cache = memory_cache
+    pdf.add_page()
+    with pdf.unbreakable() as doc:
+        doc.image(HERE / "png_images/ac6343a98f8edabfcc6e536dd75aacb0.png", w=50)
+    assert pdf.image_cache.persistent_cache is memory_cache
+    assert len(memory_cache) == 1
+
+
+def test_image_spill_file(tmp_path):
+    img_paths = [
+        HERE / "image_types/insert_images_insert_png.png",
+        HERE / "image_types/insert_images_insert_jpg_icc.jpg",
+        HERE / "png_test_suite/basn6a08.png",  # with an alpha channel
+    ]
+
+    def build_pdf(spill):
+        pdf = fpdf.FPDF()
+        pdf.oversized_images = "DOWNSCALE"
+        if spill:
+            pdf.image_cache.spill_file = ImageSpillFile(tmp_path)
+        pdf.add_page()
+        for img_path in img_paths:
+            pdf.image(img_path, w=50)
+            pdf.image(img_path, w=5)
+        return pdf
+
+    pdf = build_pdf(spill=True)
+    for info in pdf.image_cache.images.values():
+        assert isinstance(info["data"], SpilledImageData)
+        if "smask" in info:
+            assert isinstance(info["smask"], SpilledImageData)
+    assert_pdf_equal(pdf, build_pdf(spill=False), tmp_path)
@@ -1,7 +1,9 @@
 import logging
 from pathlib import Path
 
+import fpdf
 from fpdf import FPDF
+from fpdf.image_datastructures import MemoryImageCache
 from test.conftest import assert_pdf_equal, ensure_rss_memory_below
 
 from PIL import Image
@@ -118,3 +120,43 @@ def test_oversized_images_downscale_biggest_2nd(caplog, tmp_path):
 
 def _in_use_img_names(pdf):
     return [name for name, img in pdf.image_cache.images.items() if img["usages"]]
+
+
+def test_oversized_images_downscale_variants_reuse_decoded_source(monkeypatch):
+    load_image = fpdf.image_parsing.load_image
+    loaded_image_names = []
+
+    def load_image_spy(filename):
+        loaded_image_names.append(filename)
+        return load_image(filename)
+
+    monkeypatch.setattr(fpdf.image_parsing, "load_image", load_image_spy)
+    memory_cache = MemoryImageCache()
+    for _ in range(2):
+        pdf = FPDF()
+        pdf.image_cache.persistent_cache = memory_cache
+        pdf.oversized_images = "DOWNSCALE"
+        pdf.add_page()
+        for width in (20, 30, 40, 50):
+            pdf.image(IMAGE_PATH, w=width)
+        lowres_info = pdf.image_cache.images[f"lowres-{IMAGE_PATH}"]
+        assert (lowres_info["w"], lowres_info["h"]) == (283, 401)
+    # The image file is read once by preload_image(), and once to build its variants:
+    assert loaded_image_names == [str(IMAGE_PATH)] * 4
+    # 1 full-size image + 4 low-res variants:
+    assert len(memory_cache) == 5
+
+
+def test_oversized_images_downscale_variant_sources_released():
+    pdf = FPDF()
+    pdf.oversized_images = "DOWNSCALE"
+    pdf.add_page()
+    pdf.image(IMAGE_PATH, w=20)
+    variant_sources = pdf.image_cache.variant_sources
+    assert len(variant_sources) == 1
+    with pdf.unbreakable() as doc:
+        doc.image(IMAGE_PATH, w=30)
+    # The decoded source images are not copied by the recorder:
+    assert pdf.image_cache.variant_sources is variant_sources
+    pdf.output()
+    assert not variant_sources
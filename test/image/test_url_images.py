@@ -1,10 +1,79 @@
+import threading, time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.error import HTTPError
+
+import pytest
 
 import fpdf
+from fpdf.resource_loader import ResourceLoader
 from test.conftest import assert_pdf_equal
 
 HERE = Path(__file__).resolve().parent
 PNG_IMG_URL = "https://upload.wikimedia.org/wikipedia/commons/7/70/Example.png"
+PNG_IMG_NAMES = sorted(path.name for path in (HERE / "png_images").glob("*.png"))[:6]
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    "Serves the files of this directory, recording the requests & connections received"
+
+    protocol_version = "HTTP/1.1"  # enables keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(self.path)
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(
+                self.server.max_in_flight, self.server.in_flight
+            )
+        try:
+            time.sleep(0.05)  # simulating network latency
+            if self.path.startswith("/redirect/"):
+                self.send_response(302)
+                self.send_header("Location", self.path[len("/redirect") :])
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif self.path.startswith("/ftp-redirect/"):
+                self.send_response(302)
+                self.send_header("Location", f"ftp://127.0.0.1{self.path}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif self.path.startswith("/non-authoritative/"):
+                content = (HERE / self.path[len("/non-authoritative/") :]).read_bytes()
+                self.send_response(203)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            else:
+                super().do_GET()
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(name="http_server")
+def fixture_http_server():
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(RecordingHandler, directory=str(HERE))
+    )
+    server.lock = threading.Lock()
+    server.requests, server.connections = [], 0
+    server.in_flight, server.max_in_flight = 0, 0
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
 
 
 def test_png_url(tmp_path):
@@ -12,3 +81,102 @@ def test_png_url(tmp_path):
     pdf.add_page()
     pdf.image(PNG_IMG_URL, x=15, y=15, w=30, h=25)
     assert_pdf_equal(pdf, HERE / "image_png_url.pdf", tmp_path)
+
+
+def test_write_html_with_remote_images(http_server, tmp_path):
+    html = "".join(
+        f'<img src="BASE_URL/png_images/{name}" width="50" height="50">'
+        for name in PNG_IMG_NAMES * 2
+    )
+    expected_pdf = fpdf.FPDF()
+    expected_pdf.add_page()
+    expected_pdf.write_html(html.replace("BASE_URL", str(HERE)))
+    pdf = fpdf.FPDF()
+    pdf.add_page()
+    pdf.write_html(html.replace("BASE_URL", http_server.base_url))
+    assert_pdf_equal(pdf, expected_pdf, tmp_path)
+    # Each image was fetched only once, concurrently, over a bounded number of connections:
+    assert sorted(http_server.requests) == [f"/png_images/{n}" for n in PNG_IMG_NAMES]
+    assert http_server.max_in_flight > 1
+    assert http_server.connections <= len(PNG_IMG_NAMES)
+    # The temporary loader used has been closed:
+    assert pdf.image_cache.resource_loader is None
+
+
+def test_write_html_with_shared_resource_loader(http_server):
+    resource_loader = ResourceLoader()
+    html = f'<img src="{http_server.base_url}/png_images/{PNG_IMG_NAMES[0]}">'
+    for _ in range(2):
+        pdf = fpdf.FPDF()
+        pdf.image_cache.resource_loader = resource_loader
+        pdf.add_page()
+        pdf.write_html(html)
+        assert pdf.image_cache.resource_loader is resource_loader
+    # The cached response was reused by the 2nd document:
+    assert len(http_server.requests) == 1
+    resource_loader.close()
+
+
+def test_table_with_remote_images(http_server, tmp_path):
+    def build_pdf(base_url):
+        pdf = fpdf.FPDF()
+        pdf.add_page()
+        with pdf.table(first_row_as_headings=False) as table:
+            for i in range(0, len(PNG_IMG_NAMES), 2):
+                row = table.row()
+                for name in PNG_IMG_NAMES[i : i + 2]:
+                    row.cell(img=f"{base_url}/png_images/{name}")
+        return pdf
+
+    expected_pdf = build_pdf(HERE)
+    assert_pdf_equal(build_pdf(http_server.base_url), expected_pdf, tmp_path)
+    assert sorted(http_server.requests) == [f"/png_images/{n}" for n in PNG_IMG_NAMES]
+    assert http_server.max_in_flight > 1
+
+
+def test_resource_loader(http_server):
+    loader = ResourceLoader()
+    base_url = http_server.base_url
+    for name in PNG_IMG_NAMES[:3]:
+        assert (
+            loader.load(f"{base_url}/png_images/{name}").getvalue()
+            == (HERE / "png_images" / name).read_bytes()
+        )
+    assert http_server.connections == 1  # the connection is kept alive & reused
+    # Responses are cached:
+    loader.load(f"{base_url}/png_images/{PNG_IMG_NAMES[0]}")
+    assert len(http_server.requests) == 3
+    # Redirections are followed:
+    name = PNG_IMG_NAMES[3]
+    assert (
+        loader.load(f"{base_url}/redirect/png_images/{name}").getvalue()
+        == (HERE / "png_images" / name).read_bytes()
+    )
+    assert http_server.requests[-2:] == [
+        f"/redirect/png_images/{name}",
+        f"/png_images/{name}",
+    ]
+    # Errors are only raised when loading resources:
+    loader.prefetch([f"{base_url}/missing.png"])
+    with pytest.raises(HTTPError) as error:
+        loader.load(f"{base_url}/missing.png")
+    assert error.value.code == 404
+    # Redirections are only followed to HTTP(S) URLs:
+    with pytest.raises(HTTPError) as error:
+        loader.load(f"{base_url}/ftp-redirect/png_images/{name}")
+    assert error.value.url.startswith("ftp://")
+    # Any 2xx status is a success:
+    assert (
+        loader.load(f"{base_url}/non-authoritative/png_images/{name}").getvalue()
+        == (HERE / "png_images" / name).read_bytes()
+    )
+    loader.close()
+
+
+def test_resource_loader_max_cache_size(http_server):
+    loader = ResourceLoader(max_cache_size=1)
+    url = f"{http_server.base_url}/png_images/{PNG_IMG_NAMES[0]}"
+    loader.load(url)
+    loader.load(url)
+    assert len(http_server.requests) == 2
+    loader.close()
@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
@@ -16,6 +17,7 @@ from fpdf.fonts import FontFace
 from test.conftest import LOREM_IPSUM, assert_pdf_equal
 
 HERE = Path(__file__).resolve().parent
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
 
 TABLE_DATA = (
     ("First name", "Last name", "Age", "City"),
@@ -56,6 +58,105 @@ def test_table_simple(tmp_path):
     assert_pdf_equal(pdf, HERE / "table_simple.pdf", tmp_path)
 
 
+def test_table_add_rows(tmp_path):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    with pdf.table() as table:
+        table.add_rows(TABLE_DATA)
+    assert_pdf_equal(pdf, HERE / "table_simple.pdf", tmp_path)
+
+
+def test_table_add_columns(tmp_path):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    with pdf.table() as table:
+        table.add_columns(
+            {
+                "First name": ["Jules", "Mary", "Carlson", "Lucas"],
+                "Last name": ["Smith", "Ramos", "Banks", "Cimon"],
+                "Age": [34, 45, 19, 31],
+                "City": ["San Juan", "Orlando", "Los Angeles", "Angers"],
+            }
+        )
+    assert_pdf_equal(pdf, HERE / "table_simple.pdf", tmp_path)
+
+
+def test_table_add_columns_of_different_lengths():
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    with pytest.raises(ValueError):
+        with pdf.table() as table:
+            table.add_columns([["Jules", "Mary"], ["Smith"]])
+
+
+def test_table_add_rows_with_column_options():
+    def build_pdf(bulk):
+        pdf = FPDF()
+        pdf.set_creation_date(EPOCH)
+        pdf.add_page()
+        pdf.set_font("Times", size=16)
+        bold = FontFace(emphasis="BOLD")
+        with pdf.table(streaming=bulk) as table:
+            table.row(("Name", "Price", "Stock"))
+            rows = [(f"Item {i}", i * 1.5, None if i % 7 else i) for i in range(250)]
+            if bulk:
+                table.add_rows(
+                    rows,
+                    styles=(bold,),
+                    aligns=(None, "RIGHT", "C"),
+                    formats=(
+                        None,
+                        ".2f",
+                        lambda value: "-" if value is None else str(value),
+                    ),
+                )
+            else:
+                for name, price, stock in rows:
+                    row = table.row()
+                    row.cell(name, style=bold)
+                    row.cell(f"{price:.2f}", align="RIGHT")
+                    row.cell("-" if stock is None else str(stock), align="C")
+        return bytes(pdf.output())
+
+    assert build_pdf(bulk=True) == build_pdf(bulk=False)
+
+
+def test_table_borders_are_merged():
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    with pdf.table(cell_fill_color=200, cell_fill_mode="ROWS") as table:
+        table.add_rows(TABLE_DATA)
+    content = pdf.pages[1].contents.decode("latin-1").split()
+    # All the borders are drawn at once, as an outer rectangle, 3 vertical & 4 horizontal lines:
+    assert content.count("S") == 1
+    assert content.count("l") == 3 + 4
+    # The cells of the filled rows are drawn with a single operator:
+    assert content.count("re") == 1 + 2 * 4
+    assert content.count("f") == 1
+
+
+def test_table_borders_operators_count():
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    with pdf.table() as table:
+        for i in range(60):
+            table.row([f"{i}-{j}" for j in range(8)])
+    assert pdf.pages_count == 3
+    for page in pdf.pages.values():
+        content = page.contents.decode("latin-1").split()
+        rows_count = content.count("Tj") // 8
+        # Instead of 1 rectangle per cell, the borders on each page are drawn as an outer rectangle,
+        # 7 vertical lines, and 1 horizontal line between each row:
+        assert content.count("S") == 1
+        assert content.count("re") == 1
+        assert content.count("l") == 7 + rows_count - 1
+
+
 def test_table_with_no_row():
     pdf = FPDF()
     pdf.add_page()
@@ -183,6 +284,59 @@ def test_table_with_multiline_cells(tmp_path):
     assert_pdf_equal(pdf, HERE / "table_with_multiline_cells.pdf", tmp_path)
 
 
+def test_table_streaming_with_multiline_cells(tmp_path):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    with pdf.table(streaming=True) as table:
+        for data_row in MULTILINE_TABLE_DATA:
+            row = table.row()
+            for datum in data_row:
+                row.cell(datum)
+            # Only the headings, the previous row & the current one are kept:
+            assert len(table.rows) <= 3
+    assert pdf.pages_count == 2
+    assert_pdf_equal(pdf, HERE / "table_with_multiline_cells.pdf", tmp_path)
+
+
+def test_table_streaming_with_extra_column():
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    with pytest.raises(FPDFException) as error:
+        with pdf.table(streaming=True) as table:
+            for data_row in TABLE_DATA:
+                table.row(data_row)
+            table.row(("Jules", "Smith", "34", "San Juan", "USA"))
+            table.row(("Mary", "Ramos", "45", "Orlando"))
+    expected_msg = (
+        "Row with index 5 has 5 columns, more than the 4 of the rows before it"
+    )
+    assert str(error.value) == expected_msg
+
+
+def test_table_cells_are_laid_out_once(tmp_path, monkeypatch):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    preloaded_texts = []
+    preload_font_styles = FPDF._preload_font_styles  # pylint: disable=protected-access
+
+    def spy(self, text, markdown):
+        preloaded_texts.append(text)
+        return preload_font_styles(self, text, markdown)
+
+    monkeypatch.setattr(FPDF, "_preload_font_styles", spy)
+    with pdf.table(MULTILINE_TABLE_DATA):
+        pass
+    # Each distinct cell text is parsed & wrapped only once:
+    assert sorted(preloaded_texts) == sorted(
+        {text for data_row in MULTILINE_TABLE_DATA for text in data_row}
+    )
+    assert pdf._layout_cache is None  # pylint: disable=protected-access
+    assert_pdf_equal(pdf, HERE / "table_with_multiline_cells.pdf", tmp_path)
+
+
 def test_table_with_multiline_cells_and_fixed_row_height(tmp_path):
     pdf = FPDF()
     pdf.add_page()
@@ -1092,3 +1246,17 @@ def test_table_min_row_height(tmp_path):
         table.row(("A", "B"))
         table.row(("C", "D"), min_height=50)
     assert_pdf_equal(pdf, HERE / "table_min_row_height.pdf", tmp_path)
+
+
+def test_table_with_total_pages_alias():
+    pdf = FPDF()
+    pdf.set_compression(False)
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    with pdf.table(cell_fill_color=200, cell_fill_mode="ROWS") as table:
+        for i in range(3):
+            table.row([f"Row {i}", "Page {nb}"])
+    pdf.add_page()
+    output = bytes(pdf.output())
+    assert output.count(b"(Page ) Tj (2) Tj") == 3
+    assert b"{nb}" not in output
@@ -1,5 +1,7 @@
 from pathlib import Path
 
+import pytest
+
 from fpdf import FPDF, FontFace
 from fpdf.enums import TableSpan
 
@@ -9,7 +11,8 @@ HERE = Path(__file__).resolve().parent
 IMG_DIR = HERE.parent / "image"
 
 
-def test_table_with_rowspan(tmp_path):
+@pytest.mark.parametrize("streaming", [False, True])
+def test_table_with_rowspan(tmp_path, streaming):
     # Verify that tables with overlapping rowspans are calculated correctly
     pdf = FPDF()
     pdf.set_font("Times", size=24)
@@ -17,7 +20,9 @@ def test_table_with_rowspan(tmp_path):
     # Test direct cell interface
     pdf.add_page()
     pdf.write(text="Defined with attributes\n\n")
-    with pdf.table(text_align="CENTER", first_row_as_headings=False) as table:
+    with pdf.table(
+        text_align="CENTER", first_row_as_headings=False, streaming=streaming
+    ) as table:
         row = table.row()
         row.cell("A1", rowspan=3)
         row.cell("B1")
@@ -44,7 +49,12 @@ def test_table_with_rowspan(tmp_path):
     ]
     pdf.add_page()
     pdf.write(text="Defined with items\n\n")
-    with pdf.table(TABLE_DATA, text_align="CENTER", first_row_as_headings=False):
+    with pdf.table(
+        TABLE_DATA,
+        text_align="CENTER",
+        first_row_as_headings=False,
+        streaming=streaming,
+    ):
         pass
 
     # Test HTML interface
@@ -136,7 +146,8 @@ def test_table_with_rowspan_and_colspan(tmp_path):
     assert_pdf_equal(pdf, HERE / "table_with_rowspan_and_colspan.pdf", tmp_path)
 
 
-def test_table_with_rowspan_and_pgbreak(tmp_path):
+@pytest.mark.parametrize("streaming", [False, True])
+def test_table_with_rowspan_and_pgbreak(tmp_path, streaming):
     # Verify that the rowspans interact correctly with pagebreaks
     pdf = FPDF()
     pdf.set_font("Helvetica")
@@ -145,6 +156,7 @@ def test_table_with_rowspan_and_pgbreak(tmp_path):
         text_align="CENTER",
         headings_style=FontFace(emphasis="BOLD", fill_color=200),
         num_heading_rows=3,
+        streaming=streaming,
     )
 
     # Interpreting span definitions from a string is application-dependent
@@ -209,7 +221,7 @@ External|East|4-1|4-2|4-3|4-4|4-5|<
     with pdf.local_context(**line_opts):
         pdf.line(0, y0, pdf.w, y0)
         pdf.line(0, pdf.y, pdf.w, pdf.y)
-    with pdf.table(text_align="CENTER") as table:
+    with pdf.table(text_align="CENTER", streaming=streaming) as table:
         table.row(["H1", "H2", "H3", "H4"])
         for i in range(15):
             row = table.row()
@@ -31,6 +31,41 @@ def test_custom_alias_nb_pages(tmp_path):
     assert_pdf_equal(pdf, HERE / "alias_nb_pages.pdf", tmp_path)
 
 
+def test_alias_nb_pages_placeholders_offsets():
+    pdf = fpdf.FPDF()
+    pdf.set_font("Times")
+    pdf.add_page()
+    pdf.cell(0, 10, "{nb} pages, {nb} in total", new_x="LMARGIN", new_y="NEXT")
+    with pdf.unbreakable() as doc:
+        doc.cell(0, 10, "{nb}")
+    with pdf.offset_rendering() as dummy:
+        dummy.cell(0, 10, "Page 1/{nb}")
+    page = pdf.pages[1]
+    substitutions = page.get_text_substitutions()
+    assert len(substitutions) == 3
+    for substitution in substitutions:
+        placeholder = substitution.fragment.get_placeholder_string().encode("latin-1")
+        start, end = substitution.offset, substitution.offset + substitution.length
+        assert page.contents[start:end] == placeholder
+    page.substitute_texts("1")
+    assert b"placeholder" not in page.contents
+    assert page.contents.count(b"(1) Tj") == 3
+
+
+def test_alias_nb_pages_with_dry_run():
+    pdf = fpdf.FPDF()
+    pdf.set_compression(False)
+    pdf.set_font("Times")
+    pdf.add_page()
+    pdf.multi_cell(w=pdf.epw, text="Page 1/{nb}", dry_run=True, output="LINES")
+    pdf.multi_cell(w=pdf.epw, text="Page 1/{nb}", new_x="LMARGIN", new_y="NEXT")
+    pdf.multi_cell(w=pdf.epw, text="Some text after")
+    output = bytes(pdf.output())
+    assert b"placeholder" not in output
+    assert b"(Page 1/) Tj (1) Tj" in output
+    assert b"(Some text after) Tj" in output
+
+
 def test_page_label(tmp_path):
     pdf = fpdf.FPDF()
 
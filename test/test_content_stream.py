@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from fpdf import FPDF
+from fpdf.content_stream import optimize_content_stream
+from test.conftest import assert_pdf_equal
+
+HERE = Path(__file__).resolve().parent
+
+
+def test_optimize_content_streams(tmp_path):
+    pdf = FPDF()
+    pdf.optimize_content_streams = True
+    pdf.add_page()
+    pdf.set_font("helvetica", size=12)
+    pdf.set_draw_color(255, 0, 0)
+    pdf.set_fill_color(200, 200, 255)
+    for i in range(5):
+        with pdf.local_context(draw_color=(255, 0, 0), fill_color=(200, 200, 255)):
+            pdf.cell(60, 10, f"Row {i}", border=1, fill=True)
+        with pdf.local_context():
+            pdf.set_font("helvetica", "B", 12)
+            pdf.cell(60, 10, "Bold", border=1, new_x="LMARGIN", new_y="NEXT")
+        with pdf.local_context(text_color=(0, 0, 255)):
+            pass
+    assert_pdf_equal(pdf, HERE / "content_stream_optimized.pdf", tmp_path)
+
+
+def test_optimize_content_stream_drops_redundant_operators():
+    assert optimize_content_stream(
+        b"0 g 0 G 0 Tw 100 Tz\n"
+        b"1 0 0 rg 1 0 0 rg\n"
+        b"q 1 0 0 rg 0 0 10 10 re f Q\n"
+        b"q\nQ\n"
+        b"BT /F1 12 Tf ET\n"
+        b"BT /F1 12.00 Tf 10 10 Td (x) Tj ET\n"
+    ) == (
+        b"1 0 0 rg\n"
+        b"q 0 0 10 10 re f Q\n"
+        b"BT /F1 12 Tf ET\n"
+        b"BT 10 10 Td (x) Tj ET\n"
+    )
+
+
+def test_optimize_content_stream_restores_state_on_q():
+    contents = b"q 1 0 0 RG 0 0 m 10 10 l S Q 1 0 0 RG 0 0 m 10 10 l S"
+    assert optimize_content_stream(contents) == contents
+
+
+def test_optimize_content_stream_does_not_track_extgstates_nor_colorspaces():
+    contents = b"2 w /GS1 gs 2 w\n/Pattern cs /P1 scn 0 0 10 10 re f 0 g 0 0 10 10 re f"
+    assert optimize_content_stream(contents) == contents
+
+
+def test_optimize_content_stream_td_sets_leading():
+    contents = b"BT 12 TL (a) Tj 0 -5 TD (b) Tj 12 TL T* (c) Tj ET"
+    assert optimize_content_stream(contents) == contents
+
+
+def test_optimize_content_stream_strings():
+    assert optimize_content_stream(b"BT (a (nested) Tf) Tj (\\)) Tj ET 0 Tw") == (
+        b"BT (a (nested) Tf) Tj (\\)) Tj ET"
+    )
+
+
+def test_optimize_content_stream_left_unchanged_when_unsupported():
+    inline_image = b"0 g BI /W 1 /H 1 /BPC 8 /CS /G ID \x00 EI"
+    assert optimize_content_stream(inline_image) == inline_image
+    unbalanced = b"0 g Q"
+    assert optimize_content_stream(unbalanced) == unbalanced
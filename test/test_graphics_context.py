@@ -366,6 +366,24 @@ def test_local_context_inherited_shared_props(tmp_path):
     assert_pdf_equal(pdf, HERE / "local_context_inherited_shared_props.pdf", tmp_path)
 
 
+def test_nested_graphics_states_are_copied_on_write():
+    # pylint: disable=protected-access
+    pdf = FPDF()
+    pdf.set_font("helvetica", size=12)
+    pdf._push_local_stack()
+    pdf._push_local_stack()
+    pdf.set_font_size(20)
+    pdf.set_draw_color(255, 0, 0)
+    assert pdf.font_size_pt == 20
+    pdf._pop_local_stack()
+    assert pdf.font_size_pt == 12
+    assert pdf.draw_color == drawing.DeviceGray(0)
+    pdf.set_font_size(16)
+    pdf._pop_local_stack()
+    assert pdf.font_size_pt == 12
+    assert not pdf._is_current_graphics_state_nested()
+
+
 def test_invalid_local_context_init():
     pdf = FPDF()
     pdf.add_page()
@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from PIL import Image
+
 from test.conftest import ensure_exec_time_below, ensure_rss_memory_below
 
 from fpdf import FPDF
@@ -24,3 +26,15 @@ def test_intense_image_rendering(tmp_path):
             y = (i // 13) * 16
             pdf.image(png_file_path, x=x, y=y)
     pdf.output(tmp_path / "out.pdf")
+
+
+@ensure_exec_time_below(seconds=15, repeats=3)
+def test_lzw_encoding_of_large_image(tmp_path):
+    # 2 megapixels RGB image:
+    img = Image.open(HERE / "image/png_images/6c853ed9dacd5716bc54eb59cec30889.png")
+    img = img.convert("RGB").resize((1414, 1414))
+    pdf = FPDF()
+    pdf.set_image_filter("LZWDecode")
+    pdf.add_page()
+    pdf.image(img, x=0, y=0, w=pdf.epw)
+    pdf.output(tmp_path / "out.pdf")
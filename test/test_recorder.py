@@ -77,3 +77,63 @@ def test_recorder_with_ttf_font(tmp_path):
     recorder.cell(w=recorder.epw, h=10, text="Hello again!", align="C")
     recorder.rewind()
     assert_pdf_equal(recorder, expected, tmp_path)
+
+
+def test_recorder_rewind_restores_pages_in_place(tmp_path):
+    pdf = init_pdf()
+    page = pdf.pages[1]
+    recorder = FPDFRecorder(pdf)
+    expected = bytes(recorder.output())  # close the document as a side-effect
+    recorder.rewind()  # in order to un-close the document
+    recorder.cell(text="Hello again!", link="https://py-pdf.github.io/fpdf2/")
+    recorder.add_page()
+    recorder.cell(text="Hello again!")
+    recorder.rewind()
+    # The pages are not copied, but restored in place:
+    assert recorder.pages[1] is page
+    assert recorder.pages_count == 1
+    assert not page.annots
+    assert_pdf_equal(recorder, expected, tmp_path)
+
+
+def test_recorder_only_records_current_page():
+    pdf = init_pdf()
+    for _ in range(99):
+        pdf.add_page()
+    recorder = FPDFRecorder(pdf)
+    journal, _ = recorder._initial  # pylint: disable=protected-access
+    assert list(journal._entries) == [100]  # pylint: disable=protected-access
+    recorder.add_page()
+    recorder.cell(text="Hello again!")
+    recorder.rewind()
+    assert recorder.pages_count == 100
+
+
+def test_recorder_rewind_page_switch():
+    pdf = init_pdf()
+    pdf.add_page()
+    first_page_contents = bytes(pdf.pages[1].contents)
+    recorder = FPDFRecorder(pdf)
+    pdf.page = 1
+    recorder.cell(text="Hello again!", link="https://py-pdf.github.io/fpdf2/")
+    recorder.rewind()
+    assert pdf.pages[1].contents == first_page_contents
+    assert not pdf.pages[1].annots
+
+
+def test_recorder_rewind_after_toc_insertion(tmp_path):
+    def render_toc(pdf, outline):
+        pdf.cell(text=f"{len(outline)} sections")
+        pdf.add_page()  # inserting an extra page, reordering the following ones
+
+    pdf = init_pdf()
+    pdf.insert_toc_placeholder(render_toc, allow_extra_pages=True)
+    for i in range(3):
+        pdf.start_section(f"Section {i}")
+        pdf.add_page()
+    pages = list(pdf.pages.values())
+    recorder = FPDFRecorder(pdf)
+    expected = bytes(recorder.output())
+    recorder.rewind()
+    assert list(recorder.pages.values()) == pages
+    assert_pdf_equal(recorder, expected, tmp_path)
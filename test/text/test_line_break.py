@@ -1,6 +1,7 @@
 from fpdf import FPDF, FPDFException, TextMode
+from fpdf.graphics_state import GraphicsState
 from fpdf.line_break import Fragment, MultiLineBreak, CurrentLine, TextLine
-from fpdf.enums import Align, CharVPos
+from fpdf.enums import Align, CharVPos, WrapMode
 
 import pytest
 
@@ -1428,3 +1429,68 @@ def test_line_break_no_initial_newline():  # issue-847
     multi_line_break = MultiLineBreak(fragments, 188, [0, 0])
     text_line = multi_line_break.get_line()
     assert text_line.fragments
+
+
+def test_fragments_share_graphics_states():
+    # pylint: disable=protected-access
+    pdf = FPDF()
+    pdf.set_font("helvetica", size=12)
+    fragments = pdf._preload_font_styles(
+        "**bold** normal **bold again** normal again", markdown=True
+    )
+    bold_1, normal_1, bold_2, normal_2 = fragments
+    assert bold_1.graphics_state is bold_2.graphics_state
+    assert normal_1.graphics_state is normal_2.graphics_state
+    assert bold_1.graphics_state != normal_1.graphics_state
+    assert normal_1.has_same_style(normal_2)
+    assert normal_1.graphics_state is pdf._get_fragment_graphics_state()
+    with pytest.raises(TypeError):
+        normal_1.graphics_state["font_size_pt"] = 20
+    bigger = normal_1.graphics_state.replace(font_size_pt=20)
+    assert bigger["font_size_pt"] == 20 and normal_1.font_size_pt == 12
+    assert bigger is normal_1.graphics_state.replace(font_size_pt=20)
+
+
+def test_graphics_states_interning_distinguishes_types():
+    assert GraphicsState.intern({"x": 0}) is not GraphicsState.intern({"x": False})
+    assert GraphicsState.intern({"x": 12}) is not GraphicsState.intern({"x": 12.0})
+    assert GraphicsState.intern({"x": 12})["x"] is not False
+    gs = GraphicsState.intern({"x": 0})
+    assert gs.replace(x=False)["x"] is False
+    assert gs.replace(x=0.0)["x"] == 0 and isinstance(gs.replace(x=0.0)["x"], float)
+
+
+def test_graphics_states_derived_cache_is_bounded():
+    # pylint: disable=protected-access
+    gs = GraphicsState.intern({"text_color": 0})
+    for i in range(1000):
+        gs.replace(text_color=i)
+    assert len(gs._derived) <= GraphicsState.MAX_DERIVED_STATES
+
+
+@pytest.mark.parametrize("wrapmode", [WrapMode.WORD, WrapMode.CHAR])
+@pytest.mark.parametrize("align", [Align.L, Align.J])
+def test_line_break_cumulative_widths_match_per_character(monkeypatch, wrapmode, align):
+    "Lines found from cumulative character widths are identical to per-character measuring."
+    # pylint: disable=protected-access
+    pdf = FPDF()
+    pdf.set_font("helvetica", size=11)
+    pdf.set_char_spacing(0.3)
+    text = (
+        "Lorem ipsum dolor sit amet, con\u00adsec\u00adte\u00adtur adipiscing elit. "
+        "Sed-do eiusmod tempor\nincididunt ut labore et dolore magna aliqua. " * 8
+    )
+    fragments = [Fragment(text, pdf._get_current_graphics_state(), pdf.k)]
+
+    def lines():
+        mlb = MultiLineBreak(
+            fragments, 80, [0, 0], align=align, wrapmode=wrapmode, line_height=1
+        )
+        result = []
+        while (line := mlb.get_line()) is not None:
+            result.append(line)
+        return result
+
+    fast = lines()
+    monkeypatch.setattr(Fragment, "get_character_widths", lambda *_: None)
+    assert fast == lines()
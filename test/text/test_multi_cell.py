@@ -655,3 +655,94 @@ def test_multi_cell_markdown_bleeding(tmp_path):
         w=0, text="No Markdown", markdown=False, new_x="LMARGIN", new_y="NEXT"
     )
     assert_pdf_equal(pdf, HERE / "multi_cell_markdown_bleeding.pdf", tmp_path)
+
+
+def test_multi_cell_with_layout_cache(tmp_path):
+    pdf = FPDF()
+    pdf.set_layout_cache()
+    pdf.add_page()
+    pdf.set_font("Times", size=60)
+    for text in ("**Lorem Ipsum dolor**", "--Lorem Ipsum dolor--"):
+        kwargs = dict(w=0, text=text, markdown=True, new_x="LMARGIN", new_y="NEXT")
+        pdf.multi_cell(**kwargs, dry_run=True, output="HEIGHT")
+        pdf.multi_cell(**kwargs)
+        assert pdf.font_style == ""
+        pdf.multi_cell(
+            w=0, text="No Markdown", markdown=False, new_x="LMARGIN", new_y="NEXT"
+        )
+    pdf.multi_cell(
+        w=0, text="__Lorem Ipsum dolor__", markdown=True, new_x="LMARGIN", new_y="NEXT"
+    )
+    pdf.multi_cell(
+        w=0, text="No Markdown", markdown=False, new_x="LMARGIN", new_y="NEXT"
+    )
+    # pylint: disable=protected-access
+    assert (pdf._layout_cache.hits, pdf._layout_cache.misses) == (4, 4)
+    assert_pdf_equal(pdf, HERE / "multi_cell_markdown_bleeding.pdf", tmp_path)
+
+
+def test_multi_cell_layout_cache_skips_stateful_text():
+    pdf = FPDF()
+    pdf.set_layout_cache(max_size=2)
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=12)
+    pdf.multi_cell(w=0, text="Page {nb}", new_x="LMARGIN")
+    pdf.multi_cell(w=0, text="Go to [page 1](1)", markdown=True, new_x="LMARGIN")
+    assert len(pdf._layout_cache) == 0  # pylint: disable=protected-access
+    for text in ("one", "two", "three", "one"):
+        pdf.multi_cell(w=0, text=text, new_x="LMARGIN")
+    assert len(pdf._layout_cache) == 2  # pylint: disable=protected-access
+    assert pdf._layout_cache.hits == 0  # pylint: disable=protected-access
+    pdf.set_layout_cache(None)
+    assert pdf._layout_cache is None  # pylint: disable=protected-access
+
+
+def test_multi_cell_layout_cache_shared_by_unbreakable():
+    pdf = FPDF()
+    pdf.set_layout_cache()
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=12)
+    layout_cache = pdf._layout_cache  # pylint: disable=protected-access
+    for _ in range(3):
+        with pdf.unbreakable() as doc:
+            doc.multi_cell(w=0, text="Repeated label", new_x="LMARGIN")
+    assert pdf._layout_cache is layout_cache  # pylint: disable=protected-access
+    assert (layout_cache.hits, layout_cache.misses) == (2, 1)
+
+
+@pytest.mark.parametrize("markdown", [False, True])
+@pytest.mark.parametrize("padding", [0, (2, 5)])
+def test_measure_multi_cell(markdown, padding):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Times", size=16)
+    pdf.set_y(220)
+    text = "**Lorem** ipsum __dolor__ sit amet.\n" + LOREM_IPSUM[:500]
+    kwargs = dict(w=80, text=text, markdown=markdown, padding=padding)
+    expected_page_break, expected_lines, expected_height = pdf.multi_cell(
+        **kwargs,
+        dry_run=True,
+        output=MethodReturnValue.PAGE_BREAK
+        | MethodReturnValue.LINES
+        | MethodReturnValue.HEIGHT,
+    )
+    pages_count, x, y = pdf.pages_count, pdf.x, pdf.y
+    text_layout = pdf.measure_multi_cell(**kwargs)
+    assert (pdf.pages_count, pdf.x, pdf.y) == (pages_count, x, y)
+    assert text_layout.get_strings() == expected_lines
+    assert text_layout.height == expected_height
+    assert bool(text_layout.page_breaks) == expected_page_break
+    first_line, last_line = text_layout.lines[0], text_layout.lines[-1]
+    assert first_line.page_offset == 0
+    assert first_line.y == (222 if padding else 220)
+    assert last_line.page_offset == 1
+    assert last_line.y < 220
+
+
+def test_measure_multi_cell_without_page():
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=12)
+    text_layout = pdf.measure_multi_cell(w=50, text="Hello world! " * 10)
+    assert text_layout.page_breaks == ()
+    assert len(text_layout.lines) == 5
+    assert text_layout.height == pytest.approx(5 * pdf.font_size)
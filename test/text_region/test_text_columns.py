@@ -2,6 +2,7 @@ from pathlib import Path
 
 import pytest
 from fpdf import FPDF, FPDFException
+from fpdf.text_region import Paragraph
 from test.conftest import assert_pdf_equal, LOREM_IPSUM
 
 HERE = Path(__file__).resolve().parent
@@ -391,3 +392,25 @@ def test_text_columns_with_shorter_2nd_column(tmp_path):  # issue 1442
     pdf.write(text="More text after columns.")
     pdf.ln()
     assert_pdf_equal(pdf, HERE / "text_columns_with_shorter_2nd_column.pdf", tmp_path)
+
+
+def test_tcols_lines_built_lazily(monkeypatch):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=12)
+    pages_at_build_time = []
+    build_lines = Paragraph.build_lines
+
+    def spy_build_lines(paragraph, print_sh):
+        pages_at_build_time.append(pdf.page)
+        return build_lines(paragraph, print_sh)
+
+    monkeypatch.setattr(Paragraph, "build_lines", spy_build_lines)
+    with pdf.text_columns(ncols=2) as cols:
+        for _ in range(40):
+            with cols.paragraph() as par:
+                par.write(LOREM_IPSUM)
+    assert pdf.pages_count > 3
+    # The lines of each paragraph are only built once the previous ones have been rendered:
+    assert pages_at_build_time == sorted(pages_at_build_time)
+    assert pages_at_build_time[-1] == pdf.pages_count
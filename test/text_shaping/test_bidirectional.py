@@ -2,7 +2,7 @@ from pathlib import Path
 from urllib.request import urlopen
 
 from fpdf import FPDF
-from fpdf.bidi import BidiParagraph, auto_detect_base_direction
+from fpdf.bidi import BidiParagraph, auto_detect_base_direction, is_ltr_only
 from fpdf.enums import TextDirection
 from test.conftest import assert_pdf_equal
 
@@ -161,6 +161,37 @@ def test_bidi_character():
     assert test_count == 91707
 
 
+def test_is_ltr_only():
+    assert is_ltr_only("Lorem ipsum, 2 + 2 = 4 (100%)\n")
+    assert is_ltr_only("Café crème à 3,50 €")
+    assert not is_ltr_only("The test is: אנגלית")
+    assert not is_ltr_only("ما فائدته")
+    assert not is_ltr_only("explicit \u202eoverride\u202c")
+    assert not is_ltr_only("isolate \u2067override\u2069")
+    # Boundary neutrals like the soft hyphen are removed by rule X9:
+    assert not is_ltr_only("hyphen\u00adation")
+
+
+def test_bidi_fragments_of_ltr_only_text():
+    text = "Café crème, 3,50 € (tax: 20%)\tend."
+    for base_direction in (None, TextDirection.LTR):
+        assert BidiParagraph(text, base_direction).get_bidi_fragments() == (
+            (text, TextDirection.LTR),
+        )
+
+
+def test_bidi_fragments_of_mixed_text():
+    paragraph = BidiParagraph("The test is: אנגלית (באנגלית: English)")
+    assert paragraph.base_direction == TextDirection.LTR
+    assert paragraph.get_bidi_fragments() == (
+        ("The test is: ", TextDirection.LTR),
+        ("אנגלית", TextDirection.RTL),
+        (" (", TextDirection.LTR),
+        ("באנגלית", TextDirection.RTL),
+        (": English)", TextDirection.LTR),
+    )
+
+
 def test_bidi_lorem_ipsum(tmp_path):
     # taken from https://ar.lipsum.com/ - contains Arabic (RTL) with portions in english (LTR) within the text
     ARABIC_LOREM_IPSUM = """